@@ -0,0 +1,76 @@
+"""UTF-8以外のファイルを読み込んだ時の、ファイル読み込み回数とパース回数を計測する
+
+uv run python benchmarks/bench_encoding_fallback.py
+"""
+
+import json
+import tempfile
+import time
+from collections import Counter
+from collections.abc import Callable
+from pathlib import Path
+from typing import IO, Any, Literal
+
+from ruamel.yaml import YAML
+
+from abara_file_io import common_io_wrapper
+from abara_file_io.common_io_wrapper import (
+    common_file_read_exception_handling,
+    configure_mmap_threshold,
+)
+
+counter: Counter[str] = Counter()
+
+original_open_source = common_io_wrapper._open_source  # noqa: SLF001
+
+
+def counting_open_source(
+    path: Path, mode: Literal['r', 'rb'], encoding: str | None = None
+) -> IO[Any]:
+    """ファイルを読み込むために開いた回数を、テキストとバイナリに分けて数える"""
+    counter[f'open({mode})'] += 1
+    return original_open_source(path, mode, encoding)
+
+
+def counting_parser(parser: Callable[[IO[Any]], object]) -> Callable[[IO[Any]], object]:
+    def wrapper(f: IO[Any]) -> object:
+        counter['parse'] += 1
+        return parser(f)
+
+    return wrapper
+
+
+def main() -> None:
+    # mmapを使わなければ、テキストでもバイナリでも読み込みは全て_open_sourceを通る
+    configure_mmap_threshold(None)
+    common_io_wrapper._open_source = counting_open_source  # noqa: SLF001
+
+    data = {f'key{i}': f'瑣事を愛さなければならぬ{i}' for i in range(50_000)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / 'sample.json'
+        json_path.write_text(json.dumps(data, ensure_ascii=False), encoding='shift_jis')
+        yaml_path = Path(tmp) / 'sample.yaml'
+        with yaml_path.open('w', encoding='shift_jis') as f:
+            YAML().dump(data, f)
+
+        targets: list[tuple[str, Path, Callable[[IO[Any]], object]]] = [
+            ('json', json_path, json.load),
+            ('yaml', yaml_path, YAML().load),
+        ]
+        for name, path, parser in targets:
+            counter.clear()
+            start = time.perf_counter()
+            common_file_read_exception_handling(
+                func=counting_parser(parser), return_empty_value={}, path=path
+            )
+            elapsed = time.perf_counter() - start
+            print(
+                f'{name}: size={path.stat().st_size:,} bytes '
+                f'open(r)={counter["open(r)"]} open(rb)={counter["open(rb)"]} '
+                f'parse={counter["parse"]} time={elapsed:.3f}s'
+            )
+
+
+if __name__ == '__main__':
+    main()
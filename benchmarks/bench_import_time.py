@@ -0,0 +1,61 @@
+"""-X importtimeでimport abara_file_io にかかる時間を計測する
+
+read_jsonだけを使う場合にruamel.yamlとcharset-normalizerが読み込まれていれば異常終了する
+
+uv run python benchmarks/bench_import_time.py
+"""
+
+import subprocess
+import sys
+
+HEAVY_MODULES = ('ruamel.yaml', 'charset_normalizer')
+
+STATEMENTS: dict[str, tuple[str, bool]] = {
+    'import abara_file_io': ('import abara_file_io', False),
+    'read_json': ('from abara_file_io import read_json', False),
+    'read_text': ('from abara_file_io import read_text', False),
+    'read_yaml': ('from abara_file_io import read_yaml', True),
+}
+
+
+def import_time(statement: str) -> tuple[int, set[str]]:
+    """statementを実行した時のimportの合計時間と、読み込まれたモジュールを返す
+
+    Returns:
+        tuple[int, set[str]]: (合計時間(us), 読み込まれたモジュール名)
+    """
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0
+    modules: set[str] = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.removeprefix('import time:').split('|')
+        modules.add(name.strip())
+        # インデントの無い行がトップレベルのimport
+        if not name.startswith('  '):
+            total += int(cumulative)
+    return total, modules
+
+
+def main() -> None:
+    failed = False
+    for label, (statement, heavy_expected) in STATEMENTS.items():
+        total, modules = import_time(statement)
+        heavy = sorted(i for i in HEAVY_MODULES if i in modules)
+        print(f'{label:<22} {total / 1000:8.1f} ms  heavy modules: {", ".join(heavy) or "-"}')
+        if heavy and not heavy_expected:
+            failed = True
+
+    if failed:
+        print('不要な依存ライブラリが読み込まれています')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
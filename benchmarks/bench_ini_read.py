@@ -0,0 +1,49 @@
+"""多数のキーを持つiniファイルの読み込みを、ConfigParserと専用のパーサーで比較する
+
+uv run python benchmarks/bench_ini_read.py              # 100,000キー
+uv run python benchmarks/bench_ini_read.py 1000000      # キー数を指定
+"""
+
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from abara_file_io import read_ini
+
+SECTIONS = 100
+
+
+def create_ini(path: Path, keys: int) -> None:
+    """文字列、整数、小数、真偽値の値が混在したiniファイルを作成する"""
+    values = ('瑣事を愛さなければならぬ', '12345', '3.14', 'True', 'api-server')
+    per_section = max(1, keys // SECTIONS)
+    with path.open('w', encoding='utf_8') as f:
+        for section in range(SECTIONS):
+            f.write(f'[section{section}]\n')
+            for key in range(per_section):
+                f.write(f'key{key} = {values[key % len(values)]}\n')
+            f.write('\n')
+
+
+def measure(label: str, func: Callable[[], object]) -> None:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f'{label:<24} {elapsed * 1000:10.1f} ms')
+
+
+def main() -> None:
+    keys = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'large.ini'
+        create_ini(path, keys)
+        print(f'{keys:,} keys ({path.stat().st_size:,} bytes)')
+
+        measure('configparser', lambda: read_ini(path, engine='configparser'))
+        measure('fast', lambda: read_ini(path, engine='fast'))
+
+
+if __name__ == '__main__':
+    main()
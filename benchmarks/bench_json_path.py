@@ -0,0 +1,58 @@
+"""大きなJSONファイルから一部の値だけを取り出す場合を、read_jsonとread_json_pathで比較する
+
+uv run python benchmarks/bench_json_path.py             # 200,000件
+uv run python benchmarks/bench_json_path.py 1000000     # 件数を指定
+"""
+
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+from abara_file_io import iter_json_items, read_json, read_json_path, write_json
+
+
+def create_json(path: Path, records: int) -> None:
+    """大きな配列の後ろに、取り出したい小さなオブジェクトがあるJSONファイルを作成する"""
+    data = {
+        'items': [
+            {'id': i, 'name': f'瑣事を愛さなければならぬ{i}', 'tags': ['a', 'b'], 'score': i / 3}
+            for i in range(records)
+        ],
+        'services': {'api': {'image': 'app:1.0', 'replicas': 3}},
+    }
+    write_json(data, path)
+
+
+def measure(label: str, func: Callable[[], object]) -> None:
+    """処理時間と、tracemallocで計測したメモリー使用量のピークを表示する
+
+    tracemallocは処理を遅くするので、時間とメモリーは別々に計測する
+    """
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'{label:<24} {elapsed * 1000:10.1f} ms {peak / 1024 / 1024:10.1f} MiB')
+
+
+def main() -> None:
+    records = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'large.json'
+        create_json(path, records)
+        print(f'{records:,} records ({path.stat().st_size:,} bytes)')
+
+        measure('read_json', lambda: read_json(path)['services']['api']['replicas'])
+        measure('read_json_path', lambda: read_json_path(path, 'services.api.replicas'))
+        measure('iter_json_items', lambda: sum(1 for _ in iter_json_items(path, 'items.*')))
+
+
+if __name__ == '__main__':
+    main()
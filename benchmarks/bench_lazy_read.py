@@ -0,0 +1,58 @@
+"""多数のセクションのうち数個だけを参照する場合の読み込みを、通常の読み込みと遅延読み込みで比較する
+
+uv run python benchmarks/bench_lazy_read.py             # 1,000セクション
+uv run python benchmarks/bench_lazy_read.py 10000       # セクション数を指定
+"""
+
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable, Mapping
+from pathlib import Path
+from typing import Any
+
+from abara_file_io import read_ini, read_ini_lazy, read_toml, read_toml_lazy
+
+KEYS = 20
+ACCESSED = ('section1', 'section42', 'section500')
+
+
+def create_file(path: Path, sections: int) -> None:
+    """文字列、整数、小数、真偽値の値が混在したiniとして読めるTOMLファイルを作成する"""
+    values = ('"瑣事を愛さなければならぬ"', '12345', '3.14', '"api-server"')
+    with path.open('w', encoding='utf_8') as f:
+        for section in range(sections):
+            f.write(f'[section{section}]\n')
+            for key in range(KEYS):
+                f.write(f'key{key} = {values[key % len(values)]}\n')
+            f.write('\n')
+
+
+def measure(label: str, func: Callable[[], Mapping[str, Any]]) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    data = func()
+    for section in ACCESSED:
+        data.get(section)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'{label:<12} {elapsed * 1000:10.1f} ms {peak / 1024 / 1024:10.1f} MiB')
+
+
+def main() -> None:
+    sections = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'large.toml'
+        create_file(path, sections)
+        print(f'{sections:,} sections ({path.stat().st_size:,} bytes)')
+
+        measure('read_toml', lambda: read_toml(path))
+        measure('toml lazy', lambda: read_toml_lazy(path))
+        measure('read_ini', lambda: read_ini(path))
+        measure('ini lazy', lambda: read_ini_lazy(path))
+
+
+if __name__ == '__main__':
+    main()
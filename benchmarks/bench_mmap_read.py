@@ -0,0 +1,68 @@
+"""大きなファイルの読み込みを、通常の読み込みとmmapで比較する
+
+uv run python benchmarks/bench_mmap_read.py                # 10MB, 100MB
+uv run python benchmarks/bench_mmap_read.py 1GB 2GB        # サイズを指定
+"""
+
+import json
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from abara_file_io import configure_mmap_threshold, read_bytes, read_json, read_text
+
+SIZES: dict[str, int] = {
+    '10MB': 10 * 1024 * 1024,
+    '100MB': 100 * 1024 * 1024,
+    '1GB': 1024 * 1024 * 1024,
+    '2GB': 2 * 1024 * 1024 * 1024,
+}
+
+DEFAULT_SIZES = ('10MB', '100MB')
+
+# 1行あたり約80バイト
+LINE = json.dumps({'name': '瑣事を愛さなければならぬ', 'value': 12345, 'tags': ['a', 'b', 'c']})
+
+
+def create_json(path: Path, target_size: int) -> None:
+    """おおよそtarget_sizeのJSON配列のファイルを作成する"""
+    count = max(1, target_size // (len(LINE.encode()) + 2))
+    with path.open('w', encoding='utf_8') as f:
+        f.write('[\n')
+        for i in range(count):
+            f.write(LINE)
+            f.write(',\n' if i < count - 1 else '\n')
+        f.write(']\n')
+
+
+def measure(label: str, func: Callable[[], object]) -> None:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f'  {label:<28} {elapsed * 1000:10.1f} ms')
+
+
+def main() -> None:
+    labels = sys.argv[1:] or list(DEFAULT_SIZES)
+    with tempfile.TemporaryDirectory() as tmp:
+        for label in labels:
+            path = Path(tmp) / f'{label}.json'
+            create_json(path, SIZES[label])
+            print(f'{label} ({path.stat().st_size:,} bytes)')
+
+            configure_mmap_threshold(None)
+            measure('read_text buffered', lambda path=path: read_text(path))
+            measure('read_json buffered', lambda path=path: read_json(path))
+            measure('Path.read_bytes', lambda path=path: path.read_bytes())
+
+            configure_mmap_threshold()
+            measure('read_text mmap', lambda path=path: read_text(path))
+            measure('read_json mmap', lambda path=path: read_json(path))
+            measure('read_bytes mmap', lambda path=path: read_bytes(path, copy=False))
+            path.unlink()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""多数のYAMLファイルの読み込みを、逐次・スレッド・プロセス数ごとに比較する
+
+uv run python benchmarks/bench_parse_many.py              # 200ファイル
+uv run python benchmarks/bench_parse_many.py 1000         # ファイル数を指定
+"""
+
+import os
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from abara_file_io import parse_many, read_many, read_yaml, write_yaml
+
+
+def sample_data(index: int) -> dict:
+    """書き込んだ時に約20KBのYAMLになる辞書を作成する
+
+    Returns:
+        dict: サンプルデータ
+    """
+    return {
+        f'service{i}': {'name': f'api-{index}-{i}', 'replicas': i % 7, 'tags': ['a', 'b']}
+        for i in range(250)
+    }
+
+
+def measure(label: str, func: Callable[[], object]) -> None:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f'{label:<24} {elapsed * 1000:10.1f} ms')
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [Path(tmp) / f'{i}.yml' for i in range(count)]
+        for i, path in enumerate(paths):
+            write_yaml(sample_data(i), path, mode='safe')
+
+        print(f'{count} files, {os.cpu_count()} cpus')
+        measure('serial read_yaml', lambda: [read_yaml(path) for path in paths])
+        measure('read_many (threads)', lambda: read_many(paths))
+
+        workers = 1
+        while workers <= (os.cpu_count() or 1):
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                # プロセスの起動を計測から除く
+                parse_many(paths[:workers], executor=executor, chunksize=1)
+                measure(
+                    f'parse_many workers={workers}',
+                    lambda executor=executor: parse_many(paths, executor=executor),
+                )
+            workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""同じデータの書き込みと読み込みを、JSONとpickle・marshalで比較する
+
+uv run python benchmarks/bench_pickle.py             # 200,000件
+uv run python benchmarks/bench_pickle.py 1000000     # 件数を指定
+"""
+
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from abara_file_io import read_json, read_pickle, write_json, write_pickle
+
+
+def measure(label: str, func: Callable[[], object]) -> None:
+    """処理時間を表示する"""
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f'{label:<28} {elapsed * 1000:10.1f} ms')
+
+
+def main() -> None:
+    records = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    data = {
+        'items': [
+            {'id': i, 'name': f'瑣事を愛さなければならぬ{i}', 'tags': ['a', 'b'], 'score': i / 3}
+            for i in range(records)
+        ]
+    }
+    payload = {'frame': bytearray(256 * 1024 * 1024)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / 'data.json'
+        pickle_path = Path(tmp) / 'data.pickle'
+        marshal_path = Path(tmp) / 'data.marshal.pickle'
+        print(f'{records:,} records')
+        measure('write_json', lambda: write_json(data, json_path))
+        measure('write_pickle', lambda: write_pickle(data, pickle_path))
+        measure(
+            'write_pickle(marshal)', lambda: write_pickle(data, marshal_path, backend='marshal')
+        )
+        measure('read_json', lambda: read_json(json_path))
+        measure('read_pickle', lambda: read_pickle(pickle_path))
+        measure('read_pickle(marshal)', lambda: read_pickle(marshal_path))
+
+        in_band_path = Path(tmp) / 'in_band.pkl'
+        out_of_band_path = Path(tmp) / 'out_of_band.pkl'
+        print('256 MiB bytearray')
+        measure('write_pickle', lambda: write_pickle(payload, in_band_path))
+        measure(
+            'write_pickle(out_of_band)',
+            lambda: write_pickle(payload, out_of_band_path, out_of_band=True),
+        )
+        measure('read_pickle', lambda: read_pickle(in_band_path))
+        measure('read_pickle(out_of_band)', lambda: read_pickle(out_of_band_path))
+
+
+if __name__ == '__main__':
+    main()
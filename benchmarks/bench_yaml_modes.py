@@ -0,0 +1,67 @@
+"""read_yaml/write_yamlのmode='rt'とmode='safe'の速度を比較する
+
+uv run python benchmarks/bench_yaml_modes.py            # 1KB, 1MB, 50MB
+uv run python benchmarks/bench_yaml_modes.py 1KB 1MB    # サイズを指定
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from abara_file_io import read_yaml, write_yaml
+from abara_file_io.yaml import YamlMode
+
+SIZES: dict[str, int] = {
+    '1KB': 1024,
+    '1MB': 1024 * 1024,
+    '50MB': 50 * 1024 * 1024,
+}
+
+MODES: tuple[YamlMode, ...] = ('rt', 'safe')
+
+
+def sample_data(target_size: int) -> dict:
+    """書き込んだ時におおよそtarget_sizeのYAMLになる辞書を作成する
+
+    Returns:
+        dict: サンプルデータ
+    """
+    # 1要素あたり約80バイト
+    count = max(1, target_size // 80)
+    return {
+        f'service{i}': {'name': f'api-{i}', 'replicas': i % 7, 'tags': ['a', 'b'], 'on': True}
+        for i in range(count)
+    }
+
+
+def measure(label: str, data: dict, directory: Path) -> None:
+    write_yaml(data, directory / 'source.yml', mode='safe')
+    size = (directory / 'source.yml').stat().st_size
+
+    for mode in MODES:
+        path = directory / f'{mode}.yml'
+
+        start = time.perf_counter()
+        write_yaml(data, path, mode=mode)
+        write_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        read_yaml(path, mode=mode)
+        read_time = time.perf_counter() - start
+
+        print(
+            f'{label:>5} ({size:>11,} bytes) mode={mode:<4} '
+            f'write={write_time * 1000:10.1f} ms  read={read_time * 1000:10.1f} ms'
+        )
+
+
+def main() -> None:
+    labels = sys.argv[1:] or list(SIZES)
+    with tempfile.TemporaryDirectory() as tmp:
+        for label in labels:
+            measure(label, sample_data(SIZES[label]), Path(tmp))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,18 +1,205 @@
-from abara_file_io.ini import read_ini, write_ini
-from abara_file_io.json import read_json, write_json
-from abara_file_io.text import read_text, write_text
-from abara_file_io.toml import read_toml, write_toml
-from abara_file_io.yaml import read_yaml, write_yaml
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from abara_file_io.aio import (
+        aread_ini,
+        aread_json,
+        aread_many,
+        aread_text,
+        aread_toml,
+        aread_yaml,
+        awrite_ini,
+        awrite_json,
+        awrite_text,
+        awrite_toml,
+        awrite_yaml,
+        configure_async_executor,
+    )
+    from abara_file_io.batch import ReadResult, iter_read_many, parse_many, read_many
+    from abara_file_io.binary import read_bytes
+    from abara_file_io.cache import (
+        clear_artifact_cache,
+        clear_read_cache,
+        configure_artifact_cache,
+        configure_read_cache,
+        read_cache_info,
+    )
+    from abara_file_io.coalescing import CoalescingWriter
+    from abara_file_io.common_io_wrapper import (
+        EncodingCandidate,
+        WriteResult,
+        clear_encoding_memo,
+        configure_compression_level,
+        configure_encoding_memo,
+        configure_mmap_threshold,
+        detect_encoding,
+    )
+    from abara_file_io.ini import read_ini, read_ini_lazy, update_ini, write_ini
+    from abara_file_io.json import read_json, update_json, write_json
+    from abara_file_io.json_path import iter_json_items, read_json_path
+    from abara_file_io.jsonl import append_jsonl, iter_jsonl, write_jsonl
+    from abara_file_io.lazy import LazySections
+    from abara_file_io.pickle import read_pickle, write_pickle
+    from abara_file_io.text import (
+        iter_text_chunks,
+        iter_text_lines,
+        read_text,
+        read_text_range,
+        tail_text,
+        update_text,
+        write_text,
+    )
+    from abara_file_io.toml import read_toml, read_toml_lazy, update_toml, write_toml
+    from abara_file_io.yaml import (
+        iter_yaml_documents,
+        read_yaml,
+        update_yaml,
+        write_yaml,
+        write_yaml_documents,
+    )
+
+# 各関数は最初に参照された時にモジュールを読み込む(PEP 562)
+# read_jsonだけを使う場合にruamel.yamlやcharset-normalizerを読み込まずに済ませるため
+_LAZY_IMPORTS: dict[str, str] = {
+    'CoalescingWriter': 'abara_file_io.coalescing',
+    'EncodingCandidate': 'abara_file_io.common_io_wrapper',
+    'LazySections': 'abara_file_io.lazy',
+    'ReadResult': 'abara_file_io.batch',
+    'WriteResult': 'abara_file_io.common_io_wrapper',
+    'append_jsonl': 'abara_file_io.jsonl',
+    'aread_ini': 'abara_file_io.aio',
+    'aread_json': 'abara_file_io.aio',
+    'aread_many': 'abara_file_io.aio',
+    'aread_text': 'abara_file_io.aio',
+    'aread_toml': 'abara_file_io.aio',
+    'aread_yaml': 'abara_file_io.aio',
+    'awrite_ini': 'abara_file_io.aio',
+    'awrite_json': 'abara_file_io.aio',
+    'awrite_text': 'abara_file_io.aio',
+    'awrite_toml': 'abara_file_io.aio',
+    'awrite_yaml': 'abara_file_io.aio',
+    'clear_artifact_cache': 'abara_file_io.cache',
+    'clear_encoding_memo': 'abara_file_io.common_io_wrapper',
+    'clear_read_cache': 'abara_file_io.cache',
+    'configure_artifact_cache': 'abara_file_io.cache',
+    'configure_async_executor': 'abara_file_io.aio',
+    'configure_compression_level': 'abara_file_io.common_io_wrapper',
+    'configure_encoding_memo': 'abara_file_io.common_io_wrapper',
+    'configure_mmap_threshold': 'abara_file_io.common_io_wrapper',
+    'configure_read_cache': 'abara_file_io.cache',
+    'detect_encoding': 'abara_file_io.common_io_wrapper',
+    'iter_json_items': 'abara_file_io.json_path',
+    'iter_jsonl': 'abara_file_io.jsonl',
+    'iter_read_many': 'abara_file_io.batch',
+    'iter_text_chunks': 'abara_file_io.text',
+    'iter_text_lines': 'abara_file_io.text',
+    'iter_yaml_documents': 'abara_file_io.yaml',
+    'parse_many': 'abara_file_io.batch',
+    'read_bytes': 'abara_file_io.binary',
+    'read_cache_info': 'abara_file_io.cache',
+    'read_ini': 'abara_file_io.ini',
+    'read_ini_lazy': 'abara_file_io.ini',
+    'read_json': 'abara_file_io.json',
+    'read_json_path': 'abara_file_io.json_path',
+    'read_many': 'abara_file_io.batch',
+    'read_pickle': 'abara_file_io.pickle',
+    'read_text': 'abara_file_io.text',
+    'read_text_range': 'abara_file_io.text',
+    'read_toml': 'abara_file_io.toml',
+    'read_toml_lazy': 'abara_file_io.toml',
+    'read_yaml': 'abara_file_io.yaml',
+    'tail_text': 'abara_file_io.text',
+    'update_ini': 'abara_file_io.ini',
+    'update_json': 'abara_file_io.json',
+    'update_text': 'abara_file_io.text',
+    'update_toml': 'abara_file_io.toml',
+    'update_yaml': 'abara_file_io.yaml',
+    'write_ini': 'abara_file_io.ini',
+    'write_json': 'abara_file_io.json',
+    'write_jsonl': 'abara_file_io.jsonl',
+    'write_pickle': 'abara_file_io.pickle',
+    'write_text': 'abara_file_io.text',
+    'write_toml': 'abara_file_io.toml',
+    'write_yaml': 'abara_file_io.yaml',
+    'write_yaml_documents': 'abara_file_io.yaml',
+}
 
 __all__ = [
+    'CoalescingWriter',
+    'EncodingCandidate',
+    'LazySections',
+    'ReadResult',
+    'WriteResult',
+    'append_jsonl',
+    'aread_ini',
+    'aread_json',
+    'aread_many',
+    'aread_text',
+    'aread_toml',
+    'aread_yaml',
+    'awrite_ini',
+    'awrite_json',
+    'awrite_text',
+    'awrite_toml',
+    'awrite_yaml',
+    'clear_artifact_cache',
+    'clear_encoding_memo',
+    'clear_read_cache',
+    'configure_artifact_cache',
+    'configure_async_executor',
+    'configure_compression_level',
+    'configure_encoding_memo',
+    'configure_mmap_threshold',
+    'configure_read_cache',
+    'detect_encoding',
+    'iter_json_items',
+    'iter_jsonl',
+    'iter_read_many',
+    'iter_text_chunks',
+    'iter_text_lines',
+    'iter_yaml_documents',
+    'parse_many',
+    'read_bytes',
+    'read_cache_info',
     'read_ini',
+    'read_ini_lazy',
     'read_json',
+    'read_json_path',
+    'read_many',
+    'read_pickle',
     'read_text',
+    'read_text_range',
     'read_toml',
+    'read_toml_lazy',
     'read_yaml',
+    'tail_text',
+    'update_ini',
+    'update_json',
+    'update_text',
+    'update_toml',
+    'update_yaml',
     'write_ini',
     'write_json',
+    'write_jsonl',
+    'write_pickle',
     'write_text',
     'write_toml',
     'write_yaml',
+    'write_yaml_documents',
 ]
+
+
+def __getattr__(name: str) -> object:
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        msg = f'module {__name__!r} has no attribute {name!r}'
+        raise AttributeError(msg)
+
+    value = getattr(import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
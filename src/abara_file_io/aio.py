@@ -0,0 +1,323 @@
+import asyncio
+import threading
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from logging import getLogger
+from os import PathLike
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal, TypeVar
+
+from abara_file_io.batch import ReadResult, _read_one
+from abara_file_io.cache import CacheMode
+from abara_file_io.common_io_wrapper import Durability, WriteResult
+from abara_file_io.formats import FileFormat
+
+if TYPE_CHECKING:
+    from abara_file_io.ini import IniConfigValue, IniEngine
+    from abara_file_io.json import JsonBackend
+    from abara_file_io.yaml import YamlMode
+
+log = getLogger(__name__)
+
+
+T = TypeVar('T')
+
+DEFAULT_CONCURRENCY = 16
+"""aread_manyで同時に読み込むファイル数の既定値"""
+
+_executor: ThreadPoolExecutor | None = None
+_executor_max_workers: int | None = None
+_executor_lock = threading.Lock()
+
+
+def configure_async_executor(max_workers: int | None = None) -> None:
+    """非同期関数がファイルの読み書きに使うスレッドプールを設定する
+
+    イベントループの既定のexecutorとは別の専用のスレッドプールを使うので、
+    ファイルの読み書きが他のrun_in_executorの処理を待たせることはない
+    既存のスレッドプールは実行中の処理の完了後に終了する
+
+    Args:
+        max_workers (int | None): スレッド数の上限
+            Noneの場合はThreadPoolExecutorの既定値. Defaults to None.
+    """
+    global _executor, _executor_max_workers  # noqa: PLW0603
+    with _executor_lock:
+        old_executor = _executor
+        _executor = None
+        _executor_max_workers = max_workers
+    if old_executor is not None:
+        old_executor.shutdown(wait=False)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """専用のスレッドプールを返す、最初に呼ばれた時に作成する"""
+    global _executor  # noqa: PLW0603
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=_executor_max_workers, thread_name_prefix='abara_file_io_async'
+            )
+        return _executor
+
+
+async def _run_in_executor(func: Callable[[], T]) -> T:
+    """同期関数を専用のスレッドプールで実行し、完了を待つ"""
+    return await asyncio.get_running_loop().run_in_executor(_get_executor(), func)
+
+
+async def aread_text(path: str | PathLike[str], *, lock: bool = False) -> str:
+    """read_textの非同期版
+
+    Returns:
+        str: 読み込んだ文字列、もしファイルが読み込めない場合は空文字列を返す
+    """
+    from abara_file_io.text import read_text  # noqa: PLC0415
+
+    return await _run_in_executor(partial(read_text, path, lock=lock))
+
+
+async def awrite_text(
+    data: str,
+    path: str | PathLike[str],
+    *,
+    atomic: bool = False,
+    durability: Durability = 'none',
+    skip_unchanged: bool = False,
+) -> WriteResult:
+    """write_textの非同期版
+
+    Returns:
+        WriteResult: 書き込んだらWRITTEN、内容が同じで書き込まなかったらUNCHANGED、
+            失敗したらFAILED(偽)
+    """
+    from abara_file_io.text import write_text  # noqa: PLC0415
+
+    return await _run_in_executor(
+        partial(
+            write_text,
+            data,
+            path,
+            atomic=atomic,
+            durability=durability,
+            skip_unchanged=skip_unchanged,
+        )
+    )
+
+
+async def aread_json(
+    path: str | PathLike[str], *, cache: CacheMode | None = None, lock: bool = False
+) -> dict:
+    """read_jsonの非同期版
+
+    Returns:
+        dict: 辞書
+    """
+    from abara_file_io.json import read_json  # noqa: PLC0415
+
+    return await _run_in_executor(partial(read_json, path, cache=cache, lock=lock))
+
+
+async def awrite_json(
+    data: dict,
+    path: str | PathLike[str],
+    *,
+    ensure_ascii: bool = False,
+    compact: bool = False,
+    backend: 'JsonBackend' = 'json',
+    atomic: bool = False,
+    durability: Durability = 'none',
+    skip_unchanged: bool = False,
+) -> WriteResult:
+    """write_jsonの非同期版
+
+    Returns:
+        WriteResult: 書き込んだらWRITTEN、内容が同じで書き込まなかったらUNCHANGED、
+            失敗したらFAILED(偽)
+    """
+    from abara_file_io.json import write_json  # noqa: PLC0415
+
+    return await _run_in_executor(
+        partial(
+            write_json,
+            data,
+            path,
+            ensure_ascii=ensure_ascii,
+            compact=compact,
+            backend=backend,
+            atomic=atomic,
+            durability=durability,
+            skip_unchanged=skip_unchanged,
+        )
+    )
+
+
+async def aread_yaml(
+    path: str | PathLike[str],
+    *,
+    mode: 'YamlMode' = 'rt',
+    cache: CacheMode | None = None,
+    lock: bool = False,
+) -> dict:
+    """read_yamlの非同期版
+
+    Returns:
+        dict: 読み込んだ辞書
+    """
+    from abara_file_io.yaml import read_yaml  # noqa: PLC0415
+
+    return await _run_in_executor(partial(read_yaml, path, mode=mode, cache=cache, lock=lock))
+
+
+async def awrite_yaml(
+    data: list | dict,
+    path: str | PathLike[str],
+    *,
+    mode: 'YamlMode' = 'rt',
+    atomic: bool = False,
+    durability: Durability = 'none',
+    skip_unchanged: bool = False,
+) -> WriteResult:
+    """write_yamlの非同期版
+
+    Returns:
+        WriteResult: 書き込んだらWRITTEN、内容が同じで書き込まなかったらUNCHANGED、
+            失敗したらFAILED(偽)
+    """
+    from abara_file_io.yaml import write_yaml  # noqa: PLC0415
+
+    return await _run_in_executor(
+        partial(
+            write_yaml,
+            data,
+            path,
+            mode=mode,
+            atomic=atomic,
+            durability=durability,
+            skip_unchanged=skip_unchanged,
+        )
+    )
+
+
+async def aread_toml(
+    path: str | PathLike[str], *, cache: CacheMode | None = None, lock: bool = False
+) -> dict:
+    """read_tomlの非同期版
+
+    Returns:
+        dict: 読み込んだ辞書
+    """
+    from abara_file_io.toml import read_toml  # noqa: PLC0415
+
+    return await _run_in_executor(partial(read_toml, path, cache=cache, lock=lock))
+
+
+async def awrite_toml(
+    data: dict,
+    path: str | PathLike[str],
+    *,
+    atomic: bool = False,
+    durability: Durability = 'none',
+    skip_unchanged: bool = False,
+) -> WriteResult:
+    """write_tomlの非同期版
+
+    Returns:
+        WriteResult: 書き込んだらWRITTEN、内容が同じで書き込まなかったらUNCHANGED、
+            失敗したらFAILED(偽)
+    """
+    from abara_file_io.toml import write_toml  # noqa: PLC0415
+
+    return await _run_in_executor(
+        partial(
+            write_toml,
+            data,
+            path,
+            atomic=atomic,
+            durability=durability,
+            skip_unchanged=skip_unchanged,
+        )
+    )
+
+
+async def aread_ini(
+    path: str | PathLike[str],
+    *,
+    cache: CacheMode | None = None,
+    lock: bool = False,
+    engine: 'IniEngine' = 'fast',
+) -> 'dict[str, IniConfigValue] | dict[str, dict[str, IniConfigValue]]':
+    """read_iniの非同期版
+
+    Returns:
+        dict[str, IniConfigValue] | dict[str, dict[str, IniConfigValue]]:
+            IniConfigValueはiniに保存できるstr,int,float,boolの4種類のどれか
+    """
+    from abara_file_io.ini import read_ini  # noqa: PLC0415
+
+    return await _run_in_executor(partial(read_ini, path, cache=cache, lock=lock, engine=engine))
+
+
+async def awrite_ini(
+    data: 'dict[str, IniConfigValue] | dict[str, dict[str, IniConfigValue]]',
+    path: str | PathLike[str],
+    *,
+    atomic: bool = False,
+    durability: Durability = 'none',
+    skip_unchanged: bool = False,
+) -> WriteResult:
+    """write_iniの非同期版
+
+    Returns:
+        WriteResult: 書き込んだらWRITTEN、内容が同じで書き込まなかったらUNCHANGED、
+            失敗したらFAILED(偽)
+    """
+    from abara_file_io.ini import write_ini  # noqa: PLC0415
+
+    return await _run_in_executor(
+        partial(
+            write_ini,
+            data,
+            path,
+            atomic=atomic,
+            durability=durability,
+            skip_unchanged=skip_unchanged,
+        )
+    )
+
+
+async def aread_many(
+    paths: Iterable[str | PathLike[str]],
+    fmt: FileFormat | Literal['auto'] = 'auto',
+    *,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> list[ReadResult]:
+    """複数のファイルを非同期に並列で読み込む
+
+    同時に読み込むファイル数をconcurrencyで制限するので、大量のパスを渡しても
+    専用のスレッドプールを占有し続けることはない
+    read_manyと同様に、失敗したファイルはReadResult.errorに例外が格納される
+
+    Args:
+        paths (Iterable[str | PathLike[str]]): 読み込むファイルのパス
+        fmt (FileFormat | Literal['auto']): ファイルの形式
+            'auto'の場合はファイルごとに拡張子から判定する. Defaults to 'auto'.
+        concurrency (int): 同時に読み込むファイル数の上限. Defaults to DEFAULT_CONCURRENCY.
+
+    Raises:
+        ValueError: concurrencyが1未満の場合
+
+    Returns:
+        list[ReadResult]: pathsと同じ順番の結果
+    """
+    if concurrency < 1:
+        msg = f'concurrencyは1以上を指定してください: {concurrency}'
+        raise ValueError(msg)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def read_one(path: Path) -> ReadResult:
+        async with semaphore:
+            return await _run_in_executor(partial(_read_one, path, fmt))
+
+    return await asyncio.gather(*(read_one(Path(path)) for path in paths))
@@ -0,0 +1,172 @@
+import os
+import pickle
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from logging import getLogger
+from os import PathLike
+from pathlib import Path
+from typing import Any, Literal, NamedTuple
+
+from abara_file_io.common_io_wrapper import common_file_read
+from abara_file_io.formats import FileFormat, format_from_path, format_reader
+
+log = getLogger(__name__)
+
+
+class ReadResult(NamedTuple):
+    """一括読み込みでのファイルごとの結果"""
+
+    path: Path
+    """読み込んだファイルのパス"""
+    data: Any
+    """読み込んだデータ、失敗した場合はNone"""
+    error: Exception | None = None
+    """読み込みに失敗した場合の例外"""
+
+    @property
+    def ok(self) -> bool:
+        """読み込みに成功したか"""
+        return self.error is None
+
+
+def _read_one(path: Path, fmt: FileFormat | Literal['auto']) -> ReadResult:
+    """1ファイルを読み込み、失敗した場合は例外を結果に格納する
+
+    ファイルごとにログを出力せず、失敗の内容は呼び出し元で判断する
+    """
+    try:
+        reader = format_reader(format_from_path(path) if fmt == 'auto' else fmt)
+        data = common_file_read(reader.func, path, mode=reader.mode)
+    except Exception as e:  # noqa: BLE001
+        return ReadResult(path=path, data=None, error=e)
+    return ReadResult(path=path, data=data)
+
+
+def _read_one_in_process(path: Path, fmt: FileFormat | Literal['auto']) -> ReadResult:
+    """子プロセスで1ファイルを読み込む
+
+    pickleできない例外は親プロセスに返せず一括読み込み全体が失敗するので、
+    型名とメッセージを保持したRuntimeErrorに置き換える
+    """
+    result = _read_one(path, fmt)
+    if result.error is not None:
+        try:
+            pickle.dumps(result.error)
+        except Exception:  # noqa: BLE001
+            message = f'{type(result.error).__name__}: {result.error}'
+            return result._replace(error=RuntimeError(message))
+    return result
+
+
+def _default_chunksize(count: int, max_workers: int | None) -> int:
+    """1ワーカーあたり4回程度の受け渡しで済むchunksizeを返す"""
+    workers = max_workers or os.cpu_count() or 1
+    return max(1, count // (workers * 4))
+
+
+def iter_read_many(
+    paths: Iterable[str | PathLike[str]],
+    fmt: FileFormat | Literal['auto'] = 'auto',
+    *,
+    max_workers: int | None = None,
+    ordered: bool = True,
+) -> Iterator[ReadResult]:
+    """複数のファイルをスレッドプールで並列に読み込み、順次結果を返す
+
+    ネットワークファイルシステムなど、open・statの待ち時間が大きい環境で
+    多数の小さなファイルを読み込む場合に、待ち時間を重ねて短縮する
+
+    Args:
+        paths (Iterable[str | PathLike[str]]): 読み込むファイルのパス
+        fmt (FileFormat | Literal['auto']): ファイルの形式
+            'auto'の場合はファイルごとに拡張子から判定する. Defaults to 'auto'.
+        max_workers (int | None): スレッド数の上限
+            Noneの場合はThreadPoolExecutorの既定値. Defaults to None.
+        ordered (bool): Trueの場合はpathsの順番、Falseの場合は読み込みが終わった順に返す.
+            Defaults to True.
+
+    Yields:
+        ReadResult: ファイルごとの結果
+    """
+    path_list = [Path(path) for path in paths]
+    if len(path_list) == 0:
+        return
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='abara_file_io')
+    try:
+        futures = [executor.submit(_read_one, path, fmt) for path in path_list]
+        for future in futures if ordered else as_completed(futures):
+            yield future.result()
+    finally:
+        # 途中で反復をやめた場合は、まだ始まっていない読み込みを取り消す
+        executor.shutdown(cancel_futures=True)
+
+
+def read_many(
+    paths: Iterable[str | PathLike[str]],
+    fmt: FileFormat | Literal['auto'] = 'auto',
+    *,
+    max_workers: int | None = None,
+) -> list[ReadResult]:
+    """複数のファイルをスレッドプールで並列に読み込む
+
+    read_jsonなどと異なり、失敗したファイルは空の値ではなく、ReadResult.errorに例外が格納される
+
+    Args:
+        paths (Iterable[str | PathLike[str]]): 読み込むファイルのパス
+        fmt (FileFormat | Literal['auto']): ファイルの形式
+            'auto'の場合はファイルごとに拡張子から判定する. Defaults to 'auto'.
+        max_workers (int | None): スレッド数の上限
+            Noneの場合はThreadPoolExecutorの既定値. Defaults to None.
+
+    Returns:
+        list[ReadResult]: pathsと同じ順番の結果
+    """
+    return list(iter_read_many(paths, fmt, max_workers=max_workers))
+
+
+def parse_many(
+    paths: Iterable[str | PathLike[str]],
+    fmt: FileFormat | Literal['auto'] = 'auto',
+    *,
+    max_workers: int | None = None,
+    chunksize: int | None = None,
+    executor: Executor | None = None,
+) -> list[ReadResult]:
+    """複数のファイルをプロセスプールで並列に読み込む
+
+    ruamel.yamlやconfigparserのパースはpure Pythonで、GILのためスレッドでは並列化されない
+    子プロセスがファイルの読み込みからパースまでを行い、pickleした結果だけを受け取る
+    受け渡しの回数を減らすため、複数のファイルをchunksize単位でまとめて子プロセスに渡す
+    プロセスの起動コストが大きいので、小さなファイルが少数の場合はread_manyの方が速い
+
+    Args:
+        paths (Iterable[str | PathLike[str]]): 読み込むファイルのパス
+        fmt (FileFormat | Literal['auto']): ファイルの形式
+            'auto'の場合はファイルごとに拡張子から判定する. Defaults to 'auto'.
+        max_workers (int | None): プロセス数の上限
+            Noneの場合はProcessPoolExecutorの既定値. Defaults to None.
+        chunksize (int | None): 子プロセスに一度に渡すファイル数
+            巨大なファイルを読み込む場合は1を指定すると負荷が偏らない
+            Noneの場合はプロセスあたり4回程度になるように決める. Defaults to None.
+        executor (Executor | None): 使用するProcessPoolExecutor
+            指定すると呼び出しごとにプロセスを起動せず、既存のワーカーを再利用する
+            Noneの場合は呼び出しごとに作成して終了する. Defaults to None.
+
+    Returns:
+        list[ReadResult]: pathsと同じ順番の結果
+    """
+    path_list = [Path(path) for path in paths]
+    if len(path_list) == 0:
+        return []
+
+    if chunksize is None:
+        chunksize = _default_chunksize(len(path_list), max_workers)
+    fmts = [fmt] * len(path_list)
+
+    pool = executor or ProcessPoolExecutor(max_workers=max_workers)
+    try:
+        return list(pool.map(_read_one_in_process, path_list, fmts, chunksize=chunksize))
+    finally:
+        if executor is None:
+            pool.shutdown()
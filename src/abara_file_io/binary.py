@@ -0,0 +1,49 @@
+import mmap
+import os
+from logging import getLogger
+from os import PathLike
+from typing import IO, Any
+
+from abara_file_io.common_io_wrapper import common_file_read_exception_handling
+
+log = getLogger(__name__)
+
+
+def _read_bytes_core(f: IO[Any]) -> memoryview:
+    size = os.fstat(f.fileno()).st_size
+    if size < mmap.ALLOCATIONGRANULARITY:
+        # 小さなファイルはmmapの準備の方が高くつく
+        return memoryview(f.read())
+    return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def read_bytes(path: str | PathLike[str], *, copy: bool = True) -> memoryview:
+    """ファイルの内容をバイト列として読み込む
+
+    copy=Falseの場合はファイルをmmapし、コピーせずにマップしたメモリーを参照するmemoryviewを返す
+    ページは参照された時にOSが読み込むので、巨大なファイルの一部だけを使う場合にも速い
+    mmapは返したmemoryviewとそのスライスが全て解放された時に閉じられる
+
+    マップしたファイルを切り詰めたり書き換えたりすると、memoryviewに触れた時点でプロセスが
+    SIGBUSで異常終了する。write_textなどの既定のatomic=Falseの書き込みはファイルをその場で
+    切り詰めるので、copy=Falseで読み込んだファイルへはatomic=Trueで書き込むか、
+    先にbytes(view)でコピーしておくこと
+
+    Args:
+        path (str | PathLike[str]): 開くファイルのパス
+        copy (bool): Trueの場合はファイルの内容をメモリーに読み込み、後からファイルが
+            書き換えられても影響しないmemoryviewを返す
+            Falseの場合はALLOCATIONGRANULARITY以上のファイルをmmapする. Defaults to True.
+
+    Returns:
+        memoryview: 読み込み専用のバイト列、もしファイルが読み込めない場合は空のmemoryviewを返す
+    """
+
+    def read_bytes_core(f: IO[Any]) -> memoryview:
+        if copy:
+            return memoryview(f.read())
+        return _read_bytes_core(f)
+
+    return common_file_read_exception_handling(
+        func=read_bytes_core, return_empty_value=memoryview(b''), path=path, decode=False
+    )
@@ -0,0 +1,410 @@
+import copy
+import os
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from logging import getLogger
+from os import PathLike
+from pathlib import Path
+from typing import Literal, NamedTuple, NoReturn, TypeVar, cast
+
+from abara_file_io.common_io_wrapper import FileIdentity, file_identity
+
+log = getLogger(__name__)
+
+
+T = TypeVar('T', bound=object)
+
+type CacheMode = Literal['copy', 'frozen']
+
+
+def _readonly(*_args: object, **_kwargs: object) -> NoReturn:
+    msg = 'キャッシュされた読み込み結果は変更できません'
+    raise TypeError(msg)
+
+
+class FrozenDict(dict):
+    """変更操作を禁止したdict
+
+    cache='frozen'で読み込んだ結果として返され、複数の呼び出し元で共有される
+    """
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self) -> tuple[type['FrozenDict'], tuple[dict]]:
+        return (FrozenDict, (dict(self),))
+
+    def __copy__(self) -> dict:
+        return dict(self)
+
+    def __deepcopy__(self, memo: dict) -> dict:
+        return {key: copy.deepcopy(value, memo) for key, value in self.items()}
+
+
+class FrozenList(list):
+    """変更操作を禁止したlist
+
+    cache='frozen'で読み込んだ結果の中のlistとして返される
+    """
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = clear = extend = insert = pop = remove = reverse = sort = _readonly
+
+    def __reduce__(self) -> tuple[type['FrozenList'], tuple[list]]:
+        return (FrozenList, (list(self),))
+
+    def __copy__(self) -> list:
+        return list(self)
+
+    def __deepcopy__(self, memo: dict) -> list:
+        return [copy.deepcopy(value, memo) for value in self]
+
+
+def freeze(data: object) -> object:
+    """dictとlistを再帰的に変更不可能なFrozenDictとFrozenListに変換する
+
+    Args:
+        data (object): 変換する値
+
+    Returns:
+        object: 変換された値、dictとlist以外はそのまま返す
+    """
+    if isinstance(data, dict):
+        return FrozenDict((key, freeze(value)) for key, value in data.items())
+    if isinstance(data, list):
+        return FrozenList(freeze(value) for value in cast('Iterable[object]', data))
+    return data
+
+
+class CacheInfo(NamedTuple):
+    """読み込み結果のキャッシュの統計情報
+
+    Attributes:
+        hits (int): キャッシュから結果を返した回数
+        misses (int): ファイルを読み込んだ回数
+        maxsize (int): 保持するファイル数の上限
+        max_bytes (int): 保持するファイルサイズ合計の上限
+        currsize (int): 保持しているファイル数
+        currbytes (int): 保持しているファイルサイズの合計
+    """
+
+    hits: int
+    misses: int
+    maxsize: int
+    max_bytes: int
+    currsize: int
+    currbytes: int
+
+
+class _CacheEntry:
+    __slots__ = ('frozen', 'identity', 'size', 'value')
+
+    def __init__(self, identity: FileIdentity, value: object) -> None:
+        self.identity = identity
+        self.value = value
+        self.size = identity[3]
+        self.frozen: object = None
+
+
+class ParsedResultCache:
+    """パース済みの読み込み結果を保持するLRUキャッシュ
+
+    エントリーはos.statで取得した(デバイス, inode, 更新時刻(ns), サイズ)で検証され、
+    ファイルが更新されていれば読み込み直す
+    保持するファイル数とファイルサイズの合計のどちらかが上限を超えると古いものから破棄する
+    """
+
+    def __init__(self, maxsize: int = 128, max_bytes: int = 64 * 1024 * 1024) -> None:
+        """初期化
+
+        Args:
+            maxsize (int): 保持するファイル数の上限. Defaults to 128.
+            max_bytes (int): 保持するファイルサイズ合計の上限. Defaults to 64MiB.
+        """
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[str, str], _CacheEntry] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple[str, str], identity: FileIdentity) -> _CacheEntry | None:
+        """ファイルが更新されていなければエントリーを返す
+
+        Args:
+            key (tuple[str, str]): (形式, 絶対パス)
+            identity (FileIdentity): 現在のファイルのfile_identity
+
+        Returns:
+            _CacheEntry | None: キャッシュのエントリー、無いか古い場合はNone
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.identity != identity:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: tuple[str, str], identity: FileIdentity, value: object) -> _CacheEntry:
+        """読み込み結果を保持する
+
+        Returns:
+            _CacheEntry: 保持したエントリー
+        """
+        entry = _CacheEntry(identity, value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            if entry.size > self.max_bytes:
+                return entry
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while len(self._entries) > self.maxsize or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+        return entry
+
+    def info(self) -> CacheInfo:
+        """統計情報を返す
+
+        Returns:
+            CacheInfo: ヒット数、ミス数、上限、現在の保持数
+        """
+        with self._lock:
+            return CacheInfo(
+                hits=self.hits,
+                misses=self.misses,
+                maxsize=self.maxsize,
+                max_bytes=self.max_bytes,
+                currsize=len(self._entries),
+                currbytes=self._bytes,
+            )
+
+    def clear(self) -> None:
+        """保持している結果と統計情報を全て破棄する"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+
+_read_cache = ParsedResultCache()
+
+_ARTIFACT_FORMAT_VERSION = 1
+"""永続キャッシュのファイル形式のバージョン、形式を変更した場合は値を上げる"""
+
+_artifact_directory: Path | None = None
+
+
+def configure_read_cache(maxsize: int = 128, max_bytes: int = 64 * 1024 * 1024) -> None:
+    """read_*関数のcache引数で使う、読み込み結果のキャッシュの上限を設定する
+
+    設定を変更すると、それまでに保持していた結果と統計情報は破棄される
+
+    Args:
+        maxsize (int): 保持するファイル数の上限. Defaults to 128.
+        max_bytes (int): 保持するファイルサイズ合計の上限. Defaults to 64MiB.
+    """
+    global _read_cache  # noqa: PLW0603
+    _read_cache = ParsedResultCache(maxsize=maxsize, max_bytes=max_bytes)
+
+
+def read_cache_info() -> CacheInfo:
+    """読み込み結果のキャッシュの統計情報を返す
+
+    Returns:
+        CacheInfo: ヒット数、ミス数、上限、現在の保持数
+    """
+    return _read_cache.info()
+
+
+def clear_read_cache() -> None:
+    """読み込み結果のキャッシュを全て破棄する"""
+    _read_cache.clear()
+
+
+def configure_artifact_cache(directory: str | PathLike[str] | None) -> None:
+    """パース済みの読み込み結果をファイルとして保存する、永続キャッシュの保存先を設定する
+
+    設定すると、read_yaml、read_toml、read_iniはパース結果をpickleとして保存し、
+    ファイルが更新されていなければ次回以降はパースせずにpickleを読み込む
+    プロセスを再起動しても有効なので、起動時の読み込みが速くなる
+    保存先のpickleは読み込み時に実行されるので、信頼できるディレクトリを指定すること
+
+    Args:
+        directory (str | PathLike[str] | None): 保存先のディレクトリ、Noneで永続キャッシュを無効化
+    """
+    global _artifact_directory  # noqa: PLW0603
+    _artifact_directory = None if directory is None else Path(directory)
+
+
+def clear_artifact_cache() -> None:
+    """永続キャッシュの保存先に保存したファイルを全て削除する"""
+    directory = _artifact_directory
+    if directory is None:
+        return
+    for i in directory.glob('*.pickle'):
+        i.unlink(missing_ok=True)
+
+
+def _artifact_path(directory: Path, kind: str, abs_path: Path) -> Path:
+    import hashlib  # noqa: PLC0415
+
+    digest = hashlib.sha256(os.fsencode(abs_path)).hexdigest()[:32]
+    return directory / f'{kind}-{digest}.pickle'
+
+
+def _artifact_tag(kind: str, identity: FileIdentity) -> tuple:
+    return (_ARTIFACT_FORMAT_VERSION, sys.version_info[:2], kind, identity)
+
+
+def _load_artifact(artifact: Path, tag: tuple) -> tuple[bool, object]:
+    """永続キャッシュを読み込む
+
+    Returns:
+        tuple[bool, object]: (読み込めたか, パース結果)
+    """
+    import pickle  # noqa: PLC0415
+
+    try:
+        with artifact.open(mode='rb') as f:
+            saved_tag, value = pickle.load(f)  # noqa: S301
+    except FileNotFoundError:
+        return False, None
+    except Exception:  # noqa: BLE001
+        log.debug(f'永続キャッシュが壊れているので無視します: {artifact}')
+        return False, None
+
+    if saved_tag != tag:
+        return False, None
+    return True, value
+
+
+def _store_artifact(artifact: Path, tag: tuple, value: object) -> None:
+    """永続キャッシュを一時ファイル経由で置き換えて保存する"""
+    import pickle  # noqa: PLC0415
+
+    tmp = artifact.with_name(f'.{artifact.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+    try:
+        artifact.parent.mkdir(parents=True, exist_ok=True)
+        with tmp.open(mode='wb') as f:
+            pickle.dump((tag, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(artifact)
+    except (OSError, pickle.PicklingError, TypeError, AttributeError):
+        log.warning(f'永続キャッシュを保存できませんでした: {artifact}')
+        tmp.unlink(missing_ok=True)
+
+
+def _load_through_artifact(
+    kind: str, abs_path: Path, identity: FileIdentity, loader: Callable[[], T]
+) -> T:
+    """永続キャッシュが有効であれば、パースせずに永続キャッシュから読み込む
+
+    Returns:
+        T: loaderの戻り値、もしくは永続キャッシュに保存されていたその値
+    """
+    directory = _artifact_directory
+    if directory is None:
+        return loader()
+
+    artifact = _artifact_path(directory, kind, abs_path)
+    tag = _artifact_tag(kind, identity)
+    found, value = _load_artifact(artifact, tag)
+    if found:
+        return cast('T', value)
+
+    value = loader()
+    try:
+        unchanged = file_identity(abs_path.stat()) == identity
+    except OSError:
+        unchanged = False
+    if value and unchanged:
+        _store_artifact(artifact, tag, value)
+    return value
+
+
+def _load_through_memory(
+    kind: str, abs_path: Path, identity: FileIdentity, loader: Callable[[], T], cache: CacheMode
+) -> T:
+    """プロセス内のキャッシュにあればloaderを呼び出さずに結果を返す
+
+    Returns:
+        T: loaderの戻り値のコピーか変更不可能な表現
+    """
+    cache_store = _read_cache
+    key = (kind, str(abs_path))
+    entry = cache_store.get(key, identity)
+    if entry is None:
+        value = loader()
+        try:
+            unchanged = file_identity(abs_path.stat()) == identity
+        except OSError:
+            unchanged = False
+        if not value or not unchanged:
+            return value
+        entry = cache_store.put(key, identity, value)
+        if cache == 'copy':
+            return copy.deepcopy(value)
+
+    if cache == 'frozen':
+        if entry.frozen is None:
+            entry.frozen = freeze(entry.value)
+        return cast('T', entry.frozen)
+    return copy.deepcopy(cast('T', entry.value))
+
+
+def cached_read(
+    kind: str,
+    path: str | PathLike[str],
+    loader: Callable[[], T],
+    cache: CacheMode | None,
+    *,
+    persistent: bool = False,
+) -> T:
+    """読み込み結果のキャッシュを経由してファイルを読み込む
+
+    cacheがNoneで永続キャッシュも使わない場合は、キャッシュを使わずにloaderを呼び出す
+    空の結果(読み込み失敗時の戻り値を含む)はキャッシュしない
+
+    Args:
+        kind (str): ファイル形式など、同じパスでも結果が異なる読み込み方を区別する文字列
+        path (str | PathLike[str]): 読み込むファイルのパス
+        loader (Callable[[], T]): ファイルを読み込んでパースする関数
+        cache (CacheMode | None):
+            'copy': 呼び出しごとにdeepcopyした結果を返す
+            'frozen': 呼び出し元の間で共有される、変更不可能なFrozenDictとFrozenListを返す
+            None: キャッシュを使わない
+        persistent (bool): configure_artifact_cacheで設定した永続キャッシュの対象にする
+
+    Returns:
+        T: loaderの戻り値、もしくはそのコピーか変更不可能な表現
+    """
+    use_artifact = persistent and _artifact_directory is not None
+    if cache is None and not use_artifact:
+        return loader()
+
+    abs_path = Path(path).absolute()
+    try:
+        identity = file_identity(abs_path.stat())
+    except OSError:
+        return loader()
+
+    def load() -> T:
+        if use_artifact:
+            return _load_through_artifact(kind, abs_path, identity, loader)
+        return loader()
+
+    if cache is None:
+        return load()
+    return _load_through_memory(kind, abs_path, identity, load, cache)
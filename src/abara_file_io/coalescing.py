@@ -0,0 +1,189 @@
+import atexit
+import threading
+import time
+from collections.abc import Callable
+from logging import getLogger
+from os import PathLike
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Literal, NamedTuple, Self
+
+from abara_file_io.common_io_wrapper import Durability, WriteResult
+from abara_file_io.formats import FileFormat, format_from_path, format_writer
+
+log = getLogger(__name__)
+
+
+DEFAULT_INTERVAL = 0.5
+"""CoalescingWriterが書き込み要求を受けてから実際に書き込むまでの秒数の既定値"""
+
+
+class _PendingWrite(NamedTuple):
+    func: Callable[..., Any]
+    data: object
+    options: dict[str, object]
+    due: float
+
+
+class CoalescingWriter:
+    """短時間に繰り返し書き込まれるファイルへの書き込みをまとめる
+
+    writeはファイルに書き込まずにパスごとに最新のデータだけを保持し、最初の要求から
+    interval秒後にバックグラウンドのスレッドが最新のデータだけをアトミックに書き込む
+    1秒間に何十回も更新される状態ファイルなどで、途中のデータの書き込みを省略できる
+
+    データは書き込まれるまで参照を保持し、書き込む時にシリアライズする
+    書き込みより前に変更した場合は変更後の内容が書き込まれる
+
+    終了していなければプログラムの終了時(atexit)に未書き込みのデータを書き込む
+    """
+
+    def __init__(
+        self, interval: float = DEFAULT_INTERVAL, *, durability: Durability = 'none'
+    ) -> None:
+        """初期化
+
+        Args:
+            interval (float): 最初の書き込み要求から実際に書き込むまでの秒数
+                Defaults to DEFAULT_INTERVAL.
+            durability (Durability): 書き込み完了時にfsyncする範囲
+                'none'はfsyncしない、'file'はファイル、'full'はファイルと親ディレクトリ
+                Defaults to 'none'.
+
+        Raises:
+            ValueError: intervalが負の場合
+        """
+        if interval < 0:
+            msg = f'intervalは0以上を指定してください: {interval}'
+            raise ValueError(msg)
+        self.interval = interval
+        self.durability: Durability = durability
+        self._pending: dict[Path, _PendingWrite] = {}
+        self._closed = False
+        self._condition = threading.Condition()
+        # 同じファイルへの書き込みの順序が入れ替わらないよう、書き込みは常に1つずつ行う
+        self._flush_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        atexit.register(self.close)
+
+    def write(
+        self,
+        data: object,
+        path: str | PathLike[str],
+        *,
+        fmt: FileFormat | Literal['auto'] = 'auto',
+        **options: object,
+    ) -> None:
+        """書き込みを予約する、同じパスに未書き込みのデータがあれば置き換える
+
+        Args:
+            data (object): 書き込むデータ
+            path (str | PathLike[str]): 保存するファイルパス
+            fmt (FileFormat | Literal['auto']): ファイルの形式
+                'auto'の場合は拡張子から判定する. Defaults to 'auto'.
+            **options (object): write_json等の書き込み関数に渡すキーワード引数
+                (ensure_ascii, compact等)
+
+        Raises:
+            ValueError: 終了したCoalescingWriterに書き込んだ場合か、形式を判定できない場合
+        """
+        p = Path(path).absolute()
+        func = format_writer(format_from_path(p) if fmt == 'auto' else fmt)
+
+        with self._condition:
+            if self._closed:
+                msg = f'終了したCoalescingWriterには書き込めません: {path}'
+                raise ValueError(msg)
+            pending = self._pending.get(p)
+            due = time.monotonic() + self.interval if pending is None else pending.due
+            self._pending[p] = _PendingWrite(func=func, data=data, options=options, due=due)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='abara_file_io_coalescing', daemon=True
+                )
+                self._thread.start()
+            if pending is None:
+                self._condition.notify()
+
+    def flush(self) -> dict[Path, WriteResult]:
+        """未書き込みのデータを全て直ちに書き込む
+
+        Returns:
+            dict[Path, WriteResult]: 書き込んだファイルの絶対パスと結果
+        """
+        return self._flush(due_only=False)
+
+    def close(self) -> None:
+        """バックグラウンドのスレッドを終了し、未書き込みのデータを全て書き込む
+
+        終了後のwriteはValueErrorになる。何度呼び出してもよい
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self.flush()
+        atexit.unregister(self.close)
+
+    @property
+    def pending(self) -> list[Path]:
+        """未書き込みのデータがあるファイルの絶対パス"""
+        with self._condition:
+            return list(self._pending)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def _next_timeout(self) -> float | None:
+        """次の書き込みまでの秒数、未書き込みのデータが無ければNone"""
+        if not self._pending:
+            return None
+        return min(i.due for i in self._pending.values()) - time.monotonic()
+
+    def _run(self) -> None:
+        """期限になったデータを書き込み続ける、バックグラウンドのスレッドで実行する"""
+        while True:
+            with self._condition:
+                while not self._closed:
+                    timeout = self._next_timeout()
+                    if timeout is not None and timeout <= 0:
+                        break
+                    self._condition.wait(timeout)
+                if self._closed:
+                    return
+            self._flush(due_only=True)
+
+    def _flush(self, *, due_only: bool) -> dict[Path, WriteResult]:
+        """未書き込みのデータを取り出して書き込む"""
+        results: dict[Path, WriteResult] = {}
+        with self._flush_lock:
+            with self._condition:
+                now = time.monotonic()
+                paths = [p for p, i in self._pending.items() if not due_only or i.due <= now]
+                writes = [(p, self._pending.pop(p)) for p in paths]
+            for path, pending in writes:
+                results[path] = self._write_one(path, pending)
+        return results
+
+    def _write_one(self, path: Path, pending: _PendingWrite) -> WriteResult:
+        """1ファイルをアトミックに書き込む
+
+        バックグラウンドのスレッドを止めないよう、シリアライズの失敗などの例外は警告にする
+        """
+        try:
+            return pending.func(
+                pending.data, path, atomic=True, durability=self.durability, **pending.options
+            )
+        except Exception as e:  # noqa: BLE001
+            log.warning(f'遅延書き込みに失敗しました({type(e).__name__}: {e}): {path}')
+            return WriteResult.FAILED
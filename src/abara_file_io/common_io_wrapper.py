@@ -1,35 +1,775 @@
-from collections.abc import Callable
+import codecs
+import json
+import mmap
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from enum import IntEnum
+from functools import cache
+from importlib import import_module
+from io import BytesIO, TextIOBase, TextIOWrapper
+from itertools import chain
 from logging import getLogger
 from os import PathLike
 from pathlib import Path
-from typing import IO, Any, Literal, TypeVar
-
-from charset_normalizer import from_path
-from ruamel.yaml.parser import ParserError
+from types import ModuleType
+from typing import IO, Any, Literal, NamedTuple, TypeVar, cast
 
 log = getLogger(__name__)
 
 
 T = TypeVar('T', bound=object)
 
+type EncodingTier = Literal['bom', 'prefix', 'sample', 'full']
+
+type Durability = Literal['none', 'file', 'full']
+
+type Compression = Literal['gzip', 'bz2', 'xz']
+
+ENCODING_PREFIX_SIZE = 64 * 1024
+"""BOM以外の簡易判定に使う、ファイル先頭のバイト数"""
+
+ENCODING_SAMPLE_SIZE = 1024 * 1024
+"""charset-normalizerに渡す標本のバイト数"""
+
+MMAP_THRESHOLD = 16 * 1024 * 1024
+"""テキストモードの読み込みでmmapを使うファイルサイズの既定値"""
+
+COMPARE_CHUNK_SIZE = 1024 * 1024
+"""skip_unchangedで既存のファイルと比較する時に一度に読み込むバイト数"""
+
+DEFAULT_LOCK_TIMEOUT = 10.0
+"""ファイルのロックを待つ秒数の既定値"""
+
+_BOMS: tuple[tuple[bytes, str], ...] = (
+    # UTF-32LEのBOMはUTF-16LEのBOMを含むので先に判定する
+    (codecs.BOM_UTF32_LE, 'utf_32'),
+    (codecs.BOM_UTF32_BE, 'utf_32'),
+    (codecs.BOM_UTF8, 'utf_8_sig'),
+    (codecs.BOM_UTF16_LE, 'utf_16'),
+    (codecs.BOM_UTF16_BE, 'utf_16'),
+)
+
+COMPRESSION_SUFFIXES: dict[str, Compression] = {
+    '.gz': 'gzip',
+    '.bz2': 'bz2',
+    '.xz': 'xz',
+}
+"""拡張子から圧縮形式を判定する時の対応表"""
+
+_COMPRESSION_MAGICS: tuple[tuple[re.Pattern[bytes], Compression], ...] = (
+    # マジックナンバー、圧縮方式(deflate)、予約ビットが0のフラグ
+    (re.compile(rb'\x1f\x8b\x08[\x00-\x1f]'), 'gzip'),
+    # マジックナンバー、ブロックサイズ、最初のブロックか空のストリームの終端のマジックナンバー
+    (re.compile(rb'BZh[1-9](?:1AY&SY|\x17rE8P\x90)'), 'bz2'),
+    (re.compile(rb'\xfd7zXZ\x00'), 'xz'),
+)
+"""ファイル先頭から圧縮形式を判定する時の、ヘッダーに一致する正規表現"""
+
+_COMPRESSION_MODULES: dict[Compression, str] = {'gzip': 'gzip', 'bz2': 'bz2', 'xz': 'lzma'}
+
+_NON_ASCII = re.compile(rb'[\x80-\xff]')
+
+
+class EncodingCandidate(NamedTuple):
+    """文字コードの判定結果
+
+    Attributes:
+        encoding (str): 判定された文字コード
+        tier (EncodingTier): 判定した段階
+            'bom': BOMによる判定
+            'prefix': ファイル先頭の厳密なデコードによる判定
+            'sample': charset-normalizerによる標本の判定
+            'full': charset-normalizerによるファイル全体の判定
+    """
+
+    encoding: str
+    tier: EncodingTier
+
+
+def _utf16_without_bom(prefix: bytes) -> str | None:
+    """BOMの無いUTF-16を、ASCII文字の上位バイトが0になる偏りから判定する
+
+    Args:
+        prefix (bytes): ファイル先頭のバイト列
+
+    Returns:
+        str | None: 'utf_16_le'か'utf_16_be'、どちらでもなければNone
+    """
+    half = len(prefix) // 2
+    if half == 0 or b'\x00' not in prefix:
+        return None
+
+    even_nul = prefix[0::2].count(0)
+    odd_nul = prefix[1::2].count(0)
+    if odd_nul > half * 0.3 and even_nul < half * 0.05:
+        return 'utf_16_le'
+    if even_nul > half * 0.3 and odd_nul < half * 0.05:
+        return 'utf_16_be'
+    return None
+
 
-def _decision_encoding(func: Callable[[IO[Any]], T], path: Path) -> T | None:
-    """charset_normalizerの文字コード判定を候補順に全て試行する
+def _prefix_decodes(prefix: bytes, encoding: str) -> bool:
+    """ファイル先頭が指定の文字コードで厳密にデコードできるか判定する
+
+    末尾で途切れたマルチバイト文字はエラーとしない
 
     Returns:
-        T | None: 呼び出し時に設定した戻り値の型
+        bool: デコードできればTrue
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors='strict')
+    try:
+        decoder.decode(prefix, final=False)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def _sample_window(raw: bytes) -> bytes:
+    """charset-normalizerに渡す標本を切り出す
+
+    最初の非ASCIIバイトを含む行から、ENCODING_SAMPLE_SIZEに収まる行までを標本とする
+    行単位で切り出すことで、標本の両端でマルチバイト文字が分断されないようにする
+
+    Returns:
+        bytes: 標本のバイト列
+    """
+    if len(raw) <= ENCODING_SAMPLE_SIZE:
+        return raw
+
+    first = _NON_ASCII.search(raw)
+    start = 0 if first is None else raw.rfind(b'\n', 0, first.start()) + 1
+    end = start + ENCODING_SAMPLE_SIZE
+    last_newline = raw.rfind(b'\n', start, end)
+    if last_newline > start:
+        end = last_newline + 1
+    return raw[start:end]
+
+
+def _bom_candidates(raw: bytes) -> Iterator[EncodingCandidate]:
+    """BOMから文字コードを判定する"""
+    for bom, encoding in _BOMS:
+        if raw.startswith(bom):
+            yield EncodingCandidate(encoding, 'bom')
+            return
+
+
+def _prefix_candidates(raw: bytes) -> Iterator[EncodingCandidate]:
+    """ファイル先頭の厳密なデコードでUTF-8とBOMの無いUTF-16を判定する"""
+    prefix = raw[:ENCODING_PREFIX_SIZE]
+    if b'\x00' not in prefix and _prefix_decodes(prefix, 'utf_8'):
+        yield EncodingCandidate('utf_8', 'prefix')
+
+    utf16 = _utf16_without_bom(prefix)
+    if utf16 is not None and _prefix_decodes(prefix, utf16):
+        yield EncodingCandidate(utf16, 'prefix')
+
+
+def _charset_normalizer_candidates(raw: bytes) -> Iterator[EncodingCandidate]:
+    """charset-normalizerで標本、ファイル全体の順に文字コードを判定する"""
+    from charset_normalizer import from_bytes  # noqa: PLC0415
+
+    sample = _sample_window(raw)
+    for i in from_bytes(sample):
+        yield EncodingCandidate(i.encoding, 'sample')
+
+    if len(sample) < len(raw):
+        for i in from_bytes(raw):
+            yield EncodingCandidate(i.encoding, 'full')
+
+
+def _iter_encoding_candidates(
+    raw: bytes, tried: Iterable[str] = ()
+) -> Iterator[EncodingCandidate]:
+    """文字コードの候補を、判定コストの低い段階から順に返す
+
+    1. BOMによる判定
+    2. ファイル先頭の厳密なデコードによる判定(UTF-8、BOMの無いUTF-16)
+    3. charset-normalizerによる標本の判定
+    4. charset-normalizerによるファイル全体の判定
+
+    候補は遅延評価されるので、前の段階の候補でデコードに成功すれば以降の判定は実行されない
+
+    Args:
+        raw (bytes): 判定するバイト列
+        tried (Iterable[str]): 既に試行済みで候補から除く文字コード
+
+    Yields:
+        EncodingCandidate: 文字コードの候補と判定した段階
     """
-    results = from_path(path)
+    seen: set[str] = {codecs.lookup(i).name for i in tried}
+    tiers = (_bom_candidates(raw), _prefix_candidates(raw), _charset_normalizer_candidates(raw))
+
+    for i in chain.from_iterable(tiers):
+        name = codecs.lookup(i.encoding).name
+        if name not in seen:
+            seen.add(name)
+            yield i
+
+
+def detect_encoding(raw: bytes) -> EncodingCandidate | None:
+    """バイト列の文字コードを判定する
+
+    BOM、先頭の厳密なデコード、charset-normalizerの順に判定し、
+    バイト列全体をデコードできた最初の候補を返す
 
-    for i in results:
+    Args:
+        raw (bytes): 判定するバイト列
+
+    Returns:
+        EncodingCandidate | None: 判定結果と判定した段階、判定できなければNone
+    """
+    for i in _iter_encoding_candidates(raw):
         try:
-            with path.open(mode='r', encoding=i.encoding) as f:
-                return func(f)
+            raw.decode(i.encoding)
         except UnicodeDecodeError:
-            log.debug(f'文字コード{i.encoding}での読み込み試行失敗')
+            continue
+        return i
     return None
 
 
+type FileIdentity = tuple[int, int, int, int]
+
+
+def file_identity(st: os.stat_result) -> FileIdentity:
+    """ファイルの同一性を判定するためのキーをstat結果から作成する
+
+    Args:
+        st (os.stat_result): os.statの結果
+
+    Returns:
+        FileIdentity: (デバイス, inode, 更新時刻(ns), サイズ)
+    """
+    return (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+class EncodingMemo:
+    """ファイルごとに判定済みの文字コードを記憶するLRUキャッシュ
+
+    キーはfile_identityで作成した(デバイス, inode, 更新時刻(ns), サイズ)なので、
+    ファイルが更新されると自動的に別のキーになり、古い判定結果は使われなくなる
+    storeを指定すると判定結果をJSONとして保存し、プロセスを再起動しても引き継ぐ
+    """
+
+    def __init__(self, maxsize: int = 1024, store: str | PathLike[str] | None = None) -> None:
+        """初期化
+
+        Args:
+            maxsize (int): 記憶するファイル数の上限. Defaults to 1024.
+            store (str | PathLike[str] | None): 判定結果を保存するファイルのパス
+                Noneの場合はプロセス内でのみ記憶する. Defaults to None.
+        """
+        self.maxsize = maxsize
+        self.store = None if store is None else Path(store)
+        self._entries: OrderedDict[FileIdentity, str] = OrderedDict()
+        self._lock = threading.Lock()
+        if self.store is not None:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: FileIdentity) -> str | None:
+        """記憶している文字コードを取得する
+
+        Returns:
+            str | None: 文字コード、記憶していなければNone
+        """
+        with self._lock:
+            encoding = self._entries.get(key)
+            if encoding is not None:
+                self._entries.move_to_end(key)
+            return encoding
+
+    def set(self, key: FileIdentity, encoding: str) -> None:
+        """判定した文字コードを記憶する"""
+        with self._lock:
+            self._entries[key] = encoding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            if self.store is not None:
+                self._save()
+
+    def clear(self) -> None:
+        """記憶している文字コードを全て破棄する"""
+        with self._lock:
+            self._entries.clear()
+            if self.store is not None:
+                self._save()
+
+    def _load(self) -> None:
+        if self.store is None:
+            return
+        try:
+            entries = json.loads(self.store.read_text(encoding='utf_8'))
+            for dev, ino, mtime_ns, size, encoding in entries[-self.maxsize :]:
+                self._entries[(dev, ino, mtime_ns, size)] = encoding
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError):
+            log.warning(f'文字コードの判定結果の保存ファイルを読み込めませんでした: {self.store}')
+
+    def _save(self) -> None:
+        if self.store is None:
+            return
+        entries = [[*key, encoding] for key, encoding in self._entries.items()]
+        tmp = self.store.with_name(f'.{self.store.name}.{os.getpid()}.tmp')
+        try:
+            self.store.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(entries), encoding='utf_8')
+            tmp.replace(self.store)
+        except OSError:
+            log.warning(f'文字コードの判定結果を保存できませんでした: {self.store}')
+
+
+_encoding_memo = EncodingMemo()
+
+
+def configure_encoding_memo(maxsize: int = 1024, store: str | PathLike[str] | None = None) -> None:
+    """読み込み時に判定した文字コードの記憶方法を設定する
+
+    設定を変更すると、それまでにプロセス内で記憶していた判定結果は破棄される
+
+    Args:
+        maxsize (int): 記憶するファイル数の上限. Defaults to 1024.
+        store (str | PathLike[str] | None): 判定結果を保存するJSONファイルのパス
+            指定するとプロセスを再起動しても判定結果を引き継ぐ. Defaults to None.
+    """
+    global _encoding_memo  # noqa: PLW0603
+    _encoding_memo = EncodingMemo(maxsize=maxsize, store=store)
+
+
+def clear_encoding_memo() -> None:
+    """記憶している文字コードの判定結果を全て破棄する"""
+    _encoding_memo.clear()
+
+
+def _parser_errors() -> tuple[type[Exception], ...]:
+    """ファイルの記述が不正な場合としてまとめて処理する例外を返す
+
+    ruamel.yamlが読み込まれていなければParserErrorは発生し得ないので、
+    例外処理のためだけにruamel.yamlを読み込むことはしない
+
+    Returns:
+        tuple[type[Exception], ...]: except節で捕捉する例外クラス
+    """
+    parser = sys.modules.get('ruamel.yaml.parser')
+    if parser is None:
+        return ()
+    return (parser.ParserError,)
+
+
+def _compression_errors() -> tuple[type[Exception], ...]:
+    """圧縮ファイルが壊れている場合としてまとめて処理する例外を返す
+
+    gzipとbz2の不正なデータはOSErrorになるので、途中で切れたファイルのEOFErrorと
+    lzmaが読み込まれていればLZMAErrorを返す
+
+    Returns:
+        tuple[type[Exception], ...]: except節で捕捉する例外クラス
+    """
+    lzma = sys.modules.get('lzma')
+    if lzma is None:
+        return (EOFError,)
+    return (EOFError, lzma.LZMAError)
+
+
+class _DecodedText(TextIOBase):
+    r"""デコード済みの文字列を読み込む、読み込み専用のファイルオブジェクト
+
+    StringIOは内部のバッファーに文字列をコピーするが、
+    このクラスは全体を読み込むread()で元の文字列をそのまま返す
+    改行コードはテキストモードでopenした時と同じく\nに統一する
+    """
+
+    def __init__(self, text: str) -> None:
+        super().__init__()
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        self._text = text
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int | None = -1) -> str:
+        start = self._position
+        length = len(self._text)
+        if size is None or size < 0:
+            self._position = length
+            return self._text if start == 0 else self._text[start:]
+
+        self._position = min(length, start + size)
+        return self._text[start : self._position]
+
+    def readline(self, size: int | None = -1) -> str:
+        start = self._position
+        end = self._text.find('\n', start) + 1 or len(self._text)
+        if size is not None and size >= 0:
+            end = min(end, start + size)
+        self._position = end
+        return self._text[start:end]
+
+
+def _decoded_stream(text: str, mode: Literal['r', 'rb']) -> IO[Any]:
+    r"""メモリ上でデコード済みの文字列を、funcに渡せるファイルオブジェクトにする
+
+    改行コードはテキストモードでopenした時と同じく\nに統一される
+    mode='rb'の場合は、バイナリを受け取るパーサー(tomllib等)のためにUTF-8で再エンコードする
+
+    Args:
+        text (str): デコード済みの文字列
+        mode (Literal['r', 'rb']): 元のファイルを開く時に指定されたmode
+
+    Returns:
+        IO[Any]: _DecodedTextかBytesIO
+    """
+    if mode == 'rb':
+        return BytesIO(text.encode('utf_8'))
+    return cast('IO[Any]', _DecodedText(text))
+
+
+def _decision_encoding(
+    func: Callable[[IO[Any]], T],
+    raw: bytes,
+    mode: Literal['r', 'rb'] = 'r',
+    tried: Iterable[str] = (),
+) -> tuple[T, str]:
+    """文字コードの判定候補を順に全て試行する
+
+    ファイルは再読み込みせず、一度だけ読み込んだバイト列をメモリ上で候補ごとにデコードする
+    funcによるパースはデコードに成功した候補に対してのみ実行される
+
+    Args:
+        func (Callable[[IO[Any]], T]): openしたファイルの読み込みをする関数
+        raw (bytes): ファイルから読み込んだ生のバイト列
+        mode (Literal['r', 'rb']): 元のファイルを開く時に指定されたmode. Defaults to 'r'.
+        tried (Iterable[str]): 既に試行済みで候補から除く文字コード
+
+    Raises:
+        UnicodeDecodeError: 全ての候補でデコードに失敗した場合
+
+    Returns:
+        tuple[T, str]: 呼び出し時に設定した戻り値の型の値と、デコードに成功した文字コード
+    """
+    last_error: UnicodeDecodeError | None = None
+
+    for i in _iter_encoding_candidates(raw, tried):
+        try:
+            text = raw.decode(i.encoding)
+        except UnicodeDecodeError as e:
+            log.debug(f'文字コード{i.encoding}での読み込み試行失敗(判定段階: {i.tier})')
+            last_error = e
+            continue
+        log.debug(f'文字コードを{i.encoding}と判定(判定段階: {i.tier})')
+        return func(_decoded_stream(text, mode)), i.encoding
+
+    if last_error is None:
+        last_error = UnicodeDecodeError('unknown', raw[:1], 0, 1, 'no encoding candidates')
+    raise last_error
+
+
+def suffix_compression(path: Path) -> Compression | None:
+    """ファイルの拡張子から圧縮形式を判定する
+
+    Returns:
+        Compression | None: 圧縮形式、圧縮ファイルの拡張子でなければNone
+    """
+    return COMPRESSION_SUFFIXES.get(path.suffix.lower())
+
+
+def _magic_compression(head: bytes) -> Compression | None:
+    """ファイル先頭のマジックナンバーから圧縮形式を判定する
+
+    マジックナンバーの後のヘッダーまで確認し、BZhなど同じ文字で始まるだけのテキストファイルを
+    圧縮ファイルと判定しないようにする
+    """
+    for pattern, compression in _COMPRESSION_MAGICS:
+        if pattern.match(head):
+            return compression
+    return None
+
+
+def _compression_module(compression: Compression) -> ModuleType:
+    """圧縮形式に対応するgzip, bz2, lzmaのモジュールを返す、最初に必要になった時に読み込む"""
+    return import_module(_COMPRESSION_MODULES[compression])
+
+
+_compression_levels: dict[Compression, int] = {'gzip': 6, 'bz2': 9, 'xz': 6}
+
+
+def configure_compression_level(
+    *, gzip: int | None = None, bz2: int | None = None, xz: int | None = None
+) -> None:
+    """圧縮ファイルに書き込む時の圧縮レベルを設定する
+
+    指定しなかった形式の設定は変更しない
+    既定値はgzipが6(gzipコマンドと同じ)、bz2が9、xzが6(xzコマンドと同じ)
+
+    Args:
+        gzip (int | None): gzipの圧縮レベル 0-9. Defaults to None.
+        bz2 (int | None): bz2の圧縮レベル 1-9. Defaults to None.
+        xz (int | None): xzのプリセット 0-9. Defaults to None.
+
+    Raises:
+        ValueError: 範囲外の圧縮レベルを指定した場合
+    """
+    levels: dict[Compression, int | None] = {'gzip': gzip, 'bz2': bz2, 'xz': xz}
+    for compression, level in levels.items():
+        minimum = 1 if compression == 'bz2' else 0
+        if level is not None and not minimum <= level <= 9:  # noqa: PLR2004
+            msg = f'{compression}の圧縮レベルは{minimum}から9で指定してください: {level}'
+            raise ValueError(msg)
+    _compression_levels.update({k: v for k, v in levels.items() if v is not None})
+
+
+def _open_source(path: Path, mode: Literal['r', 'rb'], encoding: str | None = None) -> IO[Any]:
+    """読み込むファイルを開く、圧縮ファイルの拡張子の場合は展開しながら読み込む"""
+    compression = suffix_compression(path)
+    if compression is None:
+        return path.open(mode=mode, encoding=encoding)
+    if mode == 'rb':
+        return _compression_module(compression).open(path, 'rb')
+    return _compression_module(compression).open(path, 'rt', encoding=encoding)
+
+
+def _decompressor(raw: IO[bytes], compression: Compression) -> IO[bytes]:
+    """開いたファイルを展開しながら読み込むファイルオブジェクトを返す、rawは閉じない"""
+    module = _compression_module(compression)
+    if compression == 'gzip':
+        return module.GzipFile(fileobj=raw, mode='rb')
+    if compression == 'bz2':
+        return module.BZ2File(raw, mode='rb')
+    return module.LZMAFile(raw, mode='rb')
+
+
+def _compressor(raw: IO[bytes], compression: Compression) -> IO[bytes]:
+    """開いたファイルに圧縮して書き込むファイルオブジェクトを返す、rawは閉じない"""
+    module = _compression_module(compression)
+    level = _compression_levels[compression]
+    if compression == 'gzip':
+        # 同じ内容なら同じバイト列になるよう、ファイル名と更新時刻を記録しない
+        return module.GzipFile(filename='', fileobj=raw, mode='wb', compresslevel=level, mtime=0)
+    if compression == 'bz2':
+        return module.BZ2File(raw, mode='wb', compresslevel=level)
+    return module.LZMAFile(raw, mode='wb', preset=level)
+
+
+_mmap_threshold: int | None = MMAP_THRESHOLD
+
+
+def configure_mmap_threshold(threshold: int | None = MMAP_THRESHOLD) -> None:
+    """テキストモードの読み込みでmmapを使うファイルサイズを設定する
+
+    Args:
+        threshold (int | None): このバイト数以上のファイルはmmapで読み込む
+            Noneの場合はmmapを使わない. Defaults to MMAP_THRESHOLD.
+    """
+    global _mmap_threshold  # noqa: PLW0603
+    _mmap_threshold = threshold
+
+
+def _should_map(path: Path, mode: Literal['r', 'rb'], encoding: str | None) -> bool:
+    """mmapで読み込むか判定する
+
+    バイナリモードのパーサー(tomllib等)はbytesを必要とし、コピーを避けられないので対象外
+    圧縮ファイルも展開したデータはマップできないので対象外
+    """
+    if mode != 'r' or encoding is None or _mmap_threshold is None:
+        return False
+    if suffix_compression(path) is not None:
+        return False
+    return path.stat().st_size >= max(_mmap_threshold, 1)
+
+
+def _read_mapped(func: Callable[[IO[Any]], T], path: Path, *, encoding: str) -> T:
+    """ファイルをmmapし、マップしたバッファーから直接デコードする
+
+    open().read()のようにバッファーからbytesを作ってからデコードせずに済むので、
+    大きなファイルではコピーが1回減り、ピーク時の使用メモリーも減る
+
+    Returns:
+        T: 呼び出し時に設定した戻り値の型
+    """
+    with path.open('rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        text = str(mapped, encoding)
+    return func(cast('IO[Any]', _DecodedText(text)))
+
+
+def _read_with_encoding(
+    func: Callable[[IO[Any]], T], path: Path, *, mode: Literal['r', 'rb'], encoding: str
+) -> T:
+    """文字コードを指定してファイルを読み込む
+
+    mode='rb'の場合はバイト列をメモリ上でデコードしてからfuncに渡す
+
+    Returns:
+        T: 呼び出し時に設定した戻り値の型
+    """
+    if mode == 'rb':
+        with _open_source(path, 'rb') as f:
+            return func(_decoded_stream(f.read().decode(encoding), mode))
+    if _should_map(path, mode, encoding):
+        return _read_mapped(func, path, encoding=encoding)
+    with _open_source(path, mode, encoding) as f:
+        return func(f)
+
+
+def _read_with_encoding_fallback(
+    func: Callable[[IO[Any]], T],
+    path: Path,
+    *,
+    mode: Literal['r', 'rb'],
+    encoding: str | None,
+) -> T:
+    """指定の文字コードで読み込み、失敗した場合は文字コードを判定して読み直す
+
+    UTF-8はBOM付きでも読み込めるようにutf_8_sigとして開く
+    判定時のファイルの読み込みは生のバイト列を一度読むだけで済ませる
+    判定した文字コードはEncodingMemoに記憶し、同じファイルの次回以降の読み込みでは判定を省略する
+    圧縮ファイルの拡張子であれば展開しながら読み込む。拡張子が無くても、デコードに失敗した
+    バイト列の先頭が圧縮形式のマジックナンバーであれば展開してから文字コードを判定する
+
+    Returns:
+        T: 呼び出し時に設定した戻り値の型
+    """
+    if len(_encoding_memo) > 0:
+        memo_encoding = _encoding_memo.get(file_identity(path.stat()))
+        if memo_encoding is not None:
+            try:
+                return _read_with_encoding(func, path, mode=mode, encoding=memo_encoding)
+            except UnicodeDecodeError:
+                log.debug(f'記憶していた文字コード{memo_encoding}での読み込みに失敗: {path}')
+
+    if encoding is not None and codecs.lookup(encoding).name == 'utf-8':
+        encoding = 'utf_8_sig'
+
+    try:
+        if _should_map(path, mode, encoding):
+            return _read_mapped(func, path, encoding=cast('str', encoding))
+        with _open_source(path, mode, encoding) as f:
+            return func(f)
+    except UnicodeDecodeError:
+        log.debug(f'文字コード{encoding}での読み込みに失敗したため文字コードを判定します: {path}')
+
+    # rbの場合はパーサー側がUTF-8でデコードしている
+    tried = ('utf_8', 'utf_8_sig') if encoding is None or encoding == 'utf_8_sig' else (encoding,)
+    with _open_source(path, 'rb') as f:
+        key = file_identity(os.fstat(f.fileno()))
+        raw = f.read()
+
+    compression = None if suffix_compression(path) else _magic_compression(raw)
+    if compression is not None:
+        log.debug(f'{compression}で圧縮されたファイルとして展開します: {path}')
+        raw = _compression_module(compression).decompress(raw)
+        tried = ()
+
+    result, detected = _decision_encoding(func=func, raw=raw, mode=mode, tried=tried)
+    if compression is None:
+        # 拡張子の無い圧縮ファイルは記憶した文字コードで開いても展開されないので記憶しない
+        _encoding_memo.set(key, detected)
+    return result
+
+
+def _lock_file(fd: int, *, exclusive: bool, timeout: float | None) -> None:
+    """ファイルにflockでアドバイザリーロックをかける
+
+    ロックはファイルを閉じた時に解放される
+    fcntlの無い環境(Windows)ではロックしない
+
+    Args:
+        fd (int): ロックするファイルのファイルディスクリプター
+        exclusive (bool): Trueなら排他ロック、Falseなら共有ロック
+        timeout (float | None): ロックを待つ秒数、Noneの場合は無期限に待つ
+
+    Raises:
+        TimeoutError: timeout秒以内にロックを取得できなかった場合
+    """
+    if sys.platform == 'win32':
+        log.debug('fcntlが無い環境なのでファイルをロックせずに読み書きします')
+        return
+
+    import fcntl  # noqa: PLC0415
+
+    operation = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+    if timeout is None:
+        fcntl.flock(fd, operation)
+        return
+
+    deadline = time.monotonic() + timeout
+    delay = 0.001
+    while True:
+        try:
+            fcntl.flock(fd, operation | fcntl.LOCK_NB)
+        except BlockingIOError:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                msg = f'{timeout}秒以内にファイルのロックを取得できませんでした'
+                raise TimeoutError(msg) from None
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, 0.05)
+        else:
+            return
+
+
+@contextmanager
+def _shared_lock(path: Path, timeout: float | None) -> Iterator[None]:
+    """ファイルを共有ロックしている間だけ処理する
+
+    update_*関数が書き込み中のファイルを読み込まないようにする
+    """
+    with path.open('rb') as f:
+        _lock_file(f.fileno(), exclusive=False, timeout=timeout)
+        yield
+
+
+def common_file_read(
+    func: Callable[[IO[Any]], T],
+    path: str | PathLike[str],
+    *,
+    mode: Literal['r', 'rb'] = 'r',
+    encoding: str | None = 'utf_8',
+    decode: bool = True,
+    lock: bool = False,
+) -> T:
+    """例外処理をせずにファイルを読み込む
+
+    common_file_read_exception_handlingと同じ文字コードの判定をするが、
+    失敗した場合は空の値を返さずに例外をそのまま送出する
+
+    Args:
+        func (Callable[[IO[Any]], T]): openしたファイルの読み込みをする関数
+        path (str | PathLike[str]): 開くファイルのパス
+        mode (Literal['r', 'rb';], optional): 読み込むファイルを開く時のmode. Defaults to 'r'.
+        encoding (str | None): 読み込む時の文字コード Defaults to 'utf_8'.
+        decode (bool): Falseの場合は文字コードの判定と圧縮ファイルの展開をせず、
+            バイナリモードで開いたファイルをそのままfuncに渡す. Defaults to True.
+        lock (bool): 共有ロックを取得してから読み込み、update_*関数による書き込みの途中の
+            内容を読み込まないようにする. Defaults to False.
+
+    Returns:
+        T: funcの戻り値
+    """
+    if lock:
+        with _shared_lock(Path(path), DEFAULT_LOCK_TIMEOUT):
+            return common_file_read(func, path, mode=mode, encoding=encoding, decode=decode)
+
+    if not decode:
+        with Path(path).open('rb') as f:
+            return func(f)
+
+    if mode == 'rb':
+        encoding = None
+    return _read_with_encoding_fallback(func, Path(path), mode=mode, encoding=encoding)
+
+
 def common_file_read_exception_handling(
     func: Callable[[IO[Any]], T],
     return_empty_value: T,
@@ -37,6 +777,8 @@ def common_file_read_exception_handling(
     *,
     mode: Literal['r', 'rb'] = 'r',
     encoding: str | None = 'utf_8',
+    decode: bool = True,
+    lock: bool = False,
 ) -> T:
     """ファイル読み込み時の汎用的な例外処理をするラッパー関数
 
@@ -46,26 +788,20 @@ def common_file_read_exception_handling(
         path (str | PathLike[str]): 開くファイルのパス
         mode (Literal['r', 'rb';], optional): 読み込むファイルを開く時のmode. Defaults to 'r'.
         encoding (str | None): 読み込む時の文字コード Defaults to 'utf_8'.
+        decode (bool): Falseの場合は文字コードの判定と圧縮ファイルの展開をせず、
+            バイナリモードで開いたファイルをそのままfuncに渡す. Defaults to True.
+        lock (bool): 共有ロックを取得してから読み込む. Defaults to False.
 
     Returns:
         T: 呼び出し時にreturn_empty_valueで設定した戻り値の型
     """
-    p = Path(path)
-
-    if mode == 'rb':
-        encoding = None
-
     try:
-        with p.open(mode=mode, encoding=encoding) as f:
-            read_data: T = func(f)
+        read_data: T = common_file_read(
+            func, path, mode=mode, encoding=encoding, decode=decode, lock=lock
+        )
     except UnicodeDecodeError:
-        result = _decision_encoding(func=func, path=p)
-
-        if result is not None:
-            return result
-
         log.warning(
-            '読み込もうとしたファイルの文字コードが{encoding}ではなかった為、charset-normalizerを使い文字コードの判定を試みましたが失敗しました'
+            f'読み込もうとしたファイルの文字コードが{encoding}ではなかった為、charset-normalizerを使い文字コードの判定を試みましたが失敗しました'
             f'(return empty {type(return_empty_value)}: {path})'
         )
     except FileNotFoundError:
@@ -83,9 +819,16 @@ def common_file_read_exception_handling(
             '読み込もうとしたパスがディレクトリを指しています'
             f'(return empty {type(return_empty_value)}): {path}'
         )
+    except TimeoutError:
+        log.warning(
+            'ファイルのロックを取得できませんでした'
+            f'(return empty {type(return_empty_value)}): {path}'
+        )
     except OSError:
         log.warning(f'OSで問題が発生しました(return empty {type(return_empty_value)}): {path}')
-    except ParserError:
+    except _compression_errors():
+        log.warning(f'圧縮ファイルが壊れています(return empty {type(return_empty_value)}): {path}')
+    except _parser_errors():
         log.warning(f'ファイルの記述が不正です(return empty {type(return_empty_value)}): {path}')
     else:
         return read_data
@@ -93,42 +836,384 @@ def common_file_read_exception_handling(
     return return_empty_value
 
 
+def _detect_stream_encoding(f: IO[bytes], encoding: str | None, *, memo: bool = True) -> str:
+    """ファイル先頭から、少しずつ読み込む場合の文字コードを判定する
+
+    ファイル全体を読み込まずに判定するため、先頭のENCODING_PREFIX_SIZEバイトだけを使う
+    判定後はファイルの位置を先頭に戻す
+
+    Args:
+        f (IO[bytes]): 読み込むファイル
+        encoding (str | None): 最初に試す文字コード
+        memo (bool): EncodingMemoを使うか、拡張子の無い圧縮ファイルを展開している場合は
+            記憶した文字コードで開いても展開されないのでFalseにする. Defaults to True.
+
+    Raises:
+        UnicodeDecodeError: 先頭をデコードできる文字コードが無い場合
+
+    Returns:
+        str: 判定した文字コード
+    """
+    if memo and len(_encoding_memo) > 0:
+        memo_encoding = _encoding_memo.get(file_identity(os.fstat(f.fileno())))
+        if memo_encoding is not None:
+            return memo_encoding
+
+    encoding = _first_stream_encoding(encoding)
+    prefix = f.read(ENCODING_PREFIX_SIZE)
+    f.seek(0)
+    if _prefix_decodes(prefix, encoding):
+        return encoding
+
+    for i in _iter_encoding_candidates(prefix, tried=(encoding,)):
+        if _prefix_decodes(prefix, i.encoding):
+            if memo:
+                _encoding_memo.set(file_identity(os.fstat(f.fileno())), i.encoding)
+            return i.encoding
+
+    reason = 'ファイル先頭から文字コードを判定できません'
+    raise UnicodeDecodeError(encoding, prefix, 0, len(prefix), reason)
+
+
+def _first_stream_encoding(encoding: str | None) -> str:
+    """少しずつ読み込む場合に最初に試す文字コード、UTF-8はBOM付きでも読み込めるようにする"""
+    if encoding is None or codecs.lookup(encoding).name == 'utf-8':
+        return 'utf_8_sig'
+    return encoding
+
+
+def _stream_magic_compression(raw: IO[bytes], encoding: str | None) -> Compression | None:
+    """拡張子の無いファイルが圧縮ファイルか、先頭のマジックナンバーから判定する
+
+    read_textと同じく、先頭が最初に試す文字コードでデコードできない場合だけ圧縮ファイルとする
+    BZhなどマジックナンバーと同じ文字で始まるテキストファイルを、展開しようとしないため
+    判定後はファイルの位置を先頭に戻す
+
+    Returns:
+        Compression | None: 圧縮形式、圧縮ファイルでなければNone
+    """
+    prefix = raw.read(ENCODING_PREFIX_SIZE)
+    raw.seek(0)
+    compression = _magic_compression(prefix)
+    if compression is None or _prefix_decodes(prefix, _first_stream_encoding(encoding)):
+        return None
+    return compression
+
+
+def common_stream_read_exception_handling(
+    func: Callable[[IO[bytes], str], Iterator[T]],
+    path: str | PathLike[str],
+    *,
+    encoding: str | None = 'utf_8',
+) -> Iterator[T]:
+    """ファイルを少しずつ読み込むジェネレーター用の、汎用的な例外処理をするラッパー関数
+
+    文字コードはファイル先頭から一度だけ判定し、ファイル全体をメモリーに読み込まない
+    圧縮ファイルは拡張子か、先頭をデコードできない場合はマジックナンバーから判定し、
+    展開しながら読み込む
+    失敗した場合は警告を出して反復を終了する。それまでに返した値はそのまま有効になる
+
+    Args:
+        func (Callable[[IO[bytes], str], Iterator[T]]):
+            バイナリモードで開いたファイルと判定した文字コードを受け取り、値を順に返す関数
+        path (str | PathLike[str]): 開くファイルのパス
+        encoding (str | None): 最初に試す文字コード Defaults to 'utf_8'.
+
+    Yields:
+        T: funcが返す値
+    """
+    p = Path(path)
+
+    try:
+        with p.open('rb') as raw:
+            compression = suffix_compression(p)
+            magic = compression is None
+            if magic:
+                compression = _stream_magic_compression(raw, encoding)
+            f = raw if compression is None else _decompressor(raw, compression)
+            # 拡張子の無い圧縮ファイルは、記憶した文字コードで開いても展開されないので記憶しない
+            memo = not (magic and compression is not None)
+            yield from func(f, _detect_stream_encoding(f, encoding, memo=memo))
+    except UnicodeDecodeError:
+        log.warning(f'ファイルの文字コードを判定できなかったため、読み込みを中断しました: {path}')
+    except FileNotFoundError:
+        log.warning(f'読み込もうとしたファイルが存在しません: {path}')
+    except PermissionError:
+        log.warning(f'読み込み権限がないか、ファイルへのパスが正しく指定されていません: {path}')
+    except IsADirectoryError:
+        log.warning(f'読み込もうとしたパスがディレクトリを指しています: {path}')
+    except OSError:
+        log.warning(f'OSで問題が発生しました: {path}')
+    except _compression_errors():
+        log.warning(f'圧縮ファイルが壊れているため、読み込みを中断しました: {path}')
+
+
+class WriteResult(IntEnum):
+    """書き込み関数の結果
+
+    FAILED以外は真になるので、従来通りboolとして成功失敗を判定できる
+    """
+
+    FAILED = 0
+    """書き込みに失敗した"""
+    WRITTEN = 1
+    """ファイルに書き込んだ"""
+    UNCHANGED = 2
+    """既存のファイルと内容が同じだったので書き込まなかった"""
+
+
+@cache
+def _default_file_mode() -> int:
+    """新規作成するファイルに通常適用されるパーミッションを返す
+
+    umaskは取得すると同時に設定されてしまうので、最初の一度だけ取得して元に戻す
+
+    Returns:
+        int: 0o666からumaskを除いたパーミッション
+    """
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def _fsync_directory(directory: Path) -> None:
+    """ディレクトリのエントリーの変更(ファイルの作成や置き換え)をディスクに反映する"""
+    try:
+        fd = os.open(directory, os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0))
+    except OSError:
+        # Windowsなどディレクトリをopenできない環境
+        log.debug(f'ディレクトリをfsyncできませんでした: {directory}')
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_stream(
+    func: Callable[[object, IO[Any]], None],
+    data: object,
+    raw: IO[bytes],
+    *,
+    compression: Compression | None,
+    mode: Literal['w', 'wb', 'a'],
+    encoding: str | None,
+    newline: str | None,
+) -> None:
+    """バイナリモードで開いたファイルに、必要なら圧縮してfuncで書き込む
+
+    圧縮する場合は、fsyncの前に圧縮の終端まで書き込めるよう、ここで圧縮を終了する
+    rawは閉じない
+    """
+    target = raw if compression is None else _compressor(raw, compression)
+    if mode == 'wb':
+        func(data, target)
+    else:
+        f = TextIOWrapper(cast('IO[bytes]', target), encoding=encoding, newline=newline)
+        func(data, f)
+        f.flush()
+        f.detach()
+    if compression is not None:
+        target.close()
+
+
+def _write_file(
+    func: Callable[[object, IO[Any]], None],
+    data: object,
+    path: Path,
+    *,
+    mode: Literal['w', 'wb', 'a'],
+    encoding: str | None,
+    newline: str | None,
+    durability: Durability,
+) -> None:
+    """ファイルを直接開いて書き込む
+
+    圧縮ファイルに追記する場合は、新しい圧縮ストリームとして末尾に連結する
+    gzip, bz2, xzはいずれも連結されたストリームを続けて展開できる
+    """
+    with path.open(mode='ab' if mode == 'a' else 'wb') as raw:
+        _write_stream(
+            func,
+            data,
+            raw,
+            compression=suffix_compression(path),
+            mode=mode,
+            encoding=encoding,
+            newline=newline,
+        )
+        if durability != 'none':
+            raw.flush()
+            os.fsync(raw.fileno())
+    if durability == 'full':
+        _fsync_directory(path.parent)
+
+
+def _atomic_write_file(
+    func: Callable[[object, IO[Any]], None],
+    data: object,
+    path: Path,
+    *,
+    mode: Literal['w', 'wb', 'a'],
+    encoding: str | None,
+    newline: str | None,
+    durability: Durability,
+) -> None:
+    """同じディレクトリの一時ファイルに書き込んでから、os.replaceで置き換える
+
+    置き換えはアトミックなので、書き込み途中でクラッシュしても、
+    同時に読み込んだ場合でも、書き込み途中のファイルが見えることはない
+    既存のファイルがあればそのパーミッションを引き継ぐ
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    tmp = Path(tmp_name)
+    try:
+        with open(fd, mode='wb') as raw:  # noqa: PTH123
+            _write_stream(
+                func,
+                data,
+                raw,
+                compression=suffix_compression(path),
+                mode=mode,
+                encoding=encoding,
+                newline=newline,
+            )
+            if durability != 'none':
+                raw.flush()
+                os.fsync(raw.fileno())
+
+        try:
+            file_mode = path.stat().st_mode & 0o7777
+        except FileNotFoundError:
+            file_mode = _default_file_mode()
+        tmp.chmod(file_mode)
+        tmp.replace(path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+    if durability == 'full':
+        _fsync_directory(path.parent)
+
+
+def _serialize(
+    func: Callable[[object, IO[Any]], None],
+    data: object,
+    *,
+    mode: Literal['w', 'wb', 'a'],
+    encoding: str | None,
+    newline: str | None,
+) -> bytes:
+    """ファイルに書き込む内容をメモリー上でバイト列にする"""
+    buffer = BytesIO()
+    if mode == 'wb':
+        func(data, buffer)
+        return buffer.getvalue()
+
+    with TextIOWrapper(buffer, encoding=encoding, newline=newline) as f:
+        func(data, f)
+        f.flush()
+        # closeでbufferも閉じられる前に取り出す
+        return buffer.getvalue()
+
+
+def _same_content(path: Path, payload: bytes) -> bool:
+    """既存のファイルの内容がpayloadと同じか判定する
+
+    サイズが異なれば読み込まずに判定し、同じ場合だけ先頭から少しずつ比較する
+    圧縮ファイルは展開後のサイズが分からないので、展開しながら比較する
+    """
+    try:
+        with _open_source(path, 'rb') as f:
+            if suffix_compression(path) is None and os.fstat(f.fileno()).st_size != len(payload):
+                return False
+            view = memoryview(payload)
+            for start in range(0, len(payload), COMPARE_CHUNK_SIZE):
+                expected = view[start : start + COMPARE_CHUNK_SIZE]
+                if f.read(len(expected)) != expected:
+                    return False
+            return not f.read(1)
+    except (OSError, *_compression_errors()):
+        return False
+
+
+def _write_encoding(path: Path, mode: Literal['w', 'wb', 'a']) -> tuple[str | None, str | None]:
+    r"""書き込む時の文字コードと改行コードを返す
+
+    .batと.cmdはWindowsのコマンドプロンプトで実行できるようにShift-JISと\r\nにする
+
+    Returns:
+        tuple[str | None, str | None]: 文字コードと改行コード、バイナリモードの場合は両方None
+    """
+    if mode == 'wb':
+        return None, None
+    if path.suffix in {'.bat', '.cmd'}:
+        return 'cp932', '\r\n'
+    return 'utf_8', '\n'
+
+
+def _write_bytes(data: object, f: IO[Any]) -> None:
+    f.write(data)
+
+
 def common_file_write_exception_handling(
     func: Callable[[object, IO[Any]], None],
     data: object,
     path: str | PathLike[str],
     *,
-    mode: Literal['w', 'wb'] = 'w',
-) -> bool:
+    mode: Literal['w', 'wb', 'a'] = 'w',
+    atomic: bool = False,
+    durability: Durability = 'none',
+    skip_unchanged: bool = False,
+) -> WriteResult:
     """ファイル書き込み時の汎用的な例外処理をするラッパー関数
 
+    pathの拡張子が.gz, .bz2, .xzの場合は、configure_compression_levelで設定した
+    圧縮レベルで圧縮しながら書き込む
+
     Args:
         func (Callable[[object, IO[Any]], None]):
             openしたファイルに対して書き込み処理をする関数
         data (T): 書き込むデータ
         path (str | PathLike[str]): 保存するファイルのパス
-        mode (Literal['w', 'wb'], optional): 書き込むファイルをopenする時のmode. Defaults to 'r'.
+        mode (Literal['w', 'wb', 'a'], optional): 書き込むファイルをopenする時のmode
+            'a'の場合は追記し、atomicとskip_unchangedは指定できない. Defaults to 'r'.
+        atomic (bool): 一時ファイルに書き込んでから置き換え、書き込み途中のファイルが
+            他から読み込まれたり、クラッシュ時に残ったりしないようにする. Defaults to False.
+        durability (Durability): 書き込み完了時にディスクへ反映させる範囲
+            'none': OSに任せる
+            'file': ファイルの内容をfsyncする
+            'full': ファイルに加えて、親ディレクトリもfsyncしてファイルの作成や置き換えを反映する
+            Defaults to 'none'.
+        skip_unchanged (bool): メモリー上で書き込む内容を作成して既存のファイルと比較し、
+            同じ内容なら書き込まない。更新時刻が変わらないので、ファイルの監視による
+            再ビルドなどを避けられる. Defaults to False.
+
+    Raises:
+        ValueError: 追記でatomicかskip_unchangedを指定した場合
 
     Returns:
-        bool: 処理の成功失敗の判定のための戻り値
+        WriteResult: 処理の結果、失敗した場合だけ偽になる
     """
-    p = Path(path)
+    if mode == 'a' and (atomic or skip_unchanged):
+        msg = "mode='a'ではatomicとskip_unchangedは指定できません"
+        raise ValueError(msg)
 
-    encoding = 'utf_8'
-    newline = '\n'
-    if p.suffix in {'.bat', '.cmd'}:
-        encoding = 'cp932'
-        newline = '\r\n'
-    if mode == 'wb':
-        encoding = None
-        newline = None
+    p = Path(path)
+    encoding, newline = _write_encoding(p, mode)
 
-    result: bool = False
+    result = WriteResult.FAILED
+    writer = _atomic_write_file if atomic else _write_file
 
     try:
+        if skip_unchanged:
+            payload = _serialize(func, data, mode=mode, encoding=encoding, newline=newline)
+            if _same_content(p, payload):
+                return WriteResult.UNCHANGED
+            func, data, mode, encoding, newline = _write_bytes, payload, 'wb', None, None
+
         p.parent.mkdir(parents=True, exist_ok=True)
-        with Path(p).open(mode=mode, encoding=encoding, newline=newline) as f:
-            func(data, f)
+        writer(func, data, p, mode=mode, encoding=encoding, newline=newline, durability=durability)
     except PermissionError:
         log.warning(f'書き込み権限がないか、ファイルへのパスが正しく指定されていません: {path}')
     except IsADirectoryError:
@@ -136,6 +1221,146 @@ def common_file_write_exception_handling(
     except OSError:
         log.warning(f'OSで問題が発生しました: {path}')
     else:
-        result = True
+        result = WriteResult.WRITTEN
 
     return result
+
+
+def _parse_raw(func: Callable[[IO[Any]], T], raw: bytes, *, mode: Literal['r', 'rb']) -> T:
+    """読み込み済みのバイト列をデコードしてfuncに渡す
+
+    UTF-8(BOM付きを含む)で読めなければ、_decision_encodingで文字コードを判定する
+
+    Returns:
+        T: funcの戻り値
+    """
+    try:
+        text = raw.decode('utf_8_sig')
+    except UnicodeDecodeError:
+        result, _ = _decision_encoding(func, raw=raw, mode=mode, tried=('utf_8', 'utf_8_sig'))
+        return result
+    return func(_decoded_stream(text, mode))
+
+
+def _compress(payload: bytes, compression: Compression) -> bytes:
+    buffer = BytesIO()
+    with _compressor(buffer, compression) as f:
+        f.write(payload)
+    return buffer.getvalue()
+
+
+def _rewrite_locked(
+    path: Path,
+    transform: Callable[[bytes], bytes],
+    *,
+    timeout: float | None,
+    durability: Durability,
+) -> WriteResult:
+    """ファイルを排他ロックして読み込み、transformで変換した内容を先頭から書き直す
+
+    圧縮ファイルは展開した内容をtransformに渡し、同じ形式で圧縮して書き込む
+
+    Returns:
+        WriteResult: 書き込んだらWRITTEN、内容が変わらなかったらUNCHANGED
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o666)
+    with open(fd, 'r+b') as f:  # noqa: PTH123
+        _lock_file(f.fileno(), exclusive=True, timeout=timeout)
+        raw = f.read()
+
+        compression = suffix_compression(path)
+        if compression is None and not _prefix_decodes(raw[:ENCODING_PREFIX_SIZE], 'utf_8_sig'):
+            # 読み込みと同じく、UTF-8でデコードできない場合だけマジックナンバーで判定する
+            # BZhなどマジックナンバーと同じ文字で始まるテキストファイルを展開しようとしないため
+            compression = _magic_compression(raw)
+        if compression is not None and raw:
+            raw = _compression_module(compression).decompress(raw)
+        payload = transform(raw)
+        if payload == raw:
+            return WriteResult.UNCHANGED
+        if compression is not None:
+            payload = _compress(payload, compression)
+
+        f.seek(0)
+        f.write(payload)
+        f.truncate()
+        if durability != 'none':
+            f.flush()
+            os.fsync(f.fileno())
+    if durability == 'full':
+        _fsync_directory(path.parent)
+    return WriteResult.WRITTEN
+
+
+def common_file_update_exception_handling(  # noqa: PLR0913
+    read_func: Callable[[IO[Any]], T],
+    write_func: Callable[[object, IO[Any]], None],
+    update: Callable[[T], T | None],
+    empty_factory: Callable[[], T],
+    path: str | PathLike[str],
+    *,
+    read_mode: Literal['r', 'rb'] = 'r',
+    write_mode: Literal['w', 'wb'] = 'w',
+    timeout: float | None = DEFAULT_LOCK_TIMEOUT,
+    durability: Durability = 'none',
+) -> WriteResult:
+    """ファイルを排他ロックして読み込み、更新した内容を書き込むラッパー関数
+
+    ファイルは一度だけ開き、同じファイルディスクリプターで排他ロック、読み込み、書き込みをする
+    ロックを取得してから書き込み終えるまで、他のプロセスのupdate_*関数と
+    lock=Trueを指定した読み込みは待たされるので、同時に更新しても更新が失われない
+    ロックはflockによるアドバイザリーロックなので、ロックを使わない読み書きは待たされない
+
+    ロックしたファイルを置き換えると他のプロセスが古いファイルをロックしたままになるので、
+    一時ファイルを使うatomicな書き込みはせず、同じファイルを先頭から書き直す
+    ファイルが無いか空の場合は作成し、empty_factoryの値をupdateに渡す
+    圧縮ファイルは展開してからupdateに渡し、同じ形式で圧縮して書き込む
+
+    Args:
+        read_func (Callable[[IO[Any]], T]): openしたファイルの読み込みをする関数
+        write_func (Callable[[object, IO[Any]], None]): openしたファイルに書き込む関数
+        update (Callable[[T], T | None]): 読み込んだ値を受け取り、書き込む値を返す関数
+            Noneを返した場合は受け取った値を変更したものとして、その値を書き込む
+        empty_factory (Callable[[], T]): ファイルが無いか空の場合にupdateに渡す値を作る関数
+        path (str | PathLike[str]): 更新するファイルのパス
+        read_mode (Literal['r', 'rb']): read_funcに渡すファイルのmode. Defaults to 'r'.
+        write_mode (Literal['w', 'wb']): write_funcに渡すファイルのmode. Defaults to 'w'.
+        timeout (float | None): ロックを待つ秒数、Noneの場合は無期限に待つ
+            Defaults to DEFAULT_LOCK_TIMEOUT.
+        durability (Durability): 書き込み完了時にfsyncする範囲
+            'none'はfsyncしない、'file'はファイル、'full'はファイルと親ディレクトリ
+            Defaults to 'none'.
+
+    Returns:
+        WriteResult: 書き込んだらWRITTEN、内容が変わらず書き込まなかったらUNCHANGED、
+            失敗したらFAILED(偽)。updateが送出した例外はそのまま送出し、ファイルは変更しない
+    """
+    p = Path(path)
+    encoding, newline = _write_encoding(p, write_mode)
+
+    def transform(raw: bytes) -> bytes:
+        data = _parse_raw(read_func, raw, mode=read_mode) if raw else None
+        if data is None:
+            # 空のファイルか、コメントだけのYAMLなど
+            data = empty_factory()
+        updated = update(data)
+        if updated is None:
+            updated = data
+        return _serialize(write_func, updated, mode=write_mode, encoding=encoding, newline=newline)
+
+    try:
+        p.parent.mkdir(parents=True, exist_ok=True)
+        return _rewrite_locked(p, transform, timeout=timeout, durability=durability)
+    except PermissionError:
+        log.warning(f'書き込み権限がないか、ファイルへのパスが正しく指定されていません: {path}')
+    except IsADirectoryError:
+        log.warning(f'更新しようとしたパスがディレクトリを指しています: {path}')
+    except TimeoutError:
+        log.warning(f'ファイルのロックを取得できなかったため、更新しませんでした: {path}')
+    except OSError:
+        log.warning(f'OSで問題が発生しました: {path}')
+    except (UnicodeDecodeError, *_compression_errors(), *_parser_errors()):
+        # 読み込めないファイルを空として上書きしないよう、更新せずに終了する
+        log.warning(f'ファイルの内容を読み込めなかったため、更新しませんでした: {path}')
+
+    return WriteResult.FAILED
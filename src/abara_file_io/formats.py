@@ -0,0 +1,102 @@
+from collections.abc import Callable
+from importlib import import_module
+from logging import getLogger
+from pathlib import Path
+from typing import IO, Any, Literal, NamedTuple
+
+from abara_file_io.common_io_wrapper import suffix_compression
+
+log = getLogger(__name__)
+
+
+type FileFormat = Literal['text', 'json', 'yaml', 'toml', 'ini', 'pickle']
+
+SUFFIX_FORMATS: dict[str, FileFormat] = {
+    '.txt': 'text',
+    '.json': 'json',
+    '.yaml': 'yaml',
+    '.yml': 'yaml',
+    '.toml': 'toml',
+    '.ini': 'ini',
+    '.pickle': 'pickle',
+    '.pkl': 'pickle',
+}
+"""拡張子から形式を判定する時の対応表"""
+
+_FORMATS: frozenset[FileFormat] = frozenset(SUFFIX_FORMATS.values())
+
+
+class FormatReader(NamedTuple):
+    """形式ごとの、例外処理をしない読み込み処理
+
+    各形式のモジュールでFORMAT_READERとして定義する
+    """
+
+    func: Callable[[IO[Any]], Any]
+    """openしたファイルを読み込む関数"""
+    mode: Literal['r', 'rb']
+    """ファイルを開く時のmode"""
+
+
+def format_from_path(path: Path) -> FileFormat:
+    """ファイルの拡張子から形式を判定する
+
+    data.json.gzのような圧縮ファイルは、圧縮形式の拡張子の前の拡張子で判定する
+
+    Args:
+        path (Path): 判定するファイルのパス
+
+    Raises:
+        ValueError: 対応していない拡張子の場合
+
+    Returns:
+        FileFormat: ファイルの形式
+    """
+    suffix = path.suffix
+    if suffix_compression(path) is not None:
+        suffix = Path(path.stem).suffix
+    fmt = SUFFIX_FORMATS.get(suffix.lower())
+    if fmt is None:
+        msg = f'拡張子から形式を判定できません: {path}'
+        raise ValueError(msg)
+    return fmt
+
+
+def format_reader(fmt: FileFormat) -> FormatReader:
+    """形式に対応する読み込み処理を返す
+
+    形式のモジュールは最初に必要になった時に読み込む
+
+    Args:
+        fmt (FileFormat): ファイルの形式
+
+    Raises:
+        ValueError: 対応していない形式の場合
+
+    Returns:
+        FormatReader: 読み込み処理
+    """
+    if fmt not in _FORMATS:
+        msg = f'対応していない形式です: {fmt}'
+        raise ValueError(msg)
+    return import_module(f'abara_file_io.{fmt}').FORMAT_READER
+
+
+def format_writer(fmt: FileFormat) -> Callable[..., Any]:
+    """形式に対応するwrite_*関数を返す
+
+    形式のモジュールは最初に必要になった時に読み込む
+
+    Args:
+        fmt (FileFormat): ファイルの形式
+
+    Raises:
+        ValueError: 対応していない形式の場合
+
+    Returns:
+        Callable[..., Any]: write_json等の書き込み関数
+    """
+    if fmt not in _FORMATS:
+        msg = f'対応していない形式です: {fmt}'
+        raise ValueError(msg)
+    return getattr(import_module(f'abara_file_io.{fmt}'), f'write_{fmt}')
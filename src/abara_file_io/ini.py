@@ -1,45 +1,74 @@
+import re
+from collections.abc import Callable, Mapping
 from configparser import ConfigParser
+from io import StringIO
 from logging import getLogger
 from os import PathLike
 from pathlib import Path
-from typing import IO, Any, cast
+from typing import IO, Any, Literal, cast
 
+from abara_file_io.cache import CacheMode, cached_read
 from abara_file_io.common_io_wrapper import (
+    DEFAULT_LOCK_TIMEOUT,
+    Durability,
+    WriteResult,
     common_file_read_exception_handling,
+    common_file_update_exception_handling,
     common_file_write_exception_handling,
 )
+from abara_file_io.formats import FormatReader
+from abara_file_io.lazy import LazySections, SectionSpans
 
 log = getLogger(__name__)
 
 
 type IniConfigValue = str | int | float | bool
 
+type IniEngine = Literal['fast', 'configparser']
+
+_INI_SCALAR = re.compile(
+    r'(?P<int>[+-]?\d+(?:_\d+)*)'
+    r'|(?P<float>[+-]?(?:'
+    r'(?:(?:\d+(?:_\d+)*)?\.\d+(?:_\d+)*|\d+(?:_\d+)*\.?)(?:[eE][+-]?\d+(?:_\d+)*)?'
+    r'|(?i:inf|infinity|nan)))'
+    r'|(?P<bool>True|False)'
+)
+"""int()とfloat()が受け付ける文字列と、True、Falseに一致する正規表現"""
+
+_INI_LINE = re.compile(
+    r'\[(?P<section>[^\]]+)\]\s*'
+    r'|(?P<key>[^\s=:\[#;][^=:]*?)\s*[=:]\s*(?P<value>.*?)\s*'
+    r'|[#;].*'
+)
+"""インデントの無いiniの1行(セクション、キーと値、コメント)に一致する正規表現"""
+
 
 def _restore_ini_config(input_str: str) -> IniConfigValue:
     """iniファイル化でstrに変換された値を元に戻す
 
+    int()とfloat()を順に試して例外で判定するのではなく、コンパイル済みの正規表現で分類する
+    大半を占める文字列の値は変換を試みずにそのまま返す
+
     Args:
         input_str (str): iniから読み込んだ値
 
     Returns:
         IniConfigValue: 修正された値
     """
-    try:
-        return int(input_str)
-    except ValueError:
-        pass
-
-    try:
+    matched = _INI_SCALAR.fullmatch(input_str)
+    if matched is None:
+        return input_str
+
+    kind = matched.lastgroup
+    if kind == 'int':
+        try:
+            return int(input_str)
+        except ValueError:
+            # 桁数がsys.get_int_max_str_digits()を超える整数
+            return float(input_str)
+    if kind == 'float':
         return float(input_str)
-    except ValueError:
-        pass
-
-    if input_str == 'True':
-        return True
-    if input_str == 'False':
-        return False
-
-    return input_str
+    return input_str == 'True'
 
 
 def _restore_ini_configs(input_dict: dict[str, str]) -> dict[str, IniConfigValue]:
@@ -54,8 +83,120 @@ def _restore_ini_configs(input_dict: dict[str, str]) -> dict[str, IniConfigValue
     return {key: _restore_ini_config(value) for key, value in input_dict.items()}
 
 
+def _config_to_dict(
+    config: ConfigParser,
+) -> dict[str, IniConfigValue] | dict[str, dict[str, IniConfigValue]]:
+    """ConfigParserの内容を型を復元した辞書に変換する
+
+    セクションが1つだけの場合はセクションを省略した辞書にする
+
+    Args:
+        config (ConfigParser): iniファイルを読み込んだConfigParser
+
+    Returns:
+        dict[str, IniConfigValue] | dict[str, dict[str, IniConfigValue]]: 変換した辞書
+    """
+    return _flatten_sections(
+        {i: _restore_ini_configs(dict(config.items(i))) for i in config.sections()}
+    )
+
+
+def _flatten_sections(
+    sections: dict[str, dict[str, IniConfigValue]],
+) -> dict[str, IniConfigValue] | dict[str, dict[str, IniConfigValue]]:
+    """セクションが1つだけの場合はセクションを省略した辞書にする
+
+    Args:
+        sections (dict[str, dict[str, IniConfigValue]]): セクションごとの辞書
+
+    Returns:
+        dict[str, IniConfigValue] | dict[str, dict[str, IniConfigValue]]: 変換した辞書
+    """
+    if len(sections) > 1:
+        return sections
+    if len(sections) == 1:
+        return next(iter(sections.values()))
+    log.warning('iniファイルのセクションが存在しません')
+    return {}
+
+
+def _scan_ini(text: str) -> dict[str, dict[str, IniConfigValue]] | None:
+    """ConfigParserの既定の設定と同じ結果になる記述だけのiniを、1回の走査で読み込む
+
+    ConfigParserのようにセクションごとの辞書を作ってからコピーせず、
+    行ごとに正規表現で分類しながら値の型の復元もする
+    %による補間、DEFAULTセクション、インデントによる複数行の値、重複したセクションやキー、
+    セクションの無いキーなど、ConfigParserと結果が異なり得る記述があればNoneを返す
+
+    Returns:
+        dict[str, dict[str, IniConfigValue]] | None: セクションごとの辞書
+    """
+    if '%' in text:
+        return None
+
+    sections: dict[str, dict[str, IniConfigValue]] = {}
+    current: dict[str, IniConfigValue] | None = None
+    match_line = _INI_LINE.fullmatch
+    restore = _restore_ini_config
+
+    for line in text.split('\n'):
+        if not line or line[0].isspace():
+            stripped = line.strip()
+            if not stripped or stripped[0] in '#;':
+                continue
+            return None
+
+        matched = match_line(line)
+        if matched is None:
+            return None
+
+        key = matched['key']
+        if key is not None:
+            key = key.lower()
+            if current is None or key in current:
+                return None
+            current[key] = restore(matched['value'])
+            continue
+
+        section = matched['section']
+        if section is not None:
+            if section in sections or section == 'DEFAULT':
+                return None
+            current = sections[section] = {}
+
+    return sections
+
+
+def _read_ini_core(f: IO[Any]) -> ConfigParser:
+    config = ConfigParser()
+    config.read_file(f)
+    return config
+
+
+def _read_ini_dict_core(
+    f: IO[Any],
+) -> dict[str, IniConfigValue] | dict[str, dict[str, IniConfigValue]]:
+    """_scan_iniで読み込み、扱えない記述があればConfigParserで読み込み直す"""
+    text = f.read()
+    sections = _scan_ini(text)
+    if sections is not None:
+        return _flatten_sections(sections)
+
+    log.debug('ConfigParserで読み込みます')
+    config = ConfigParser()
+    config.read_string(text)
+    return _config_to_dict(config)
+
+
+FORMAT_READER = FormatReader(func=_read_ini_dict_core, mode='r')
+
+
 def read_ini(
     path: str | PathLike[str],
+    *,
+    cache: CacheMode | None = None,
+    lock: bool = False,
+    engine: IniEngine = 'fast',
 ) -> dict[str, IniConfigValue] | dict[str, dict[str, IniConfigValue]]:
     """iniをファイルを読み込み、辞書に変換して出力する
 
@@ -64,35 +205,119 @@ def read_ini(
 
     Args:
         path (str | PathLike[str]): _description_
+        cache (CacheMode | None): 読み込み結果のキャッシュの使い方
+            'copy'で呼び出しごとのコピー、'frozen'で共有の変更不可能な辞書を返す
+            ファイルが更新されていればキャッシュは使われない. Defaults to None.
+        lock (bool): 共有ロックを取得してから読み込み、update_iniによる書き込みの途中の
+            内容を読み込まないようにする. Defaults to False.
+        engine (IniEngine): 'fast'は1回の走査で型の復元まで行う専用のパーサーで読み込み、
+            %による補間や複数行の値などがあればConfigParserで読み込み直す
+            'configparser'は常にConfigParserで読み込む
+            どちらも結果は同じになる. Defaults to 'fast'.
 
     Returns:
         dict[str, IniConfigValue] | dict[str, dict[str, IniConfigValue]]:
             IniConfigValueはiniに保存できるstr,int,float,boolの4種類のどれか
     """
 
-    def read_ini_core(
-        f: IO[Any],
-    ) -> ConfigParser:
-        config = ConfigParser()
-        config.read_file(f)
-        return config
+    def load() -> dict:
+        if engine == 'fast':
+            return common_file_read_exception_handling(
+                func=_read_ini_dict_core, return_empty_value={}, path=path, lock=lock
+            )
+        config = common_file_read_exception_handling(
+            func=_read_ini_core, return_empty_value=ConfigParser(), path=path, lock=lock
+        )
+        return _config_to_dict(config)
 
-    config = common_file_read_exception_handling(
-        func=read_ini_core, return_empty_value=ConfigParser(), path=path
-    )
+    return cached_read('ini', path, load, cache, persistent=True)
 
-    config_sections = config.sections()
-    config_result: dict = {}
-    if len(config_sections) > 1:
-        for i in config_sections:
-            config_result[i] = _restore_ini_configs(dict(config.items(i)))
-    elif len(config_sections) == 1:
-        config_result = _restore_ini_configs(dict(config.items(config_sections[0])))
-    else:
-        log.warning('iniファイルのセクションが存在しません')
-        config_result = {}
 
-    return config_result
+_INI_SECTION_HEADER = re.compile(r'^\[([^\]\n]+)\][^\S\n]*$', re.MULTILINE)
+"""インデントの無いセクションの行に一致する正規表現"""
+
+_INI_BRACKET_LINE = re.compile(r'^[^\S\n]*\[', re.MULTILINE)
+"""[で始まる全ての行に一致する正規表現"""
+
+
+def _index_ini_sections(text: str) -> SectionSpans | None:
+    """セクションごとのテキスト上の範囲を索引する
+
+    セクション単位でパースした結果が、ファイル全体をパースした結果と同じになる場合だけ索引する
+    %による補間、DEFAULTセクション、重複したセクション、セクションとして扱えない[で始まる行、
+    最初のセクションより前のキーがあればNoneを返す
+
+    Returns:
+        SectionSpans | None: セクションごとの範囲
+    """
+    if '%' in text:
+        return None
+
+    headers = list(_INI_SECTION_HEADER.finditer(text))
+    if len(headers) != len(_INI_BRACKET_LINE.findall(text)):
+        return None
+    if headers and _scan_ini(text[: headers[0].start()]) != {}:
+        return None
+
+    spans: SectionSpans = {}
+    if not headers:
+        return spans
+    ends = [i.start() for i in headers[1:]] + [len(text)]
+    for header, end in zip(headers, ends, strict=True):
+        section = header[1]
+        if section in spans or section == 'DEFAULT':
+            return None
+        spans[section] = [(header.start(), end)]
+    return spans
+
+
+def _parse_ini_section(section: str, text: str) -> dict[str, IniConfigValue]:
+    """1つのセクションのテキストをパースし、型を復元した辞書にする"""
+    sections = _scan_ini(text)
+    if sections is not None:
+        return sections[section]
+
+    config = ConfigParser()
+    config.read_string(text)
+    return _restore_ini_configs(dict(config.items(section)))
+
+
+def _read_ini_lazy_core(
+    f: IO[Any],
+) -> LazySections | dict[str, IniConfigValue] | dict[str, dict[str, IniConfigValue]]:
+    """セクションを索引してLazySectionsにし、索引できなければ全体を読み込む"""
+    text = f.read()
+    spans = _index_ini_sections(text)
+    if spans is None or len(spans) <= 1:
+        log.debug('セクションを索引せずに読み込みます')
+        return _read_ini_dict_core(StringIO(text))
+    return LazySections(text, spans, _parse_ini_section)
+
+
+def read_ini_lazy(
+    path: str | PathLike[str], *, lock: bool = False
+) -> Mapping[str, dict[str, IniConfigValue]] | dict[str, IniConfigValue]:
+    """iniファイルを読み込み、各セクションを初めて参照した時にパースするMappingを返す
+
+    読み込み時にはセクションの位置だけを索引し、値の型の復元は参照したセクションだけ行うので、
+    多数のセクションのうち一部だけを使う場合はread_iniより速く、メモリーの使用量も少ない
+    結果はread_iniと同じで、キーの順番や比較、keys()やitems()なども同じように使える
+    ただしdictではなく読み取り専用のMappingなので、変更やjson.dumpsなどにはdict()で変換する
+    セクションが1つだけの場合や、%による補間などでセクション単位に分けられない場合は、
+    read_iniと同じく全体を読み込んだ辞書を返す
+
+    Args:
+        path (str | PathLike[str]): 読み込むファイルのパス
+        lock (bool): 共有ロックを取得してから読み込み、update_iniによる書き込みの途中の
+            内容を読み込まないようにする. Defaults to False.
+
+    Returns:
+        Mapping[str, dict[str, IniConfigValue]] | dict[str, IniConfigValue]:
+            セクションが2つ以上あればLazySections、読み込みに失敗した場合は空の辞書
+    """
+    return common_file_read_exception_handling(
+        func=_read_ini_lazy_core, return_empty_value={}, path=path, lock=lock
+    )
 
 
 def _correct_all_input_values(input_dict: dict) -> bool:
@@ -150,7 +375,11 @@ def _data_ini_convertible_is_decision(
 def write_ini(
     data: dict[str, IniConfigValue] | dict[str, dict[str, IniConfigValue]],
     path: str | PathLike[str],
-) -> bool:
+    *,
+    atomic: bool = False,
+    durability: Durability = 'none',
+    skip_unchanged: bool = False,
+) -> WriteResult:
     """辞書をiniファイルとして保存する
 
     保存できる要素は IniConfigValue = str | int | float | bool の4種類
@@ -159,16 +388,23 @@ def write_ini(
         data (dict[str, IniConfigValue] | dict[str, dict[str, IniConfigValue]]):
             iniに書き込む辞書オブジェクト
         path (str | PathLike[str]): 保存するファイルパス、ファイル名の拡張子まで記入
+        atomic (bool): 一時ファイルに書き込んでから置き換え、書き込み途中のファイルが
+            読み込まれたり、クラッシュ時に残ったりしないようにする. Defaults to False.
+        durability (Durability): 書き込み完了時にfsyncする範囲
+            'none'はfsyncしない、'file'はファイル、'full'はファイルと親ディレクトリ
+            Defaults to 'none'.
+        skip_unchanged (bool): 既存のファイルと内容が同じなら書き込まない. Defaults to False.
 
     Returns:
-        bool: ファイルの保存に成功したらTrue、失敗したらFalse
+        WriteResult: 書き込んだらWRITTEN、内容が同じで書き込まなかったらUNCHANGED、
+            失敗したらFAILED(偽)
     """
     path = Path(path)
 
     config = _data_ini_convertible_is_decision(data)
 
     if len(config.sections()) == 0:
-        return False
+        return WriteResult.FAILED
 
     def write_ini_core(
         config: object,
@@ -177,4 +413,60 @@ def write_ini(
         if isinstance(config, ConfigParser):
             config.write(f)
 
-    return common_file_write_exception_handling(func=write_ini_core, data=config, path=path)
+    return common_file_write_exception_handling(
+        func=write_ini_core,
+        data=config,
+        path=path,
+        atomic=atomic,
+        durability=durability,
+        skip_unchanged=skip_unchanged,
+    )
+
+
+def update_ini(
+    path: str | PathLike[str],
+    func: Callable[[dict], dict | None],
+    *,
+    timeout: float | None = DEFAULT_LOCK_TIMEOUT,
+    durability: Durability = 'none',
+) -> WriteResult:
+    """iniファイルを排他ロックして読み込み、funcで更新して書き込む
+
+    複数のプロセスが同じファイルを同時に更新しても、更新が失われない
+    funcにはread_iniと同じ形式の辞書を渡す
+    ファイルが無い場合は空の辞書をfuncに渡し、新しく作成する
+
+    Args:
+        path (str | PathLike[str]): 更新するファイルのパス
+        func (Callable[[dict], dict | None]): 読み込んだ辞書を受け取り、書き込む辞書を返す関数
+            Noneを返した場合は、受け取った辞書を変更したものとしてその辞書を書き込む
+        timeout (float | None): ロックを待つ秒数、Noneの場合は無期限に待つ
+            Defaults to DEFAULT_LOCK_TIMEOUT.
+        durability (Durability): 書き込み完了時にfsyncする範囲
+            'none'はfsyncしない、'file'はファイル、'full'はファイルと親ディレクトリ
+            Defaults to 'none'.
+
+    Raises:
+        ValueError: funcが返した辞書がini化できない場合、ファイルは変更しない
+
+    Returns:
+        WriteResult: 書き込んだらWRITTEN、内容が変わらず書き込まなかったらUNCHANGED、
+            失敗したらFAILED(偽)
+    """
+
+    def update_ini_core(data: object, f: IO[Any]) -> None:
+        config = _data_ini_convertible_is_decision(cast('dict', data))
+        if len(config.sections()) == 0:
+            msg = f'ini化できない内容のため更新しませんでした: {path}'
+            raise ValueError(msg)
+        config.write(f)
+
+    return common_file_update_exception_handling(
+        read_func=_read_ini_dict_core,
+        write_func=update_ini_core,
+        update=func,
+        empty_factory=dict,
+        path=path,
+        timeout=timeout,
+        durability=durability,
+    )
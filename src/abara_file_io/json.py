@@ -1,52 +1,224 @@
 import json
+from collections.abc import Callable
+from functools import cache
 from logging import getLogger
 from os import PathLike
-from typing import IO, Any
+from types import ModuleType
+from typing import IO, Any, Literal
 
+from abara_file_io.cache import CacheMode, cached_read
 from abara_file_io.common_io_wrapper import (
+    DEFAULT_LOCK_TIMEOUT,
+    Durability,
+    WriteResult,
     common_file_read_exception_handling,
+    common_file_update_exception_handling,
     common_file_write_exception_handling,
 )
+from abara_file_io.formats import FormatReader
 
 log = getLogger(__name__)
 
 
-def read_json(path: str | PathLike[str]) -> dict:
+type JsonBackend = Literal['json', 'orjson']
+
+
+def _read_json_core(f: IO[Any]) -> dict:
+    return json.load(f)
+
+
+FORMAT_READER = FormatReader(func=_read_json_core, mode='r')
+
+
+def read_json(
+    path: str | PathLike[str], *, cache: CacheMode | None = None, lock: bool = False
+) -> dict:
     """jsonファイルを読み込む
 
     Args:
         path (str): 読み込むjsonファイルのパス
+        cache (CacheMode | None): 読み込み結果のキャッシュの使い方
+            'copy'で呼び出しごとのコピー、'frozen'で共有の変更不可能な辞書を返す
+            ファイルが更新されていればキャッシュは使われない. Defaults to None.
+        lock (bool): 共有ロックを取得してから読み込み、update_jsonによる書き込みの途中の
+            内容を読み込まないようにする. Defaults to False.
 
     Returns:
         dict: 辞書
     """
 
-    def read_json_core(
-        f: IO[Any],
-    ) -> dict:
-        return json.load(f)
+    def load() -> dict:
+        return common_file_read_exception_handling(
+            func=_read_json_core, return_empty_value={}, path=path, lock=lock
+        )
 
-    return common_file_read_exception_handling(
-        func=read_json_core, return_empty_value={}, path=path
-    )
+    return cached_read('json', path, load, cache)
+
+
+def _dumps_json(data: object, *, ensure_ascii: bool, compact: bool) -> str:
+    """標準ライブラリのjsonで文字列化する
+
+    json.dumpはチャンクごとにファイルへ書き込むので、一度の書き込みで済むjson.dumpsを使う
+    indentを指定しないcompactの場合はC実装のエンコーダーが使われる
+
+    Returns:
+        str: JSON文字列
+    """
+    if compact:
+        return json.dumps(data, ensure_ascii=ensure_ascii, separators=(',', ':'))
+    return json.dumps(data, indent=2, ensure_ascii=ensure_ascii)
+
+
+@cache
+def _orjson() -> ModuleType | None:
+    """orjsonを最初に必要になった時に一度だけ読み込む
+
+    インストールされていない場合に、書き込みのたびにimportの検索をしないよう結果を保持する
+
+    Returns:
+        ModuleType | None: orjsonのモジュール、インストールされていない場合はNone
+    """
+    try:
+        import orjson  # noqa: PLC0415  # pyright: ignore[reportMissingImports]
+    except ImportError:
+        log.debug('orjsonがインストールされていないので標準ライブラリのjsonを使います')
+        return None
+    return orjson
+
+
+def _dumps_orjson(data: object, *, compact: bool) -> bytes | None:
+    """orjsonでバイト列化する
 
+    Returns:
+        bytes | None: UTF-8のJSON、orjsonが無いかorjsonで扱えないデータの場合はNone
+    """
+    orjson = _orjson()
+    if orjson is None:
+        return None
+
+    option = orjson.OPT_NON_STR_KEYS
+    if not compact:
+        option |= orjson.OPT_INDENT_2
+
+    try:
+        return orjson.dumps(data, option=option)
+    except TypeError:
+        log.debug('orjsonで扱えないデータなので標準ライブラリのjsonを使います')
+        return None
+
+
+def _encode_json(
+    data: object, *, ensure_ascii: bool, compact: bool, backend: JsonBackend
+) -> bytes:
+    """書き込むJSONをUTF-8のバイト列にする
 
-def write_json(data: dict, path: str | PathLike[str], *, ensure_ascii: bool = False) -> bool:
+    Returns:
+        bytes: UTF-8のJSON
+    """
+    encoded = None
+    if backend == 'orjson' and not ensure_ascii:
+        encoded = _dumps_orjson(data, compact=compact)
+    if encoded is None:
+        encoded = _dumps_json(data, ensure_ascii=ensure_ascii, compact=compact).encode('utf_8')
+    return encoded
+
+
+def write_json(
+    data: dict,
+    path: str | PathLike[str],
+    *,
+    ensure_ascii: bool = False,
+    compact: bool = False,
+    backend: JsonBackend = 'json',
+    atomic: bool = False,
+    durability: Durability = 'none',
+    skip_unchanged: bool = False,
+) -> WriteResult:
     r"""jsonファイルを書き込む
 
     Args:
         data (dict): jsonに書き込む辞書オブジェクト
         path (str | PathLike): 保存するファイルパス、ファイル名の拡張子まで記入
         ensure_ascii (bool): 非ASCII文字をエスケープする('あ'→'\\u3042')
+        compact (bool): インデントと空白を省略して書き込む
+            C実装のエンコーダーが使われるので、インデントありより数倍速い. Defaults to False.
+        backend (JsonBackend): 'orjson'を指定するとインストールされていればorjsonで書き込む
+            orjsonが無い場合、ensure_asciiがTrueの場合、orjsonで扱えないデータの場合は
+            標準ライブラリのjsonで書き込む
+            浮動小数点数の表記などが標準ライブラリと異なる場合がある. Defaults to 'json'.
+        atomic (bool): 一時ファイルに書き込んでから置き換え、書き込み途中のファイルが
+            読み込まれたり、クラッシュ時に残ったりしないようにする. Defaults to False.
+        durability (Durability): 書き込み完了時にfsyncする範囲
+            'none'はfsyncしない、'file'はファイル、'full'はファイルと親ディレクトリ
+            Defaults to 'none'.
+        skip_unchanged (bool): 既存のファイルと内容が同じなら書き込まない. Defaults to False.
 
     Returns:
-        bool: ファイルの保存に成功したらTrue、失敗したらFalse
+        WriteResult: 書き込んだらWRITTEN、内容が同じで書き込まなかったらUNCHANGED、
+            失敗したらFAILED(偽)
     """
 
     def write_json_core(
         data: object,
         f: IO[Any],
     ) -> None:
-        json.dump(data, f, indent=2, ensure_ascii=ensure_ascii)
+        f.write(_encode_json(data, ensure_ascii=ensure_ascii, compact=compact, backend=backend))
+
+    return common_file_write_exception_handling(
+        func=write_json_core,
+        data=data,
+        path=path,
+        mode='wb',
+        atomic=atomic,
+        durability=durability,
+        skip_unchanged=skip_unchanged,
+    )
+
+
+def update_json(
+    path: str | PathLike[str],
+    func: Callable[[dict], dict | None],
+    *,
+    ensure_ascii: bool = False,
+    compact: bool = False,
+    backend: JsonBackend = 'json',
+    timeout: float | None = DEFAULT_LOCK_TIMEOUT,
+    durability: Durability = 'none',
+) -> WriteResult:
+    """jsonファイルを排他ロックして読み込み、funcで更新して書き込む
+
+    複数のプロセスが同じファイルを同時に更新しても、更新が失われない
+    ファイルは一度だけ開き、ロックしたまま読み込みと書き込みをする
+    ファイルが無い場合は空の辞書をfuncに渡し、新しく作成する
+
+    Args:
+        path (str | PathLike[str]): 更新するファイルのパス
+        func (Callable[[dict], dict | None]): 読み込んだ辞書を受け取り、書き込む辞書を返す関数
+            Noneを返した場合は、受け取った辞書を変更したものとしてその辞書を書き込む
+        ensure_ascii (bool): 非ASCII文字をエスケープする. Defaults to False.
+        compact (bool): インデントと空白を省略して書き込む. Defaults to False.
+        backend (JsonBackend): 書き込みに使うライブラリ. Defaults to 'json'.
+        timeout (float | None): ロックを待つ秒数、Noneの場合は無期限に待つ
+            Defaults to DEFAULT_LOCK_TIMEOUT.
+        durability (Durability): 書き込み完了時にfsyncする範囲
+            'none'はfsyncしない、'file'はファイル、'full'はファイルと親ディレクトリ
+            Defaults to 'none'.
 
-    return common_file_write_exception_handling(func=write_json_core, data=data, path=path)
+    Returns:
+        WriteResult: 書き込んだらWRITTEN、内容が変わらず書き込まなかったらUNCHANGED、
+            失敗したらFAILED(偽)
+    """
+
+    def update_json_core(data: object, f: IO[Any]) -> None:
+        f.write(_encode_json(data, ensure_ascii=ensure_ascii, compact=compact, backend=backend))
+
+    return common_file_update_exception_handling(
+        read_func=_read_json_core,
+        write_func=update_json_core,
+        update=func,
+        empty_factory=dict,
+        path=path,
+        write_mode='wb',
+        timeout=timeout,
+        durability=durability,
+    )
@@ -0,0 +1,316 @@
+import json
+import re
+from collections.abc import Iterator
+from io import TextIOWrapper
+from itertools import islice
+from logging import getLogger
+from os import PathLike
+from typing import IO, Any
+
+from abara_file_io.common_io_wrapper import common_stream_read_exception_handling
+
+log = getLogger(__name__)
+
+
+JSON_CHUNK_SIZE = 1024 * 1024
+"""read_json_path、iter_json_itemsで一度に読み込む文字数"""
+
+type JsonPathSegment = str | int | None
+"""パスの1要素、strはオブジェクトのキー、intは配列の添字、Noneは全ての要素(*)"""
+
+_PATH_SEGMENT = re.compile(
+    r'\.?(?P<key>[^.\[\]]+)'
+    r'|\[(?:(?P<index>\d+)|(?P<wildcard>\*)|"(?P<quoted>[^"\\]*(?:\\.[^"\\]*)*)")\]'
+)
+"""パスの1要素(.key、key、[3]、[*]、["key"])に一致する正規表現"""
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+"""閉じている文字列に一致する正規表現"""
+
+_SCALAR = re.compile(r'[^ \t\n\r,\]}]*')
+"""数値、true、false、nullに一致する正規表現"""
+
+
+def _parse_json_path(query: str) -> list[JsonPathSegment]:
+    """'a.b[3].c'や'items.*'のようなパスを要素に分割する
+
+    Raises:
+        ValueError: パスとして不正な場合
+
+    Returns:
+        list[JsonPathSegment]: パスの要素
+    """
+    segments: list[JsonPathSegment] = []
+    query = query.removeprefix('$')
+    position = 0
+    while position < len(query):
+        matched = _PATH_SEGMENT.match(query, position)
+        if matched is None:
+            msg = f'JSONのパスとして不正です: {query}'
+            raise ValueError(msg)
+        if matched['key'] is not None:
+            segments.append(None if matched['key'] == '*' else matched['key'])
+        elif matched['index'] is not None:
+            segments.append(int(matched['index']))
+        elif matched['wildcard'] is not None:
+            segments.append(None)
+        else:
+            segments.append(json.loads(f'"{matched["quoted"]}"'))
+        position = matched.end()
+    return segments
+
+
+class _JsonScanner:
+    """JSONの文字列のチャンクを先頭から走査し、パスに一致する値だけを組み立てる
+
+    パスに一致しない値は読み込み済みのチャンク内で完結していればC実装のデコーダーで、
+    チャンクの境界をまたいでいれば要素ごとに読み飛ばし、読み終えた部分のチャンクは破棄する
+    保持するのは読み込み中のチャンクと、組み立て中の値の範囲だけになる
+    """
+
+    def __init__(self, chunks: Iterator[str]) -> None:
+        self._chunks = chunks
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._position = 0
+        self._mark: int | None = None
+
+    def _fill(self) -> bool:
+        """次のチャンクを読み込み、読み終えた部分を破棄する
+
+        Returns:
+            bool: 読み込めたらTrue、ファイルの末尾に達していたらFalse
+        """
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            return False
+        keep = self._position if self._mark is None else self._mark
+        self._buffer = self._buffer[keep:] + chunk
+        self._position -= keep
+        if self._mark is not None:
+            self._mark = 0
+        return True
+
+    def _error(self, msg: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(msg, self._buffer, self._position)
+
+    def _match_end(self, pattern: re.Pattern[str]) -> int:
+        """現在の位置からpatternに一致する範囲の終了位置、一致しなければ現在の位置を返す"""
+        matched = pattern.match(self._buffer, self._position)
+        return self._position if matched is None else matched.end()
+
+    def _peek(self) -> str:
+        """空白を読み飛ばし、次の文字を返す"""
+        while True:
+            self._position = self._match_end(_WHITESPACE)
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not self._fill():
+                msg = 'Expecting value'
+                raise self._error(msg)
+
+    def _expect(self, chars: str) -> str:
+        char = self._peek()
+        if char not in chars:
+            msg = f'Expecting one of {chars!r}'
+            raise self._error(msg)
+        self._position += 1
+        return char
+
+    def _read_key(self) -> str:
+        if self._peek() != '"':
+            msg = 'Expecting property name enclosed in double quotes'
+            raise self._error(msg)
+        # チャンクの境界で分断されたキーは、次のチャンクと合わせて読み直す
+        while (end := self._match_end(_STRING)) == self._position:
+            if not self._fill():
+                msg = 'Unterminated string'
+                raise self._error(msg)
+
+        key = self._buffer[self._position : end]
+        self._position = end
+        return json.loads(key) if '\\' in key else key[1:-1]
+
+    def _decode_in_buffer(self) -> tuple[Any, int] | None:
+        """現在の位置の値が読み込み済みのチャンク内で完結していれば、C実装のデコーダーで読み込む
+
+        Returns:
+            tuple[Any, int] | None: 値と終了位置、チャンクの境界で分断されていればNone
+        """
+        if self._buffer[self._position] not in '[{"':
+            # 数値などは分断されていても、途中までを値として読み込めてしまう
+            return None
+        try:
+            return self._decoder.raw_decode(self._buffer, self._position)
+        except json.JSONDecodeError:
+            return None
+
+    def _skip_value(self) -> None:
+        char = self._peek()
+        decoded = self._decode_in_buffer()
+        if decoded is not None:
+            self._position = decoded[1]
+            return
+        if char in '[{':
+            self._skip_children(char)
+            return
+
+        # チャンクの境界で分断されている可能性があれば、次のチャンクと合わせて読み直す
+        if char == '"':
+            while (end := self._match_end(_STRING)) == self._position:
+                if not self._fill():
+                    msg = 'Unterminated string'
+                    raise self._error(msg)
+        else:
+            while (end := self._match_end(_SCALAR)) == len(self._buffer) and self._fill():
+                pass
+            if end == self._position:
+                msg = 'Expecting value'
+                raise self._error(msg)
+        self._position = end
+
+    def _skip_children(self, char: str) -> None:
+        """チャンクの境界をまたぐ配列、オブジェクトを、要素ごとに読み飛ばす"""
+        close = ']' if char == '[' else '}'
+        self._expect(char)
+        if self._peek() == close:
+            self._position += 1
+            return
+        while True:
+            if char == '{':
+                self._read_key()
+                self._expect(':')
+            self._skip_value()
+            if self._expect(f',{close}') == close:
+                return
+
+    def _read_value(self) -> Any:  # noqa: ANN401
+        self._peek()
+        decoded = self._decode_in_buffer()
+        if decoded is not None:
+            value, self._position = decoded
+            return value
+
+        # 値の先頭を保持したまま値の終わりまで読み込み、まとめてデコードする
+        self._mark = self._position
+        try:
+            self._skip_value()
+            value, end = self._decoder.raw_decode(self._buffer, self._mark)
+        finally:
+            start, self._mark = self._mark, None
+        if end != self._position:
+            self._position = start
+            msg = 'Extra data'
+            raise self._error(msg)
+        return value
+
+    def iter_matches(self, segments: list[JsonPathSegment]) -> Iterator[Any]:
+        """現在の位置の値から、パスに一致する値を順に返す"""
+        if not segments:
+            yield self._read_value()
+            return
+
+        segment, rest = segments[0], segments[1:]
+        char = self._peek()
+        if char == '{' and not isinstance(segment, int):
+            yield from self._iter_object(segment, rest)
+        elif char == '[' and not isinstance(segment, str):
+            yield from self._iter_array(segment, rest)
+        else:
+            self._skip_value()
+
+    def _iter_object(self, segment: str | None, rest: list[JsonPathSegment]) -> Iterator[Any]:
+        self._expect('{')
+        if self._peek() == '}':
+            self._position += 1
+            return
+        while True:
+            key = self._read_key()
+            self._expect(':')
+            if segment is None or key == segment:
+                yield from self.iter_matches(rest)
+            else:
+                self._skip_value()
+            if self._expect(',}') == '}':
+                return
+
+    def _iter_array(self, segment: int | None, rest: list[JsonPathSegment]) -> Iterator[Any]:
+        self._expect('[')
+        if self._peek() == ']':
+            self._position += 1
+            return
+        index = 0
+        while True:
+            if segment is None or index == segment:
+                yield from self.iter_matches(rest)
+            else:
+                self._skip_value()
+            if self._expect(',]') == ']':
+                return
+            index += 1
+
+
+def _iter_json_chunks(f: IO[bytes], encoding: str) -> Iterator[str]:
+    text = TextIOWrapper(f, encoding=encoding)
+    while chunk := text.read(JSON_CHUNK_SIZE):
+        yield chunk
+
+
+def iter_json_items(path: str | PathLike[str], query: str) -> Iterator[Any]:
+    """JSONファイルを少しずつ読み込み、パスに一致する値を順に返す
+
+    ファイル全体を組み立てずに走査し、一致した値だけを組み立てるので、
+    使用メモリーはファイルの大きさではなく、一致した値の大きさ程度になる
+    文字コードはファイル先頭から判定し、圧縮ファイルは展開しながら読み込む
+
+    パスは'.'でキーを区切り、配列の添字は[3]、全ての要素は*か[*]、
+    '.'を含むキーは["a.b"]と指定する。空文字列はJSON全体を表す
+    例: 'services.api.replicas'、'items.*'、'items[*].name'、'a.b[3].c'
+
+    Args:
+        path (str | PathLike[str]): 読み込むファイルのパス
+        query (str): 取り出す値のパス
+
+    Raises:
+        ValueError: パスとして不正な場合
+
+    Yields:
+        Any: パスに一致した値、読み込みに失敗した場合は警告を出してその時点で終了する
+            JSONとして不正な記述があればjson.JSONDecodeErrorを送出する
+    """
+    segments = _parse_json_path(query)
+
+    def iter_json_items_core(f: IO[bytes], encoding: str) -> Iterator[Any]:
+        return _JsonScanner(_iter_json_chunks(f, encoding)).iter_matches(segments)
+
+    return common_stream_read_exception_handling(func=iter_json_items_core, path=path)
+
+
+def read_json_path(path: str | PathLike[str], query: str, default: Any = None) -> Any:  # noqa: ANN401
+    """JSONファイルから、パスに一致する最初の値だけを読み込む
+
+    一致する値が見つかった時点で読み込みを終了するので、大きなファイルの一部だけを
+    取り出す場合はread_jsonより速く、使用メモリーも取り出した値の大きさ程度になる
+    パスの書式はiter_json_itemsと同じ
+
+    Args:
+        path (str | PathLike[str]): 読み込むファイルのパス
+        query (str): 取り出す値のパス、例: 'services.api.replicas'、'a.b[3].c'
+        default (Any): 一致する値が無いか、読み込みに失敗した場合に返す値. Defaults to None.
+
+    Raises:
+        ValueError: パスとして不正な場合
+
+    Returns:
+        Any: パスに一致した値
+    """
+    segments = _parse_json_path(query)
+
+    def read_json_path_core(f: IO[bytes], encoding: str) -> Iterator[Any]:
+        # 最初の値で反復を終えて、ファイルを閉じる
+        return islice(_JsonScanner(_iter_json_chunks(f, encoding)).iter_matches(segments), 1)
+
+    values = list(common_stream_read_exception_handling(func=read_json_path_core, path=path))
+    return values[0] if values else default
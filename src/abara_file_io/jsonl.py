@@ -0,0 +1,117 @@
+import json
+from collections.abc import Iterable, Iterator
+from io import TextIOWrapper
+from logging import getLogger
+from os import PathLike
+from typing import IO, Any, cast
+
+from abara_file_io.common_io_wrapper import (
+    Durability,
+    WriteResult,
+    common_file_write_exception_handling,
+    common_stream_read_exception_handling,
+)
+
+log = getLogger(__name__)
+
+
+def iter_jsonl(path: str | PathLike[str]) -> Iterator[Any]:
+    """JSON Linesファイルを1行ずつ読み込む
+
+    ファイル全体をメモリーに読み込まないので、ファイルの大きさに関わらず使用メモリーは一定になる
+    文字コードはファイル先頭から判定する
+    JSONとして不正な行は警告を出して読み飛ばす(追記中に中断された末尾の行など)
+
+    Args:
+        path (str | PathLike[str]): 読み込むファイルのパス
+
+    Yields:
+        Any: 1行ごとのJSONの値、読み込みに失敗した場合はその時点で終了する
+    """
+
+    def iter_jsonl_core(f: IO[bytes], encoding: str) -> Iterator[Any]:
+        text = TextIOWrapper(f, encoding=encoding)
+        for line_number, line in enumerate(text, start=1):
+            if line.strip() == '':
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                log.warning(f'JSONとして不正な行を読み飛ばしました({line_number}行目): {path}')
+
+    return common_stream_read_exception_handling(func=iter_jsonl_core, path=path)
+
+
+def _write_records(records: Iterable[object], f: IO[Any], *, ensure_ascii: bool) -> None:
+    """1レコードを1行のJSONとして書き込む"""
+    encoder = json.JSONEncoder(ensure_ascii=ensure_ascii, separators=(',', ':'))
+    for record in records:
+        f.write(encoder.encode(record))
+        f.write('\n')
+
+
+def write_jsonl(
+    data: Iterable[object],
+    path: str | PathLike[str],
+    *,
+    ensure_ascii: bool = False,
+    atomic: bool = False,
+    durability: Durability = 'none',
+) -> WriteResult:
+    """JSON Linesファイルを書き込む
+
+    イテラブルから1レコードずつ書き込むので、ジェネレーターを渡せば全体をメモリーに保持しない
+
+    Args:
+        data (Iterable[object]): 1行ずつ書き込む値
+        path (str | PathLike[str]): 保存するファイルパス、ファイル名の拡張子まで記入
+        ensure_ascii (bool): 非ASCII文字をエスケープする. Defaults to False.
+        atomic (bool): 一時ファイルに書き込んでから置き換え、書き込み途中のファイルが
+            読み込まれたり、クラッシュ時に残ったりしないようにする. Defaults to False.
+        durability (Durability): 書き込み完了時にfsyncする範囲
+            'none'はfsyncしない、'file'はファイル、'full'はファイルと親ディレクトリ
+            Defaults to 'none'.
+
+    Returns:
+        WriteResult: 書き込んだらWRITTEN、失敗したらFAILED(偽)
+    """
+
+    def write_jsonl_core(data: object, f: IO[Any]) -> None:
+        _write_records(cast('Iterable[object]', data), f, ensure_ascii=ensure_ascii)
+
+    return common_file_write_exception_handling(
+        func=write_jsonl_core, data=data, path=path, atomic=atomic, durability=durability
+    )
+
+
+def append_jsonl(
+    data: Iterable[object],
+    path: str | PathLike[str],
+    *,
+    ensure_ascii: bool = False,
+    durability: Durability = 'none',
+) -> WriteResult:
+    """JSON Linesファイルの末尾に追記する
+
+    ファイルを一度だけ開き、バッファリングしてまとめて書き込む
+    1レコードずつ呼び出すよりも、ある程度まとめて渡した方が速い
+    ファイルが無い場合は作成する
+
+    Args:
+        data (Iterable[object]): 1行ずつ追記する値
+        path (str | PathLike[str]): 追記するファイルパス
+        ensure_ascii (bool): 非ASCII文字をエスケープする. Defaults to False.
+        durability (Durability): 書き込み完了時にfsyncする範囲
+            'none'はfsyncしない、'file'はファイル、'full'はファイルと親ディレクトリ
+            Defaults to 'none'.
+
+    Returns:
+        WriteResult: 書き込んだらWRITTEN、失敗したらFAILED(偽)
+    """
+
+    def append_jsonl_core(data: object, f: IO[Any]) -> None:
+        _write_records(cast('Iterable[object]', data), f, ensure_ascii=ensure_ascii)
+
+    return common_file_write_exception_handling(
+        func=append_jsonl_core, data=data, path=path, mode='a', durability=durability
+    )
@@ -0,0 +1,108 @@
+from collections.abc import Callable, Iterator, Mapping
+from logging import getLogger
+from typing import Any
+
+log = getLogger(__name__)
+
+
+type SectionSpans = dict[str, list[tuple[int, int]]]
+"""セクション名と、そのセクションが記述されたテキスト上の範囲(開始, 終了)のリスト"""
+
+
+class LazySections(Mapping[str, Any]):
+    """セクションを初めて参照した時にパースする、読み込み結果の読み取り専用のMapping
+
+    読み込み時にはセクションの位置だけを索引し、パースと型の復元は参照されたセクションだけ行う
+    一度パースしたセクションは保持し、全てのセクションをパースしたら元のテキストは破棄する
+    キーの順番、比較(==)、keys()やitems()などは、通常の読み込み結果のdictと同じ
+    dictのサブクラスではないので、変更やjson.dumpsなどdictが必要な場合はdict()で変換する
+
+    ファイルの内容は読み込み時にメモリーに保持するので、後からファイルが変更されても影響しない
+    """
+
+    def __init__(
+        self,
+        text: str,
+        spans: SectionSpans,
+        parse: Callable[[str, str], Any],
+        *,
+        parsed: dict[str, Any] | None = None,
+        fallback: Callable[[str], dict[str, Any]] | None = None,
+    ) -> None:
+        """初期化
+
+        Args:
+            text (str): ファイル全体のテキスト
+            spans (SectionSpans): セクションごとのtext上の範囲
+            parse (Callable[[str, str], Any]): セクション名と、そのセクションの範囲を
+                連結したテキストを受け取り、セクションの値を返す関数
+            parsed (dict[str, Any] | None): 読み込み時にパース済みの値. Defaults to None.
+            fallback (Callable[[str], dict[str, Any]] | None): セクション単位のパースに
+                失敗した時に、ファイル全体をパースする関数. Defaults to None.
+        """
+        self._text = text
+        self._spans = spans
+        self._parse = parse
+        self._fallback = fallback
+        self._parsed: dict[str, Any] = dict(parsed or {})
+        self._keys = [*self._parsed, *(i for i in spans if i not in self._parsed)]
+
+    def __getitem__(self, key: str) -> Any:  # noqa: ANN401
+        if key in self._parsed:
+            return self._parsed[key]
+        spans = self._spans[key]
+
+        chunk = ''.join(self._text[start:end] for start, end in spans)
+        try:
+            value = self._parse(key, chunk)
+        except ValueError:
+            if self._fallback is None:
+                raise
+            # 区切りの判定を誤ったセクションは、ファイル全体のパース結果に置き換える
+            log.debug(f'セクション{key}を単独でパースできないため、全体をパースします')
+            self._adopt(self._fallback(self._text))
+            if key not in self._parsed:
+                # 区切りの判定を誤って索引したキーは、全体のパース結果には存在しない
+                raise KeyError(key) from None
+            return self._parsed[key]
+
+        self._parsed[key] = value
+        if len(self._parsed) == len(self._keys):
+            self._text = ''
+        return value
+
+    def _adopt(self, data: dict[str, Any]) -> None:
+        """ファイル全体をパースした結果を、全てパース済みのセクションとして保持する"""
+        self._parsed = data
+        self._keys = list(data)
+        self._spans = {}
+        self._text = ''
+
+    def __iter__(self) -> Iterator[str]:
+        yielded: set[str] = set()
+        while True:
+            keys = self._keys
+            for key in keys:
+                if key in yielded:
+                    continue
+                yielded.add(key)
+                yield key
+                if keys is not self._keys:
+                    # items()などの途中で全体をパースし直した場合は、新しいキーで続ける
+                    break
+            else:
+                return
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._parsed or key in self._spans
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self._keys!r})'
+
+    @property
+    def parsed_sections(self) -> list[str]:
+        """パース済みのセクション名"""
+        return list(self._parsed)
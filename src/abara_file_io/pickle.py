@@ -0,0 +1,225 @@
+import marshal
+import pickle
+import struct
+from io import BufferedReader
+from logging import getLogger
+from os import PathLike
+from typing import IO, Any, Literal, cast
+
+from abara_file_io.binary import _read_bytes_core
+from abara_file_io.common_io_wrapper import (
+    Durability,
+    WriteResult,
+    common_file_read_exception_handling,
+    common_file_write_exception_handling,
+)
+from abara_file_io.formats import FormatReader
+
+log = getLogger(__name__)
+
+
+type PickleBackend = Literal['pickle', 'marshal']
+
+PICKLE_PROTOCOL = 5
+"""write_pickleで使うpickleのプロトコル、out-of-bandのバッファーにはプロトコル5以上が必要"""
+
+_OUT_OF_BAND_MAGIC = b'ABFIOOB1'
+"""out-of-bandのバッファーを含むファイルの末尾に書き込む識別子"""
+
+_SIZE = struct.Struct('<Q')
+
+_PICKLE_HEAD = b'\x80' + bytes([PICKLE_PROTOCOL])
+"""write_pickleで書き込んだpickleの先頭、PROTO命令とプロトコル"""
+_PICKLE_STOP = b'.'
+"""pickleの末尾のSTOP命令"""
+
+
+class _BrokenPickleError(pickle.UnpicklingError):
+    """pickleかmarshalのデータが途中で切れているか壊れている"""
+
+
+def _write_out_of_band(data: object, f: IO[Any]) -> None:
+    """pickleとout-of-bandのバッファーを続けて書き込む
+
+    ファイルの構成は、pickle、各バッファーの内容、各バッファーの大きさ、バッファーの数、識別子
+    バッファーはpickleにコピーせず、元のオブジェクトのメモリーから直接書き込む
+    """
+    buffers: list[pickle.PickleBuffer] = []
+    pickle.dump(data, f, protocol=PICKLE_PROTOCOL, buffer_callback=buffers.append)
+
+    sizes = []
+    for buffer in buffers:
+        with buffer.raw() as raw:
+            f.write(raw)
+            sizes.append(raw.nbytes)
+    f.write(b''.join(_SIZE.pack(i) for i in (*sizes, len(sizes))))
+    f.write(_OUT_OF_BAND_MAGIC)
+
+
+def _split_out_of_band(view: memoryview) -> tuple[memoryview, list[memoryview]] | None:
+    """out-of-bandのバッファーを含むファイルを、pickleとバッファーに分割する
+
+    末尾が識別子と一致しても、偶然同じバイト列で終わるpickleやmarshalの可能性があるので、
+    バッファーの数と大きさがファイルに収まり、残りがプロトコル5のpickleの形をしている場合だけ
+    out-of-bandのバッファーを含むファイルとして扱う
+
+    Returns:
+        tuple[memoryview, list[memoryview]] | None: pickleとバッファー、
+            out-of-bandのバッファーを含まないファイルの場合はNone
+    """
+    trailer = len(_OUT_OF_BAND_MAGIC) + _SIZE.size
+    if len(view) < trailer or view[-len(_OUT_OF_BAND_MAGIC) :] != _OUT_OF_BAND_MAGIC:
+        return None
+
+    (count,) = _SIZE.unpack(view[-trailer : -len(_OUT_OF_BAND_MAGIC)])
+    if count > (len(view) - trailer) // _SIZE.size:
+        return None
+    sizes_start = len(view) - trailer - _SIZE.size * count
+    sizes = [i for (i,) in _SIZE.iter_unpack(view[sizes_start:-trailer])]
+
+    pickle_end = sizes_start - sum(sizes)
+    if pickle_end < len(_PICKLE_HEAD) + len(_PICKLE_STOP):
+        return None
+    data = view[:pickle_end]
+    if data[: len(_PICKLE_HEAD)] != _PICKLE_HEAD or data[-len(_PICKLE_STOP) :] != _PICKLE_STOP:
+        return None
+
+    end = pickle_end
+    buffers = []
+    for size in sizes:
+        buffers.append(view[end : end + size])
+        end += size
+    return data, buffers
+
+
+def _loads(view: memoryview) -> Any:  # noqa: ANN401
+    """バイト列をpickleかmarshalとして読み込む"""
+    split = _split_out_of_band(view)
+    if split is not None:
+        data, buffers = split
+        return pickle.loads(data, buffers=buffers)  # noqa: S301
+    if view[:1] == b'\x80':
+        # プロトコル2以上のpickleはPROTO命令から始まる
+        return pickle.loads(view)  # noqa: S301
+    return marshal.loads(view)  # noqa: S302
+
+
+def _read_pickle_core(f: IO[Any], *, copy: bool = True) -> Any:  # noqa: ANN401
+    """pickleかmarshalのファイルを読み込む
+
+    copyがFalseで圧縮されていないファイルはmmapし、out-of-bandのバッファーはマップした
+    メモリーを参照する
+    """
+    if copy or not isinstance(f, BufferedReader):
+        view = memoryview(f.read())
+    else:
+        view = _read_bytes_core(f)
+
+    try:
+        return _loads(view)
+    except Exception as e:
+        # 壊れたpickleやmarshalはValueErrorやTypeErrorなど様々な例外になるので、まとめて
+        # 扱う。圧縮ファイルが途中で切れている場合のEOFErrorとも区別する
+        msg = 'pickleかmarshalのデータが途中で切れているか壊れています'
+        raise _BrokenPickleError(msg) from e
+
+
+FORMAT_READER = FormatReader(func=_read_pickle_core, mode='rb')
+
+
+def read_pickle(path: str | PathLike[str], *, copy: bool = True, lock: bool = False) -> Any:  # noqa: ANN401
+    """write_pickleで書き込んだpickleかmarshalのファイルを読み込む
+
+    pickleとmarshalはファイルの内容から判定する
+    pickleは読み込み時に任意のコードを実行できるので、信頼できるファイルだけを読み込むこと
+
+    Args:
+        path (str | PathLike[str]): 読み込むファイルのパス
+        copy (bool): Falseの場合、圧縮されていないファイルはmmapして読み込み、out-of-bandの
+            バッファーはファイルのメモリーをコピーせずに参照する(numpyの配列などが
+            コピーされずに復元される)
+            ただし、その後ファイルをatomic=Falseで書き換えたり切り詰めたりすると、
+            復元したオブジェクトに触れた時点でプロセスがSIGBUSで異常終了する
+            Falseにする場合は、同じファイルへの書き込みを必ずatomic=Trueで行うこと
+            Defaults to True.
+        lock (bool): 共有ロックを取得してから読み込み、書き込みの途中の内容を読み込まない
+            ようにする. Defaults to False.
+
+    Returns:
+        Any: 読み込んだオブジェクト、読み込みに失敗した場合や、データが途中で切れているか
+            壊れている場合はNone
+    """
+
+    def read_pickle_core(f: IO[Any]) -> Any:  # noqa: ANN401
+        try:
+            return _read_pickle_core(f, copy=copy)
+        except _BrokenPickleError:
+            log.warning(
+                f'pickleのデータが途中で切れているか壊れています(return empty None): {path}'
+            )
+            return None
+
+    return common_file_read_exception_handling(
+        func=read_pickle_core, return_empty_value=None, path=path, mode='rb', lock=lock
+    )
+
+
+def write_pickle(
+    data: object,
+    path: str | PathLike[str],
+    *,
+    backend: PickleBackend = 'pickle',
+    out_of_band: bool = False,
+    atomic: bool = False,
+    durability: Durability = 'none',
+    skip_unchanged: bool = False,
+) -> WriteResult:
+    """オブジェクトをpickle(プロトコル5)かmarshalで書き込む
+
+    テキストへの変換が無いので、大きなデータのキャッシュなどをJSONより速く保存、読み込みできる
+    pickleはファイルに直接書き込み、大きなbytesなどはpickleのバッファーにコピーせずに書き込まれる
+
+    Args:
+        data (object): 書き込むオブジェクト
+        path (str | PathLike[str]): 保存するファイルパス、ファイル名の拡張子まで記入
+        backend (PickleBackend): 'pickle'はほぼ全てのオブジェクトを書き込める
+            'marshal'はNone、bool、int、float、str、bytes、list、tuple、dict、setなどの
+            組み込み型だけのデータをpickleより速く読み書きする. Defaults to 'pickle'.
+        out_of_band (bool): bytearrayやnumpyの配列など、プロトコル5のPickleBufferに対応した
+            オブジェクトのメモリーを、pickleの外に直接書き込む
+            読み込みはread_pickleで行い、copy=Falseでコピーせずに復元できる. Defaults to False.
+        atomic (bool): 一時ファイルに書き込んでから置き換え、書き込み途中のファイルが
+            読み込まれたり、クラッシュ時に残ったりしないようにする. Defaults to False.
+        durability (Durability): 書き込み完了時にfsyncする範囲
+            'none'はfsyncしない、'file'はファイル、'full'はファイルと親ディレクトリ
+            Defaults to 'none'.
+        skip_unchanged (bool): 既存のファイルと内容が同じなら書き込まない. Defaults to False.
+
+    Raises:
+        ValueError: marshalでout_of_bandを指定した場合
+
+    Returns:
+        WriteResult: 書き込んだらWRITTEN、内容が同じで書き込まなかったらUNCHANGED、
+            失敗したらFAILED(偽)
+    """
+    if backend == 'marshal' and out_of_band:
+        msg = 'out_of_bandはpickleでのみ指定できます'
+        raise ValueError(msg)
+
+    def write_pickle_core(data: object, f: IO[Any]) -> None:
+        if backend == 'marshal':
+            marshal.dump(cast('Any', data), f)
+        elif out_of_band:
+            _write_out_of_band(data, f)
+        else:
+            pickle.dump(data, f, protocol=PICKLE_PROTOCOL)
+
+    return common_file_write_exception_handling(
+        func=write_pickle_core,
+        data=data,
+        path=path,
+        mode='wb',
+        atomic=atomic,
+        durability=durability,
+        skip_unchanged=skip_unchanged,
+    )
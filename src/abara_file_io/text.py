@@ -1,38 +1,408 @@
+import codecs
+import os
+import sys
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from io import BufferedReader, IncrementalNewlineDecoder
 from logging import getLogger
 from os import PathLike
 from typing import IO, Any
 
 from abara_file_io.common_io_wrapper import (
+    DEFAULT_LOCK_TIMEOUT,
+    Durability,
+    WriteResult,
     common_file_read_exception_handling,
+    common_file_update_exception_handling,
     common_file_write_exception_handling,
+    common_stream_read_exception_handling,
 )
+from abara_file_io.formats import FormatReader
 
 log = getLogger(__name__)
 
 
-def read_text(path: str | PathLike[str]) -> str:
+TEXT_CHUNK_SIZE = 1024 * 1024
+"""iter_text_chunks、iter_text_linesで一度に読み込むバイト数の既定値"""
+
+SEEK_BLOCK_SIZE = 64 * 1024
+"""tail_text、read_text_rangeでファイル末尾や行頭を探す時に一度に読み込むバイト数"""
+
+_BOM_ENCODINGS: dict[str, tuple[tuple[bytes, str], ...]] = {
+    'utf-8-sig': ((codecs.BOM_UTF8, 'utf_8'),),
+    'utf-16': ((codecs.BOM_UTF16_LE, 'utf_16_le'), (codecs.BOM_UTF16_BE, 'utf_16_be')),
+    'utf-32': ((codecs.BOM_UTF32_LE, 'utf_32_le'), (codecs.BOM_UTF32_BE, 'utf_32_be')),
+}
+"""BOMでバイト順を判別する文字コードと、BOMごとのBOMの無い文字コード"""
+
+_BYTE_ORDER = 'le' if sys.byteorder == 'little' else 'be'
+
+_UTF8_CONTINUATION_MASK = 0b1100_0000
+_UTF8_CONTINUATION = 0b1000_0000
+"""UTF-8の後続バイトは上位2ビットが10になる"""
+
+
+def _read_text_core(f: IO[Any]) -> str:
+    return f.read()
+
+
+FORMAT_READER = FormatReader(func=_read_text_core, mode='r')
+
+
+def read_text(path: str | PathLike[str], *, lock: bool = False) -> str:
     """テキスト形式のファイルをstrとして読み込む
 
     UTF-8以外のファイルはchardetで文字コードを自動判定する
 
     Args:
         path (Path | str): 開くファイルのパス
+        lock (bool): 共有ロックを取得してから読み込み、update_textによる書き込みの途中の
+            内容を読み込まないようにする. Defaults to False.
 
     Returns:
         str: 読み込んだ文字列、もしファイルが読み込めない場合は空文字列を返す
     """
-
-    def read_text_core(f: IO[Any]) -> str:
-        return f.read()
-
     return common_file_read_exception_handling(
-        func=read_text_core,
+        func=_read_text_core,
         return_empty_value='',
         path=path,
+        lock=lock,
     )
 
 
-def write_text(data: str, path: str | PathLike[str]) -> bool:
+def _iter_decoded_chunks(f: IO[bytes], encoding: str, size: int) -> Iterator[str]:
+    r"""バイナリファイルをsizeバイトずつ読み込み、逐次デコードする
+
+    チャンクの境界で分断されたマルチバイト文字や\r\nは次のチャンクと合わせてデコードする
+    改行コードはread_textと同様に\nに統一する
+    """
+    decoder = IncrementalNewlineDecoder(
+        codecs.getincrementaldecoder(encoding)(errors='strict'), translate=True
+    )
+    while chunk := f.read(size):
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    text = decoder.decode(b'', final=True)
+    if text:
+        yield text
+
+
+def _iter_lines(chunks: Iterable[str]) -> Iterator[str]:
+    r"""文字列のチャンクを行に分割する、行末の\nは残す"""
+    pending = ''
+    for chunk in chunks:
+        lines = (pending + chunk).split('\n')
+        pending = lines.pop()
+        for line in lines:
+            yield f'{line}\n'
+    if pending:
+        yield pending
+
+
+def _validate_chunk_size(size: int) -> None:
+    if size < 1:
+        msg = f'sizeは1以上を指定してください: {size}'
+        raise ValueError(msg)
+
+
+def iter_text_chunks(path: str | PathLike[str], size: int = TEXT_CHUNK_SIZE) -> Iterator[str]:
+    """テキストファイルを少しずつ読み込み、文字列のチャンクを順に返す
+
+    文字コードはファイル先頭から一度だけ判定し、インクリメンタルデコーダーで逐次デコードする
+    使用メモリーはファイルの大きさに関わらずチャンクの大きさ程度になる
+
+    Args:
+        path (str | PathLike[str]): 開くファイルのパス
+        size (int): 一度に読み込むバイト数. Defaults to TEXT_CHUNK_SIZE.
+
+    Raises:
+        ValueError: sizeが1未満の場合
+
+    Yields:
+        str: デコードした文字列、読み込みに失敗した場合は警告を出してその時点で終了する
+    """
+    _validate_chunk_size(size)
+
+    def iter_text_chunks_core(f: IO[bytes], encoding: str) -> Iterator[str]:
+        return _iter_decoded_chunks(f, encoding, size)
+
+    return common_stream_read_exception_handling(func=iter_text_chunks_core, path=path)
+
+
+def iter_text_lines(path: str | PathLike[str], size: int = TEXT_CHUNK_SIZE) -> Iterator[str]:
+    r"""テキストファイルを1行ずつ読み込む
+
+    iter_text_chunksと同様に少しずつ読み込むので、巨大なログファイルなどにも使える
+    使用メモリーはチャンクの大きさと最も長い行の長さ程度になる
+
+    Args:
+        path (str | PathLike[str]): 開くファイルのパス
+        size (int): 一度に読み込むバイト数. Defaults to TEXT_CHUNK_SIZE.
+
+    Raises:
+        ValueError: sizeが1未満の場合
+
+    Yields:
+        str: 行末の\nを含む1行、読み込みに失敗した場合は警告を出してその時点で終了する
+    """
+    _validate_chunk_size(size)
+
+    def iter_text_lines_core(f: IO[bytes], encoding: str) -> Iterator[str]:
+        return _iter_lines(_iter_decoded_chunks(f, encoding, size))
+
+    return common_stream_read_exception_handling(func=iter_text_lines_core, path=path)
+
+
+def _bomless_encoding(f: IO[bytes], encoding: str) -> tuple[str, int]:
+    """BOMで判別する文字コードを、BOMの無い文字コードと本文の開始位置に置き換える
+
+    ファイルの途中から読み込む場合、BOM付きの文字コードのデコーダーは先頭にBOMを期待するので、
+    BOMからバイト順を決めたBOMの無い文字コードでデコードする
+
+    Returns:
+        tuple[str, int]: BOMの無い文字コードと、BOMを除いた本文の開始位置
+    """
+    name = codecs.lookup(encoding).name
+    boms = _BOM_ENCODINGS.get(name)
+    if boms is None:
+        return encoding, 0
+
+    f.seek(0)
+    head = f.read(4)
+    for bom, bomless in boms:
+        if head.startswith(bom):
+            return bomless, len(bom)
+    if name == 'utf-8-sig':
+        return 'utf_8', 0
+    return f'{name.replace("-", "_")}_{_BYTE_ORDER}', 0
+
+
+def _find_aligned(data: bytes, newline: bytes, start: int = 0) -> int:
+    """文字の区切りに揃った位置にある改行を探す
+
+    UTF-16やUTF-32では、改行のバイト列が文字をまたいだ位置にも現れ得るので除外する
+
+    Returns:
+        int: 改行の位置、見つからない場合は-1
+    """
+    unit = len(newline)
+    i = data.find(newline, start)
+    while i != -1 and i % unit != 0:
+        i = data.find(newline, i + 1)
+    return i
+
+
+def _rfind_aligned(data: bytes, newline: bytes) -> int:
+    """文字の区切りに揃った位置にある最後の改行を探す
+
+    Returns:
+        int: 改行の位置、見つからない場合は-1
+    """
+    unit = len(newline)
+    i = data.rfind(newline)
+    while i != -1 and i % unit != 0:
+        i = data.rfind(newline, 0, i + unit - 1)
+    return i
+
+
+def _count_aligned(data: bytes, newline: bytes) -> int:
+    """文字の区切りに揃った位置にある改行の数を数える"""
+    if len(newline) == 1:
+        return data.count(newline)
+    count = 0
+    i = _find_aligned(data, newline)
+    while i != -1:
+        count += 1
+        i = _find_aligned(data, newline, i + len(newline))
+    return count
+
+
+def _iter_blocks_backward(
+    f: IO[bytes], end: int, data_start: int, block_size: int
+) -> Iterator[tuple[int, bytes]]:
+    """endからdata_startに向かって、ファイルをブロック単位で逆順に読み込む
+
+    Yields:
+        tuple[int, bytes]: ブロックの開始位置と内容
+    """
+    position = end
+    while position > data_start:
+        size = min(block_size, position - data_start)
+        position -= size
+        f.seek(position)
+        yield position, f.read(size)
+
+
+def _translate_newlines(text: str) -> str:
+    if '\r' in text:
+        return text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+def _tail(f: IO[bytes], encoding: str, n: int) -> str:
+    """ファイル末尾からブロック単位で遡り、最後のn行だけをデコードする"""
+    if not isinstance(f, BufferedReader):
+        # 圧縮ファイルは遡るたびに先頭から展開し直すことになるので、先頭から読んで最後のn行を残す
+        lines = _iter_lines(_iter_decoded_chunks(f, encoding, TEXT_CHUNK_SIZE))
+        return ''.join(deque(lines, maxlen=n))
+
+    encoding, data_start = _bomless_encoding(f, encoding)
+    newline = '\n'.encode(encoding)
+    end = os.fstat(f.fileno()).st_size
+    end -= (end - data_start) % len(newline)
+
+    blocks: list[bytes] = []
+    newlines = 0
+    position = end
+    # 末尾の改行の有無に関わらず、n行の手前の改行が見つかるまで読み込む
+    for block_start, block in _iter_blocks_backward(f, end, data_start, SEEK_BLOCK_SIZE):
+        position = block_start
+        blocks.append(block)
+        newlines += _count_aligned(block, newline)
+        if newlines > n:
+            break
+
+    data = b''.join(reversed(blocks))
+    if position > data_start:
+        data = data[_find_aligned(data, newline) + len(newline) :]
+
+    # splitlinesは\x0cや\u2028などでも分割するので、iter_text_linesと同じく\nだけで分割する
+    lines = list(_iter_lines([_translate_newlines(data.decode(encoding))]))
+    return ''.join(lines[-n:])
+
+
+def _line_start(f: IO[bytes], position: int, data_start: int, newline: bytes) -> int:
+    """positionより前にある最後の行頭を探す
+
+    Returns:
+        int: 行頭の位置、改行が無ければ本文の開始位置
+    """
+    for block_start, block in _iter_blocks_backward(f, position, data_start, SEEK_BLOCK_SIZE):
+        i = _rfind_aligned(block, newline)
+        if i != -1:
+            return block_start + i + len(newline)
+    return data_start
+
+
+def _read_range(f: IO[bytes], encoding: str, start: int, end: int | None) -> str:
+    """バイト位置の範囲を、文字の区切りを考慮してデコードする
+
+    UTF-8は後続バイトから文字の先頭を判別できるが、Shift_JISなどは判別できないので、
+    直前の行頭からデコーダーに読み込ませて文字の区切りを同期させる
+    圧縮ファイルは展開後のサイズが分からず、遡るのも遅いので、本文の先頭からデコードする
+    """
+    encoding, data_start = _bomless_encoding(f, encoding)
+    newline = '\n'.encode(encoding)
+    seekable = isinstance(f, BufferedReader)
+    if seekable:
+        size = os.fstat(f.fileno()).st_size
+        end = size if end is None else min(end, size)
+    start = max(start, data_start)
+    # UTF-16などで文字の途中を指している場合は次の文字から
+    start += -(start - data_start) % len(newline)
+    if end is not None and start >= end:
+        return ''
+
+    decoder = codecs.getincrementaldecoder(encoding)(errors='strict')
+    if codecs.lookup(encoding).name == 'utf-8':
+        # 後続バイト(0b10xxxxxx)を読み飛ばし、次の文字の先頭から読み込む
+        f.seek(start)
+        for byte in f.read(3):
+            if byte & _UTF8_CONTINUATION_MASK != _UTF8_CONTINUATION:
+                break
+            start += 1
+        f.seek(start)
+    else:
+        position = _line_start(f, start, data_start, newline) if seekable else data_start
+        f.seek(position)
+        while position < start:
+            block = f.read(min(SEEK_BLOCK_SIZE, start - position))
+            if not block:
+                # 開始位置がファイル末尾より後ろ
+                return ''
+            decoder.decode(block)
+            position += len(block)
+
+    # 開始位置をまたぐ文字は範囲に含めない
+    straddling = len(decoder.getstate()[0]) > 0
+    text = decoder.decode(f.read(-1 if end is None else max(0, end - start)))
+    # 終了位置をまたぐ文字は、先頭のバイトが範囲内にあるので最後まで読み込む
+    while len(decoder.getstate()[0]) > 0 and (byte := f.read(1)):
+        text += decoder.decode(byte)
+    if straddling:
+        text = text[1:]
+    return _translate_newlines(text)
+
+
+def tail_text(path: str | PathLike[str], n: int = 10) -> str:
+    """テキストファイルの最後のn行を読み込む
+
+    ファイル末尾からブロック単位で遡って読み込むので、処理時間はファイル全体ではなく
+    読み込む行の長さに比例する。文字コードはファイル先頭から判定する
+    圧縮ファイルは遡って読み込めないので、先頭から展開して最後のn行だけを残す
+
+    Args:
+        path (str | PathLike[str]): 開くファイルのパス
+        n (int): 読み込む行数. Defaults to 10.
+
+    Raises:
+        ValueError: nが負の場合
+
+    Returns:
+        str: 最後のn行、もしファイルが読み込めない場合は空文字列を返す
+    """
+    if n < 0:
+        msg = f'nは0以上を指定してください: {n}'
+        raise ValueError(msg)
+
+    def tail_text_core(f: IO[bytes], encoding: str) -> Iterator[str]:
+        if n > 0:
+            yield _tail(f, encoding, n)
+
+    return ''.join(common_stream_read_exception_handling(func=tail_text_core, path=path))
+
+
+def read_text_range(path: str | PathLike[str], start: int = 0, end: int | None = None) -> str:
+    """テキストファイルのバイト位置startからendまでを読み込む
+
+    範囲外の部分は読み込まないので、処理時間は範囲の大きさに比例する
+    範囲の境界で分断された文字は、先頭のバイトが範囲内にある場合だけ含める
+    開始位置をまたぐ文字は含めず、終了位置をまたぐ文字は含めるので、隣接する範囲に分けて
+    読み込むと、各文字はどれか1つの範囲にだけ含まれる
+    文字コードはファイル先頭から判定する
+    圧縮ファイルのバイト位置は展開後の位置で、範囲の手前までは先頭から展開して読み飛ばす
+
+    Args:
+        path (str | PathLike[str]): 開くファイルのパス
+        start (int): 読み込みを開始するバイト位置. Defaults to 0.
+        end (int | None): 読み込みを終了するバイト位置(この位置は含まない)
+            Noneの場合はファイル末尾まで. Defaults to None.
+
+    Raises:
+        ValueError: startが負の場合
+
+    Returns:
+        str: 範囲内の文字列、もしファイルが読み込めない場合は空文字列を返す
+    """
+    if start < 0:
+        msg = f'startは0以上を指定してください: {start}'
+        raise ValueError(msg)
+
+    def read_text_range_core(f: IO[bytes], encoding: str) -> Iterator[str]:
+        yield _read_range(f, encoding, start, end)
+
+    return ''.join(common_stream_read_exception_handling(func=read_text_range_core, path=path))
+
+
+def write_text(
+    data: str,
+    path: str | PathLike[str],
+    *,
+    atomic: bool = False,
+    durability: Durability = 'none',
+    skip_unchanged: bool = False,
+) -> WriteResult:
     r"""strデータをファイルを書き込む
 
     テキストファイルを標準的な UTF-8 + \n の形式で保存する
@@ -41,9 +411,16 @@ def write_text(data: str, path: str | PathLike[str]) -> bool:
     Args:
         data (str): 書き込む文字列データ
         path (str | PathLike[str]): 保存するファイルのパス（拡張子まで記述）
+        atomic (bool): 一時ファイルに書き込んでから置き換え、書き込み途中のファイルが
+            読み込まれたり、クラッシュ時に残ったりしないようにする. Defaults to False.
+        durability (Durability): 書き込み完了時にfsyncする範囲
+            'none'はfsyncしない、'file'はファイル、'full'はファイルと親ディレクトリ
+            Defaults to 'none'.
+        skip_unchanged (bool): 既存のファイルと内容が同じなら書き込まない. Defaults to False.
 
     Returns:
-        bool: ファイルの保存に成功したらTrue、失敗したらFalse
+        WriteResult: 書き込んだらWRITTEN、内容が同じで書き込まなかったらUNCHANGED、
+            失敗したらFAILED(偽)
     """
 
     def write_text_core(
@@ -52,4 +429,51 @@ def write_text(data: str, path: str | PathLike[str]) -> bool:
     ) -> None:
         f.write(data)
 
-    return common_file_write_exception_handling(func=write_text_core, data=data, path=path)
+    return common_file_write_exception_handling(
+        func=write_text_core,
+        data=data,
+        path=path,
+        atomic=atomic,
+        durability=durability,
+        skip_unchanged=skip_unchanged,
+    )
+
+
+def update_text(
+    path: str | PathLike[str],
+    func: Callable[[str], str],
+    *,
+    timeout: float | None = DEFAULT_LOCK_TIMEOUT,
+    durability: Durability = 'none',
+) -> WriteResult:
+    """テキストファイルを排他ロックして読み込み、funcで更新して書き込む
+
+    複数のプロセスが同じファイルを同時に更新しても、更新が失われない
+    ファイルが無い場合は空文字列をfuncに渡し、新しく作成する
+
+    Args:
+        path (str | PathLike[str]): 更新するファイルのパス
+        func (Callable[[str], str]): 読み込んだ文字列を受け取り、書き込む文字列を返す関数
+        timeout (float | None): ロックを待つ秒数、Noneの場合は無期限に待つ
+            Defaults to DEFAULT_LOCK_TIMEOUT.
+        durability (Durability): 書き込み完了時にfsyncする範囲
+            'none'はfsyncしない、'file'はファイル、'full'はファイルと親ディレクトリ
+            Defaults to 'none'.
+
+    Returns:
+        WriteResult: 書き込んだらWRITTEN、内容が変わらず書き込まなかったらUNCHANGED、
+            失敗したらFAILED(偽)
+    """
+
+    def update_text_core(data: object, f: IO[Any]) -> None:
+        f.write(data)
+
+    return common_file_update_exception_handling(
+        read_func=_read_text_core,
+        write_func=update_text_core,
+        update=func,
+        empty_factory=str,
+        path=path,
+        timeout=timeout,
+        durability=durability,
+    )
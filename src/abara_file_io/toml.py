@@ -1,42 +1,196 @@
+import re
 import tomllib
+from collections.abc import Callable, Mapping
 from logging import getLogger
 from os import PathLike
-from typing import IO, Any
+from typing import IO, Any, cast
 
 import tomli_w
 
+from abara_file_io.cache import CacheMode, cached_read
 from abara_file_io.common_io_wrapper import (
+    DEFAULT_LOCK_TIMEOUT,
+    Durability,
+    WriteResult,
     common_file_read_exception_handling,
+    common_file_update_exception_handling,
     common_file_write_exception_handling,
 )
+from abara_file_io.formats import FormatReader
+from abara_file_io.lazy import LazySections, SectionSpans
 
 log = getLogger(__name__)
 
 
-def read_toml(path: str | PathLike[str]) -> dict:
+def _read_toml_core(f: IO[Any]) -> dict:
+    return tomllib.load(f)
+
+
+FORMAT_READER = FormatReader(func=_read_toml_core, mode='rb')
+
+
+def read_toml(
+    path: str | PathLike[str], *, cache: CacheMode | None = None, lock: bool = False
+) -> dict:
     """TOMLファイルを読み込む
 
         読み込みに失敗した場合は空の辞書を返す
 
     Args:
         path (Union[Path, str]): 読み込むファイルのパス
+        cache (CacheMode | None): 読み込み結果のキャッシュの使い方
+            'copy'で呼び出しごとのコピー、'frozen'で共有の変更不可能な辞書を返す
+            ファイルが更新されていればキャッシュは使われない. Defaults to None.
+        lock (bool): 共有ロックを取得してから読み込み、update_tomlによる書き込みの途中の
+            内容を読み込まないようにする. Defaults to False.
 
     Returns:
         Union[dict, None]:
             正確にはdictのインスタンスのruamel.yaml.comments.CommentedMap
     """
 
-    def read_toml_core(
-        f: IO[Any],
-    ) -> dict:
-        return tomllib.load(f)
+    def load() -> dict:
+        return common_file_read_exception_handling(
+            func=_read_toml_core, return_empty_value={}, path=path, mode='rb', lock=lock
+        )
+
+    return cached_read('toml', path, load, cache, persistent=True)
+
+
+_TOML_TABLE_HEADER = re.compile(
+    r'^[ \t]*\[\[?[ \t]*(?P<key>[A-Za-z0-9_-]+)[ \t]*(?:\.[^\]\n]*)?\]\]?[ \t]*(?:#[^\n]*)?\r?$',
+    re.MULTILINE,
+)
+"""先頭のキーが引用符の無いキーのテーブル、テーブルの配列の行に一致する正規表現"""
+
+_TOML_LINE_START_BRACKET = re.compile(r'[ \t]*\[')
+"""行頭の空白に続く[に一致する正規表現"""
+
+_TOML_TOKEN = re.compile(
+    r'''"""(?:[^\\]|\\.)*?""""{0,2}'''
+    r"|'''[\s\S]*?''''{0,2}"
+    r'''|"(?:[^"\\\n]|\\.)*"'''
+    r"|'[^'\n]*'"
+    r"""|#[^\n]*|[\[\]{}\n]|["']"""
+)
+"""テーブルの判定に関係する、文字列、コメント、括弧、改行に一致する正規表現
+閉じていない引用符は最後の選択肢の1文字に一致する
+"""
+
+
+def _find_toml_table_headers(text: str) -> list[re.Match[str]] | None:
+    """文字列、コメント、配列とインラインテーブルの中を除いて、テーブルの行を探す
+
+    括弧の深さが0の行頭の[だけをテーブルとし、複数行の配列の行頭が[の要素と区別する
+
+    Returns:
+        list[re.Match[str]] | None: テーブル、テーブルの配列の行、引用符を使ったキーの
+            テーブルや閉じていない文字列、括弧があればNone
+    """
+    headers: list[re.Match[str]] = []
+    depth = 0
+    pos = 0
+    line_start = True
+    while True:
+        if line_start and depth == 0 and _TOML_LINE_START_BRACKET.match(text, pos):
+            header = _TOML_TABLE_HEADER.match(text, pos)
+            if header is None:
+                return None
+            headers.append(header)
+            pos = header.end()
+
+        token = _TOML_TOKEN.search(text, pos)
+        if token is None:
+            break
+        pos = token.end()
+        line_start = token[0] == '\n'
+        if token[0] in {'"', "'"}:
+            return None
+        if token[0] in {'[', '{'}:
+            depth += 1
+        elif token[0] in {']', '}'}:
+            depth -= 1
+            if depth < 0:
+                return None
+
+    return headers if depth == 0 else None
+
+
+def _index_toml_tables(text: str) -> tuple[dict, SectionSpans] | None:
+    """ルートのキーと値をパースし、テーブルごとのテキスト上の範囲を索引する
+
+    [a]、[a.b]、[[a]]のように先頭のキーが同じテーブルは、まとめてキーaの範囲にする
+    引用符を使ったキーのテーブル、ルートとテーブルで同じキーがあればNoneを返す
+
+    Returns:
+        tuple[dict, SectionSpans] | None: ルートのキーと値の辞書と、テーブルごとの範囲
+    """
+    headers = _find_toml_table_headers(text)
+    if headers is None:
+        return None
 
+    try:
+        root = tomllib.loads(text[: headers[0].start()] if headers else text)
+    except tomllib.TOMLDecodeError:
+        return None
+    spans: SectionSpans = {}
+    ends = [*(i.start() for i in headers[1:]), len(text)] if headers else []
+    for header, end in zip(headers, ends, strict=True):
+        spans.setdefault(header['key'], []).append((header.start(), end))
+
+    if not root.keys().isdisjoint(spans):
+        return None
+    return root, spans
+
+
+def _parse_toml_table(key: str, text: str) -> Any:  # noqa: ANN401
+    """先頭のキーが同じテーブルを連結したテキストをパースし、そのキーの値を返す"""
+    return tomllib.loads(text)[key]
+
+
+def _read_toml_lazy_core(f: IO[Any]) -> LazySections | dict:
+    """テーブルを索引してLazySectionsにし、索引できなければ全体を読み込む"""
+    text = f.read().decode()
+    indexed = _index_toml_tables(text)
+    if indexed is None:
+        log.debug('テーブルを索引せずに読み込みます')
+        return tomllib.loads(text)
+
+    root, spans = indexed
+    return LazySections(text, spans, _parse_toml_table, parsed=root, fallback=tomllib.loads)
+
+
+def read_toml_lazy(path: str | PathLike[str], *, lock: bool = False) -> Mapping[str, Any]:
+    """TOMLファイルを読み込み、各テーブルを初めて参照した時にパースするMappingを返す
+
+    読み込み時にはルートのキーと値だけをパースし、テーブルは位置だけを索引しておくので、
+    多数のテーブルのうち一部だけを使う場合はread_tomlより速く、メモリーの使用量も少ない
+    結果はread_tomlと同じで、キーの順番や比較、keys()やitems()なども同じように使える
+    ただしdictではなく読み取り専用のMappingなので、変更やjson.dumpsなどにはdict()で変換する
+    引用符を使ったキーのテーブルなどでテーブル単位に分けられない場合は、read_tomlと同じく全体を読み込む
+
+    Args:
+        path (str | PathLike[str]): 読み込むファイルのパス
+        lock (bool): 共有ロックを取得してから読み込み、update_tomlによる書き込みの途中の
+            内容を読み込まないようにする. Defaults to False.
+
+    Returns:
+        Mapping[str, Any]: LazySections、索引できない場合は辞書、
+            読み込みに失敗した場合は空の辞書
+    """
     return common_file_read_exception_handling(
-        func=read_toml_core, return_empty_value={}, path=path, mode='rb'
+        func=_read_toml_lazy_core, return_empty_value={}, path=path, mode='rb', lock=lock
     )
 
 
-def write_toml(data: dict, path: str | PathLike[str]) -> bool:
+def write_toml(
+    data: dict,
+    path: str | PathLike[str],
+    *,
+    atomic: bool = False,
+    durability: Durability = 'none',
+    skip_unchanged: bool = False,
+) -> WriteResult:
     """TOMLとして書き込む
 
         第一引数で受け取ったパスに、第二引数で受け取った内容をTOMLとして書き込む。
@@ -47,9 +201,16 @@ def write_toml(data: dict, path: str | PathLike[str]) -> bool:
     Args:
         data (dict): tomlに書き込む辞書オブジェクト
         path (str | PathLike): 保存するファイルパス、ファイル名の拡張子まで記入
+        atomic (bool): 一時ファイルに書き込んでから置き換え、書き込み途中のファイルが
+            読み込まれたり、クラッシュ時に残ったりしないようにする. Defaults to False.
+        durability (Durability): 書き込み完了時にfsyncする範囲
+            'none'はfsyncしない、'file'はファイル、'full'はファイルと親ディレクトリ
+            Defaults to 'none'.
+        skip_unchanged (bool): 既存のファイルと内容が同じなら書き込まない. Defaults to False.
 
     Returns:
-        bool: ファイルの保存に成功したらTrue、失敗したらFalse
+        WriteResult: 書き込んだらWRITTEN、内容が同じで書き込まなかったらUNCHANGED、
+            失敗したらFAILED(偽)
     """
 
     def write_toml_core(
@@ -60,5 +221,55 @@ def write_toml(data: dict, path: str | PathLike[str]) -> bool:
             tomli_w.dump(data, f)
 
     return common_file_write_exception_handling(
-        func=write_toml_core, data=data, path=path, mode='wb'
+        func=write_toml_core,
+        data=data,
+        path=path,
+        mode='wb',
+        atomic=atomic,
+        durability=durability,
+        skip_unchanged=skip_unchanged,
+    )
+
+
+def update_toml(
+    path: str | PathLike[str],
+    func: Callable[[dict], dict | None],
+    *,
+    timeout: float | None = DEFAULT_LOCK_TIMEOUT,
+    durability: Durability = 'none',
+) -> WriteResult:
+    """TOMLファイルを排他ロックして読み込み、funcで更新して書き込む
+
+    複数のプロセスが同じファイルを同時に更新しても、更新が失われない
+    ファイルが無い場合は空の辞書をfuncに渡し、新しく作成する
+    ※tomli_wが必要、書き込み時にコメントは消える
+
+    Args:
+        path (str | PathLike[str]): 更新するファイルのパス
+        func (Callable[[dict], dict | None]): 読み込んだ辞書を受け取り、書き込む辞書を返す関数
+            Noneを返した場合は、受け取った辞書を変更したものとしてその辞書を書き込む
+        timeout (float | None): ロックを待つ秒数、Noneの場合は無期限に待つ
+            Defaults to DEFAULT_LOCK_TIMEOUT.
+        durability (Durability): 書き込み完了時にfsyncする範囲
+            'none'はfsyncしない、'file'はファイル、'full'はファイルと親ディレクトリ
+            Defaults to 'none'.
+
+    Returns:
+        WriteResult: 書き込んだらWRITTEN、内容が変わらず書き込まなかったらUNCHANGED、
+            失敗したらFAILED(偽)
+    """
+
+    def update_toml_core(data: object, f: IO[Any]) -> None:
+        tomli_w.dump(cast('dict', data), f)
+
+    return common_file_update_exception_handling(
+        read_func=_read_toml_core,
+        write_func=update_toml_core,
+        update=func,
+        empty_factory=dict,
+        path=path,
+        read_mode='rb',
+        write_mode='wb',
+        timeout=timeout,
+        durability=durability,
     )
@@ -1,18 +1,109 @@
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from io import TextIOWrapper
 from logging import getLogger
 from os import PathLike
-from typing import IO, Any
+from typing import IO, Any, Literal, cast
 
 from ruamel.yaml import YAML
+from ruamel.yaml.error import MarkedYAMLError
+from ruamel.yaml.representer import SafeRepresenter
+from ruamel.yaml.scalarbool import ScalarBoolean
 
+from abara_file_io.cache import CacheMode, cached_read
 from abara_file_io.common_io_wrapper import (
+    DEFAULT_LOCK_TIMEOUT,
+    Durability,
+    WriteResult,
     common_file_read_exception_handling,
+    common_file_update_exception_handling,
     common_file_write_exception_handling,
+    common_stream_read_exception_handling,
 )
+from abara_file_io.formats import FormatReader
 
 log = getLogger(__name__)
 
 
-def read_yaml(path: str | PathLike[str]) -> dict:
+type YamlMode = Literal['rt', 'safe']
+
+
+class _SafeRepresenter(SafeRepresenter):
+    """round-tripで読み込んだCommentedMapなども書き込めるようにしたSafeRepresenter"""
+
+
+_SafeRepresenter.add_representer(ScalarBoolean, SafeRepresenter.represent_bool)
+_SafeRepresenter.add_multi_representer(dict, SafeRepresenter.represent_dict)
+_SafeRepresenter.add_multi_representer(list, SafeRepresenter.represent_list)
+_SafeRepresenter.add_multi_representer(str, SafeRepresenter.represent_str)
+_SafeRepresenter.add_multi_representer(int, SafeRepresenter.represent_int)
+_SafeRepresenter.add_multi_representer(float, SafeRepresenter.represent_float)
+
+_engines = threading.local()
+
+
+def _create_yaml(mode: YamlMode) -> YAML:
+    """modeに応じた設定のYAMLインスタンスを作成する
+
+    Args:
+        mode (YamlMode): 'rt'はコメントや順序を保持するround-trip、
+            'safe'はruamel.yaml.clibがあればC実装のローダーとダンパーを使う
+
+    Returns:
+        YAML: 作成したインスタンス
+    """
+    if mode == 'safe':
+        yaml = YAML(typ='safe', pure=False)
+        yaml.Representer = _SafeRepresenter
+        yaml.default_flow_style = False
+    else:
+        yaml = YAML()
+    yaml.indent(mapping=2, sequence=4, offset=2)
+    return yaml
+
+
+def _yaml_engine(mode: YamlMode) -> YAML:
+    """modeごとに作成済みのYAMLインスタンスを再利用して返す
+
+    YAMLインスタンスはスレッドセーフではないので、スレッドごとに別のインスタンスを保持する
+    インスタンスに蓄積される読み書きしたドキュメントの情報は、返す前に切り詰める
+
+    Args:
+        mode (YamlMode): YAMLインスタンスの設定
+
+    Returns:
+        YAML: 呼び出したスレッド専用のYAMLインスタンス
+    """
+    engines: dict[YamlMode, YAML] | None = getattr(_engines, 'engines', None)
+    if engines is None:
+        engines = {}
+        _engines.engines = engines
+
+    yaml = engines.get(mode)
+    if yaml is None:
+        yaml = _create_yaml(mode)
+        engines[mode] = yaml
+    # loadとdumpはドキュメントごとの情報を追加し続けるので、使い回す前に直前の分だけ残す
+    doc_infos: list | None = getattr(yaml, 'doc_infos', None)
+    if doc_infos is not None:
+        del doc_infos[:-1]
+    return yaml
+
+
+def _read_yaml_core(f: IO[Any]) -> dict:
+    return _yaml_engine('rt').load(f)
+
+
+FORMAT_READER = FormatReader(func=_read_yaml_core, mode='r')
+
+
+def read_yaml(
+    path: str | PathLike[str],
+    *,
+    mode: YamlMode = 'rt',
+    cache: CacheMode | None = None,
+    lock: bool = False,
+) -> dict:
     """YAMLファイルの読み込み
 
         リスト、もしくは辞書型の変数として読み込む
@@ -20,24 +111,42 @@ def read_yaml(path: str | PathLike[str]) -> dict:
 
     Args:
         path (Union[Path, str]): 書き込むファイル名
+        mode (YamlMode): 'rt'はコメントや順序を保持するround-tripで読み込む
+            'safe'はコメントなどを保持しない代わりに、C実装のローダーで高速に読み込む
+            Defaults to 'rt'.
+        cache (CacheMode | None): 読み込み結果のキャッシュの使い方
+            'copy'で呼び出しごとのコピー、'frozen'で共有の変更不可能な辞書を返す
+            ファイルが更新されていればキャッシュは使われない. Defaults to None.
+        lock (bool): 共有ロックを取得してから読み込み、update_yamlによる書き込みの途中の
+            内容を読み込まないようにする. Defaults to False.
 
     Returns:
         Union[dict, None]:
-            正確にはdictのインスタンスのruamel.yaml.comments.CommentedMap
+            mode='rt'の場合、正確にはdictのインスタンスのruamel.yaml.comments.CommentedMap
     """
 
     def read_yaml_core(
         f: IO[Any],
     ) -> dict:
-        yaml = YAML()
-        return yaml.load(f)
+        return _yaml_engine(mode).load(f)
 
-    return common_file_read_exception_handling(
-        func=read_yaml_core, return_empty_value={}, path=path
-    )
+    def load() -> dict:
+        return common_file_read_exception_handling(
+            func=read_yaml_core, return_empty_value={}, path=path, lock=lock
+        )
 
+    return cached_read(f'yaml-{mode}', path, load, cache, persistent=True)
 
-def write_yaml(data: list | dict, path: str | PathLike[str]) -> bool:
+
+def write_yaml(
+    data: list | dict,
+    path: str | PathLike[str],
+    *,
+    mode: YamlMode = 'rt',
+    atomic: bool = False,
+    durability: Durability = 'none',
+    skip_unchanged: bool = False,
+) -> WriteResult:
     """YAMLファイルとして出力する
 
         第一引数で受け取ったパスに、第二引数で受け取った内容をYAMLとして書き込む。
@@ -45,18 +154,151 @@ def write_yaml(data: list | dict, path: str | PathLike[str]) -> bool:
     Args:
         data (dict): yamlに書き込む辞書オブジェクト
         path (str | PathLike): 保存するファイルパス、ファイル名の拡張子まで記入
+        mode (YamlMode): 'rt'はコメントや順序を保持するround-tripで書き込む
+            'safe'はC実装のダンパーで高速に書き込むが、コメントは失われ
+            リストのインデントなどの書式はruamel.yaml.clibの出力に従う. Defaults to 'rt'.
+        atomic (bool): 一時ファイルに書き込んでから置き換え、書き込み途中のファイルが
+            読み込まれたり、クラッシュ時に残ったりしないようにする. Defaults to False.
+        durability (Durability): 書き込み完了時にfsyncする範囲
+            'none'はfsyncしない、'file'はファイル、'full'はファイルと親ディレクトリ
+            Defaults to 'none'.
+        skip_unchanged (bool): 既存のファイルと内容が同じなら書き込まない. Defaults to False.
 
     Returns:
-        bool: ファイルの保存に成功したらTrue、失敗したらFalse
+        WriteResult: 書き込んだらWRITTEN、内容が同じで書き込まなかったらUNCHANGED、
+            失敗したらFAILED(偽)
     """
 
     def write_yaml_core(
         data: object,
         f: IO[Any],
     ) -> None:
-        yaml.dump(data, f)
+        _yaml_engine(mode).dump(data, f)
 
-    yaml = YAML()
-    yaml.indent(mapping=2, sequence=4, offset=2)
+    return common_file_write_exception_handling(
+        func=write_yaml_core,
+        data=data,
+        path=path,
+        atomic=atomic,
+        durability=durability,
+        skip_unchanged=skip_unchanged,
+    )
+
+
+def iter_yaml_documents(path: str | PathLike[str], *, mode: YamlMode = 'rt') -> Iterator[Any]:
+    """---で区切られた複数のドキュメントを含むYAMLファイルを、1ドキュメントずつ読み込む
+
+    ruamel.yamlのload_allでファイルを少しずつ読み込むので、使用メモリーはファイル全体ではなく
+    1ドキュメントの大きさ程度になる
+    文字コードはファイル先頭から判定し、圧縮ファイルは展開しながら読み込む
+    反復の途中で他のYAMLの読み書きをしても影響しないよう、専用のYAMLインスタンスを使う
+
+    Args:
+        path (str | PathLike[str]): 読み込むファイルのパス
+        mode (YamlMode): 'rt'はコメントや順序を保持するround-tripで読み込む
+            'safe'はC実装のローダーで高速に読み込む. Defaults to 'rt'.
+
+    Yields:
+        Any: 1ドキュメントずつの値、読み込みに失敗したか不正な記述があった場合は
+            警告を出してその時点で終了する
+    """
+
+    def iter_yaml_documents_core(f: IO[bytes], encoding: str) -> Iterator[Any]:
+        yaml = _create_yaml(mode)
+        doc_infos: list = getattr(yaml, 'doc_infos', [])
+        try:
+            for document in yaml.load_all(TextIOWrapper(f, encoding=encoding)):
+                # load_allはドキュメントごとの情報を追加し続けるので、読み込み中の分だけ残す
+                del doc_infos[:-1]
+                yield document
+        except MarkedYAMLError:
+            log.warning(f'YAMLの記述が不正なため、読み込みを中断しました: {path}')
+
+    return common_stream_read_exception_handling(func=iter_yaml_documents_core, path=path)
+
+
+def write_yaml_documents(
+    data: Iterable[object],
+    path: str | PathLike[str],
+    *,
+    mode: YamlMode = 'rt',
+    atomic: bool = False,
+    durability: Durability = 'none',
+) -> WriteResult:
+    """複数のドキュメントを---で区切って、1つのYAMLファイルに書き込む
+
+    イテラブルから1ドキュメントずつ書き込むので、ジェネレーターを渡せば全体をメモリーに保持しない
+    ジェネレーターの中で他のYAMLの読み書きをしても影響しないよう、専用のYAMLインスタンスを使う
+
+    Args:
+        data (Iterable[object]): 1ドキュメントずつ書き込む値
+        path (str | PathLike[str]): 保存するファイルパス、ファイル名の拡張子まで記入
+        mode (YamlMode): 'rt'はコメントや順序を保持するround-tripで書き込む
+            'safe'はC実装のダンパーで高速に書き込む. Defaults to 'rt'.
+        atomic (bool): 一時ファイルに書き込んでから置き換え、書き込み途中のファイルが
+            読み込まれたり、クラッシュ時に残ったりしないようにする. Defaults to False.
+        durability (Durability): 書き込み完了時にfsyncする範囲
+            'none'はfsyncしない、'file'はファイル、'full'はファイルと親ディレクトリ
+            Defaults to 'none'.
+
+    Returns:
+        WriteResult: 書き込んだらWRITTEN、失敗したらFAILED(偽)
+    """
+
+    def write_yaml_documents_core(data: object, f: IO[Any]) -> None:
+        _create_yaml(mode).dump_all(cast('Iterable[object]', data), f)
+
+    return common_file_write_exception_handling(
+        func=write_yaml_documents_core,
+        data=data,
+        path=path,
+        atomic=atomic,
+        durability=durability,
+    )
+
+
+def update_yaml(
+    path: str | PathLike[str],
+    func: Callable[[dict], dict | None],
+    *,
+    mode: YamlMode = 'rt',
+    timeout: float | None = DEFAULT_LOCK_TIMEOUT,
+    durability: Durability = 'none',
+) -> WriteResult:
+    """YAMLファイルを排他ロックして読み込み、funcで更新して書き込む
+
+    複数のプロセスが同じファイルを同時に更新しても、更新が失われない
+    mode='rt'ではコメントや順序を保持したまま更新できる
+    ファイルが無い場合は空の辞書をfuncに渡し、新しく作成する
 
-    return common_file_write_exception_handling(func=write_yaml_core, data=data, path=path)
+    Args:
+        path (str | PathLike[str]): 更新するファイルのパス
+        func (Callable[[dict], dict | None]): 読み込んだ辞書を受け取り、書き込む辞書を返す関数
+            Noneを返した場合は、受け取った辞書を変更したものとしてその辞書を書き込む
+        mode (YamlMode): 読み込みと書き込みに使うエンジン. Defaults to 'rt'.
+        timeout (float | None): ロックを待つ秒数、Noneの場合は無期限に待つ
+            Defaults to DEFAULT_LOCK_TIMEOUT.
+        durability (Durability): 書き込み完了時にfsyncする範囲
+            'none'はfsyncしない、'file'はファイル、'full'はファイルと親ディレクトリ
+            Defaults to 'none'.
+
+    Returns:
+        WriteResult: 書き込んだらWRITTEN、内容が変わらず書き込まなかったらUNCHANGED、
+            失敗したらFAILED(偽)
+    """
+
+    def read_yaml_core(f: IO[Any]) -> dict:
+        return _yaml_engine(mode).load(f)
+
+    def update_yaml_core(data: object, f: IO[Any]) -> None:
+        _yaml_engine(mode).dump(data, f)
+
+    return common_file_update_exception_handling(
+        read_func=read_yaml_core,
+        write_func=update_yaml_core,
+        update=func,
+        empty_factory=dict,
+        path=path,
+        timeout=timeout,
+        durability=durability,
+    )
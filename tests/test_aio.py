@@ -0,0 +1,73 @@
+import asyncio
+from logging import getLogger
+from pathlib import Path
+
+import pytest
+
+from abara_file_io import (
+    WriteResult,
+    aread_ini,
+    aread_json,
+    aread_many,
+    aread_text,
+    aread_toml,
+    aread_yaml,
+    awrite_ini,
+    awrite_json,
+    awrite_text,
+    awrite_toml,
+    awrite_yaml,
+    configure_async_executor,
+)
+
+log = getLogger(__name__)
+
+
+def test_async_read_write(tmp_path: Path) -> None:
+    data = {'foo': 1, 'bar': '瑣事'}
+
+    async def main() -> list[object]:
+        results = await asyncio.gather(
+            awrite_json(data, tmp_path / 'a.json'),
+            awrite_yaml(data, tmp_path / 'a.yml'),
+            awrite_toml(data, tmp_path / 'a.toml'),
+            awrite_ini(data, tmp_path / 'a.ini'),
+            awrite_text('瑣事', tmp_path / 'a.txt'),
+        )
+        assert all(result == WriteResult.WRITTEN for result in results)
+
+        return list(
+            await asyncio.gather(
+                aread_json(tmp_path / 'a.json'),
+                aread_yaml(tmp_path / 'a.yml'),
+                aread_toml(tmp_path / 'a.toml'),
+                aread_ini(tmp_path / 'a.ini'),
+                aread_text(tmp_path / 'a.txt'),
+            )
+        )
+
+    assert asyncio.run(main()) == [data, data, data, data, '瑣事']
+
+
+def test_async_keeps_fallback_contract(tmp_path: Path) -> None:
+    assert asyncio.run(aread_json(tmp_path / 'missing.json')) == {}
+
+
+def test_aread_many(tmp_path: Path) -> None:
+    configure_async_executor(max_workers=2)
+    paths = [tmp_path / f'{i}.json' for i in range(10)]
+
+    async def main() -> None:
+        await asyncio.gather(*(awrite_json({'i': i}, path) for i, path in enumerate(paths)))
+        results = await aread_many([*paths, tmp_path / 'missing.json'], concurrency=3)
+
+        assert [result.data for result in results[:-1]] == [{'i': i} for i in range(10)]
+        assert isinstance(results[-1].error, FileNotFoundError)
+
+    asyncio.run(main())
+    configure_async_executor()
+
+
+def test_aread_many_invalid_concurrency(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match='concurrency'):
+        asyncio.run(aread_many([tmp_path / 'missing.json'], concurrency=0))
@@ -0,0 +1,88 @@
+import json
+from concurrent.futures import ProcessPoolExecutor
+from logging import getLogger
+from pathlib import Path
+
+import pytest
+
+from abara_file_io import (
+    iter_read_many,
+    parse_many,
+    read_many,
+    write_ini,
+    write_json,
+    write_toml,
+    write_yaml,
+)
+
+log = getLogger(__name__)
+
+
+@pytest.fixture
+def sample_files(tmp_path: Path) -> list[Path]:
+    data = {'foo': 1, 'bar': '瑣事'}
+    paths = [
+        tmp_path / 'sample.json',
+        tmp_path / 'sample.yml.gz',
+        tmp_path / 'sample.toml.xz',
+        tmp_path / 'sample.ini',
+    ]
+    write_json(data, paths[0])
+    write_yaml(data, paths[1])
+    write_toml(data, paths[2])
+    write_ini({'section': data}, paths[3])
+    return paths
+
+
+def test_read_many_auto(sample_files: list[Path]) -> None:
+    results = read_many(sample_files, max_workers=2)
+
+    assert [result.path for result in results] == sample_files
+    for result in results:
+        assert result.ok
+        assert result.data == {'foo': 1, 'bar': '瑣事'}
+
+
+def test_read_many_reports_errors(tmp_path: Path) -> None:
+    broken = tmp_path / 'broken.json'
+    broken.write_text('{', encoding='utf_8')
+    good = tmp_path / 'good.json'
+    write_json({'foo': 1}, good)
+
+    results = read_many([broken, tmp_path / 'missing.json', good, tmp_path / 'unknown.xyz'])
+
+    assert isinstance(results[0].error, json.JSONDecodeError)
+    assert isinstance(results[1].error, FileNotFoundError)
+    assert results[2].ok
+    assert results[2].data == {'foo': 1}
+    assert isinstance(results[3].error, ValueError)
+
+
+def test_read_many_explicit_format(tmp_path: Path, sample_str: str) -> None:
+    path = tmp_path / 'data.conf'
+    path.write_text(sample_str, encoding='cp932')
+
+    (result,) = read_many([path], 'text')
+
+    assert result.data == sample_str
+
+
+def test_iter_read_many_unordered(sample_files: list[Path]) -> None:
+    results = list(iter_read_many(sample_files, ordered=False))
+
+    assert sorted(result.path for result in results) == sorted(sample_files)
+    assert all(result.ok for result in results)
+
+
+def test_parse_many(sample_files: list[Path], tmp_path: Path) -> None:
+    missing = tmp_path / 'missing.yml'
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        results = parse_many([*sample_files, missing], chunksize=2, executor=executor)
+        # 同じワーカーを再利用して読み込める
+        again = parse_many(sample_files[:1], executor=executor)
+
+    assert [result.path for result in results] == [*sample_files, missing]
+    assert all(result.data == {'foo': 1, 'bar': '瑣事'} for result in results[:-1])
+    assert isinstance(results[-1].error, FileNotFoundError)
+    assert again[0].data == results[0].data
@@ -0,0 +1,53 @@
+import mmap
+from logging import getLogger
+from pathlib import Path
+
+import pytest
+
+from abara_file_io import read_bytes, write_text
+
+log = getLogger(__name__)
+
+
+@pytest.mark.parametrize(
+    'size',
+    [
+        pytest.param(0, id='empty'),
+        pytest.param(100, id='small'),
+        pytest.param(mmap.ALLOCATIONGRANULARITY * 3 + 1, id='mmap'),
+    ],
+)
+@pytest.mark.parametrize('copy', [True, False])
+def test_read_bytes(tmp_path: Path, size: int, copy: bool) -> None:
+    path = tmp_path / 'data.bin'
+    data = bytes(i % 251 for i in range(size))
+    path.write_bytes(data)
+
+    view = read_bytes(path, copy=copy)
+
+    assert view.readonly
+    assert view == data
+    assert bytes(view[size // 2 :]) == data[size // 2 :]
+
+
+def test_read_bytes_copy(tmp_path: Path) -> None:
+    path = tmp_path / 'data.txt'
+    size = mmap.ALLOCATIONGRANULARITY * 3 + 1
+    write_text('a' * size, path)
+
+    copied = read_bytes(path)
+    # コピーした内容は、ファイルを切り詰めて書き換えた後も参照できる
+    assert write_text('b', path)
+    assert not isinstance(copied.obj, mmap.mmap)
+    assert copied == b'a' * size
+
+    write_text('a' * size, path)
+    mapped = read_bytes(path, copy=False)
+    # マップした内容は、置き換えで書き込めば元のファイルのまま参照できる
+    assert write_text('b', path, atomic=True)
+    assert isinstance(mapped.obj, mmap.mmap)
+    assert mapped == b'a' * size
+
+
+def test_read_bytes_missing_file(tmp_path: Path) -> None:
+    assert read_bytes(tmp_path / 'missing.bin') == b''
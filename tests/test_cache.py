@@ -0,0 +1,144 @@
+import copy
+import pickle
+from collections.abc import Iterator
+from logging import getLogger
+from pathlib import Path
+
+import pytest
+
+from abara_file_io import (
+    clear_read_cache,
+    configure_artifact_cache,
+    configure_read_cache,
+    read_cache_info,
+    read_ini,
+    read_json,
+    read_toml,
+    read_yaml,
+    write_ini,
+    write_json,
+    write_toml,
+    write_yaml,
+)
+from abara_file_io.cache import FrozenDict, FrozenList
+
+log = getLogger(__name__)
+
+
+@pytest.fixture(autouse=True)
+def read_cache() -> Iterator[None]:
+    configure_read_cache()
+    yield
+    clear_read_cache()
+    configure_artifact_cache(None)
+
+
+def test_read_cache_hit_and_invalidation(tmp_path: Path) -> None:
+    path = tmp_path / 'cache.json'
+    write_json({'foo': 1}, path)
+
+    assert read_json(path, cache='copy') == {'foo': 1}
+    assert read_json(path, cache='copy') == {'foo': 1}
+    assert read_cache_info()[:2] == (1, 1)
+
+    write_json({'foo': 12345}, path)
+
+    assert read_json(path, cache='copy') == {'foo': 12345}
+    assert read_cache_info()[:2] == (1, 2)
+
+
+def test_read_cache_copy_isolation(tmp_path: Path) -> None:
+    path = tmp_path / 'cache.json'
+    write_json({'foo': [1, 2]}, path)
+
+    first = read_json(path, cache='copy')
+    first['foo'].append(3)
+
+    assert read_json(path, cache='copy') == {'foo': [1, 2]}
+
+
+def test_read_cache_frozen(tmp_path: Path) -> None:
+    path = tmp_path / 'cache.json'
+    write_json({'foo': [1, 2], 'bar': {'baz': 'qux'}}, path)
+
+    first = read_json(path, cache='frozen')
+    second = read_json(path, cache='frozen')
+
+    assert first is second
+    assert isinstance(first, FrozenDict)
+    assert isinstance(first['foo'], FrozenList)
+    with pytest.raises(TypeError):
+        first['foo'].append(3)
+    with pytest.raises(TypeError):
+        first['bar']['baz'] = 'quux'
+    assert copy.deepcopy(first) == {'foo': [1, 2], 'bar': {'baz': 'qux'}}
+    assert pickle.loads(pickle.dumps(first)) == first  # noqa: S301
+
+
+def test_read_cache_eviction(tmp_path: Path) -> None:
+    configure_read_cache(maxsize=2)
+    paths = [tmp_path / f'cache{i}.json' for i in range(3)]
+    for i, path in enumerate(paths):
+        write_json({'foo': i}, path)
+        read_json(path, cache='copy')
+
+    assert read_cache_info().currsize == 2
+
+    read_json(paths[0], cache='copy')
+
+    assert read_cache_info().hits == 0
+
+
+@pytest.mark.parametrize(
+    ('reader', 'writer', 'suffix'),
+    [
+        pytest.param(read_ini, write_ini, '.ini', id='ini'),
+        pytest.param(read_toml, write_toml, '.toml', id='toml'),
+        pytest.param(read_yaml, write_yaml, '.yml', id='yaml'),
+    ],
+)
+def test_read_cache_formats(reader, writer, suffix: str, tmp_path: Path) -> None:  # noqa: ANN001
+    path = tmp_path / f'cache{suffix}'
+    data = {'section1': {'foo': 1, 'bar': 'two'}, 'section2': {'baz': True}}
+    writer(data, path)
+
+    assert reader(path, cache='frozen') == data
+    assert reader(path, cache='frozen') == data
+    assert read_cache_info().hits == 1
+
+
+@pytest.mark.parametrize(
+    ('reader', 'writer', 'suffix'),
+    [
+        pytest.param(read_ini, write_ini, '.ini', id='ini'),
+        pytest.param(read_toml, write_toml, '.toml', id='toml'),
+        pytest.param(read_yaml, write_yaml, '.yml', id='yaml'),
+    ],
+)
+def test_artifact_cache(
+    reader,  # noqa: ANN001
+    writer,  # noqa: ANN001
+    suffix: str,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    cache_dir = tmp_path / 'artifacts'
+    configure_artifact_cache(cache_dir)
+    path = tmp_path / f'artifact{suffix}'
+    data = {'section1': {'foo': 1, 'bar': 'two'}, 'section2': {'baz': True}}
+    writer(data, path)
+
+    assert reader(path) == data
+    assert len(list(cache_dir.glob('*.pickle'))) == 1
+
+    def fail_parse(*args: object, **kwargs: object) -> None:
+        raise AssertionError
+
+    with monkeypatch.context() as m:
+        m.setattr(reader.__module__ + '.common_file_read_exception_handling', fail_parse)
+        assert reader(path) == data
+
+    data['section1']['foo'] = 12345
+    writer(data, path)
+
+    assert reader(path) == data
@@ -0,0 +1,67 @@
+import time
+from logging import getLogger
+from pathlib import Path
+
+import pytest
+
+from abara_file_io import CoalescingWriter, WriteResult, read_json, read_text
+from abara_file_io import json as json_module
+
+log = getLogger(__name__)
+
+
+def test_coalescing_writer_writes_latest(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / 'state.json'
+    write_count = 0
+    original = json_module.write_json
+
+    def counting_write_json(*args: object, **kwargs: object) -> WriteResult:
+        nonlocal write_count
+        write_count += 1
+        return original(*args, **kwargs)  # type: ignore[arg-type]
+
+    monkeypatch.setattr(json_module, 'write_json', counting_write_json)
+
+    with CoalescingWriter(interval=0.05) as writer:
+        for i in range(100):
+            writer.write({'count': i}, path, compact=True)
+        assert writer.pending == [path.absolute()]
+
+        deadline = time.monotonic() + 5
+        while writer.pending and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    assert read_json(path) == {'count': 99}
+    assert path.read_text(encoding='utf_8') == '{"count":99}'
+    assert write_count == 1
+
+
+def test_coalescing_writer_flush_and_close(tmp_path: Path) -> None:
+    path = tmp_path / 'state.txt'
+    writer = CoalescingWriter(interval=60)
+
+    writer.write('first', path)
+    assert not path.exists()
+    assert writer.flush() == {path.absolute(): WriteResult.WRITTEN}
+    assert read_text(path) == 'first'
+
+    writer.write('second', path)
+    writer.close()
+    assert read_text(path) == 'second'
+    assert writer.flush() == {}
+
+    with pytest.raises(ValueError, match='終了'):
+        writer.write('third', path)
+
+
+def test_coalescing_writer_failure_is_logged(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    path = tmp_path / 'broken.json'
+
+    with CoalescingWriter(interval=60) as writer:
+        writer.write({'value': object()}, path)
+        assert writer.flush() == {path.absolute(): WriteResult.FAILED}
+
+    assert '遅延書き込みに失敗しました' in caplog.text
+    assert not path.exists()
@@ -1,12 +1,25 @@
+import bz2
+import gzip
+import lzma
+import os
+import sys
 from pathlib import Path
-from typing import IO, Any
+from typing import IO, Any, Literal
 
 import pytest
 from ruamel.yaml.parser import ParserError
 
+from abara_file_io import common_io_wrapper
 from abara_file_io.common_io_wrapper import (
+    WriteResult,
+    _magic_compression,
     common_file_read_exception_handling,
+    common_file_update_exception_handling,
     common_file_write_exception_handling,
+    configure_compression_level,
+    configure_encoding_memo,
+    configure_mmap_threshold,
+    detect_encoding,
 )
 
 
@@ -53,3 +66,344 @@ def test_common_file_write_exception_handling(exception: Exception, tmp_path: Pa
     response = common_file_write_exception_handling(func=dummy_func, data=data, path=path)
 
     assert not response
+
+
+def test_encoding_fallback_reads_once(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / 'sample_cp932.txt'
+    path.write_text('瑣事を愛さなければならぬ。' * 100, encoding='cp932')
+
+    open_modes: list[str] = []
+    original_open = Path.open
+
+    def counting_open(self: Path, mode: str = 'r', encoding: str | None = None) -> IO[Any]:
+        open_modes.append(mode)
+        return original_open(self, mode, encoding=encoding)
+
+    monkeypatch.setattr(Path, 'open', counting_open)
+
+    parse_calls: list[str] = []
+
+    def read_core(f: IO[Any]) -> str:
+        data = f.read()
+        parse_calls.append(data)
+        return data
+
+    response = common_file_read_exception_handling(
+        func=read_core, return_empty_value='', path=path
+    )
+
+    assert response == '瑣事を愛さなければならぬ。' * 100
+    assert open_modes == ['r', 'rb']
+    assert parse_calls == [response]
+
+
+@pytest.mark.parametrize(
+    ('raw', 'expected'),
+    [
+        pytest.param('瑣事'.encode('utf_16'), ('utf_16', 'bom'), id='utf_16_bom'),
+        pytest.param('瑣事'.encode('utf_8_sig'), ('utf_8_sig', 'bom'), id='utf_8_bom'),
+        pytest.param('plain text'.encode('utf_16_le'), ('utf_16_le', 'prefix'), id='utf_16_le'),
+        pytest.param('瑣事'.encode(), ('utf_8', 'prefix'), id='utf_8'),
+    ],
+)
+def test_detect_encoding_tier(raw: bytes, expected: tuple[str, str]) -> None:
+    assert detect_encoding(raw) == expected
+
+
+def test_detect_encoding_sample_tier(sample_str: str) -> None:
+    result = detect_encoding(sample_str.encode('shift_jis'))
+
+    assert result is not None
+    assert result.tier == 'sample'
+    assert (sample_str.encode('shift_jis')).decode(result.encoding) == sample_str
+
+
+def test_read_utf_8_with_bom(tmp_path: Path, sample_str: str) -> None:
+    path = tmp_path / 'sample_bom.txt'
+    path.write_text(sample_str, encoding='utf_8_sig')
+
+    response = common_file_read_exception_handling(
+        func=lambda f: f.read(), return_empty_value='', path=path
+    )
+
+    assert response == sample_str
+
+
+def test_encoding_memo(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, sample_str: str) -> None:
+    # テスト終了時に元の設定へ戻す
+    monkeypatch.setattr(common_io_wrapper, '_encoding_memo', common_io_wrapper._encoding_memo)  # noqa: SLF001
+
+    store = tmp_path / 'encoding_memo.json'
+    configure_encoding_memo(store=store)
+
+    path = tmp_path / 'sample_cp932.txt'
+    path.write_text(sample_str, encoding='cp932')
+
+    def read_core(f: IO[Any]) -> str:
+        return f.read()
+
+    assert common_file_read_exception_handling(read_core, '', path) == sample_str
+    assert store.exists()
+
+    def fail_detection(*args: object, **kwargs: object) -> None:
+        raise AssertionError
+
+    monkeypatch.setattr(common_io_wrapper, '_iter_encoding_candidates', fail_detection)
+
+    # 保存された判定結果を読み込んだ新しいプロセスを想定
+    configure_encoding_memo(store=store)
+    assert common_file_read_exception_handling(read_core, '', path) == sample_str
+
+
+def write_core(data: object, f: IO[Any]) -> None:
+    f.write(data)
+
+
+def test_atomic_write(tmp_path: Path) -> None:
+    path = tmp_path / 'atomic.txt'
+    path.write_text('old', encoding='utf_8')
+    path.chmod(0o600)
+
+    assert common_file_write_exception_handling(write_core, 'new', path, atomic=True)
+    assert path.read_text(encoding='utf_8') == 'new'
+    assert path.stat().st_mode & 0o777 == 0o600
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_atomic_write_failure_keeps_original(tmp_path: Path) -> None:
+    path = tmp_path / 'atomic.txt'
+    path.write_text('old', encoding='utf_8')
+
+    def fail_core(data: object, f: IO[Any]) -> None:
+        f.write('partial')
+        raise OSError
+
+    assert not common_file_write_exception_handling(fail_core, 'new', path, atomic=True)
+    assert path.read_text(encoding='utf_8') == 'old'
+    assert list(tmp_path.iterdir()) == [path]
+
+
+@pytest.mark.parametrize(
+    ('atomic', 'durability', 'expected'),
+    [
+        pytest.param(False, 'none', 0, id='none'),
+        pytest.param(False, 'file', 1, id='file'),
+        pytest.param(True, 'full', 2, id='atomic-full'),
+    ],
+)
+def test_write_durability(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    atomic: bool,
+    durability: Literal['none', 'file', 'full'],
+    expected: int,
+) -> None:
+    fsync_calls: list[int] = []
+    fsync = common_io_wrapper.os.fsync
+
+    def count_fsync(fd: int) -> None:
+        fsync_calls.append(fd)
+        fsync(fd)
+
+    monkeypatch.setattr(common_io_wrapper.os, 'fsync', count_fsync)
+
+    path = tmp_path / 'durable.txt'
+    assert common_file_write_exception_handling(
+        write_core, 'data', path, atomic=atomic, durability=durability
+    )
+    assert len(fsync_calls) == expected
+
+
+@pytest.mark.parametrize(
+    ('file_name', 'expected'),
+    [
+        pytest.param('unchanged.txt', b'line1\nline2\n', id='text'),
+        pytest.param('unchanged.bat', b'line1\r\nline2\r\n', id='bat'),
+    ],
+)
+def test_write_skip_unchanged(tmp_path: Path, file_name: str, expected: bytes) -> None:
+    path = tmp_path / file_name
+    data = 'line1\nline2\n'
+
+    def write(data: str) -> WriteResult:
+        return common_file_write_exception_handling(write_core, data, path, skip_unchanged=True)
+
+    assert write(data) == WriteResult.WRITTEN
+    assert path.read_bytes() == expected
+
+    mtime_ns = 1_000_000_000
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+    assert write(data) == WriteResult.UNCHANGED
+    assert path.stat().st_mtime_ns == mtime_ns
+
+    # 同じサイズで内容だけが異なる場合は書き込む
+    assert write(data.replace('1', '3')) == WriteResult.WRITTEN
+    assert path.stat().st_mtime_ns != mtime_ns
+
+
+def test_read_mapped(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, sample_str: str) -> None:
+    monkeypatch.setattr(common_io_wrapper, '_mmap_threshold', None)
+    configure_mmap_threshold(1)
+
+    utf_8_path = tmp_path / 'crlf.txt'
+    utf_8_path.write_bytes(sample_str.replace('\n', '\r\n').encode('utf_8'))
+    cp932_path = tmp_path / 'cp932.txt'
+    cp932_path.write_text(sample_str, encoding='cp932')
+
+    def read_lines(f: IO[Any]) -> list[str]:
+        return list(f)
+
+    for path in (utf_8_path, cp932_path):
+        assert common_file_read_exception_handling(lambda f: f.read(), '', path) == sample_str
+        assert common_file_read_exception_handling(read_lines, [], path) == (
+            sample_str.splitlines(keepends=True)
+        )
+
+
+@pytest.mark.parametrize(
+    ('suffix', 'magic'),
+    [
+        pytest.param('.gz', b'\x1f\x8b', id='gzip'),
+        pytest.param('.bz2', b'BZh', id='bz2'),
+        pytest.param('.xz', b'\xfd7zXZ\x00', id='xz'),
+    ],
+)
+@pytest.mark.parametrize('atomic', [False, True])
+def test_compressed_file(
+    tmp_path: Path,
+    sample_str: str,
+    suffix: str,
+    magic: bytes,
+    atomic: bool,
+) -> None:
+    path = tmp_path / f'sample.txt{suffix}'
+
+    assert common_file_write_exception_handling(write_core, sample_str, path, atomic=atomic)
+    assert path.read_bytes().startswith(magic)
+    assert common_file_read_exception_handling(lambda f: f.read(), '', path) == sample_str
+
+    # 拡張子が無くてもマジックナンバーから判定して展開する
+    renamed = path.rename(tmp_path / 'renamed.txt')
+    assert common_file_read_exception_handling(lambda f: f.read(), '', renamed) == sample_str
+
+    # 追記は圧縮ストリームを末尾に連結する
+    appended = tmp_path / f'appended.txt{suffix}'
+    for _ in range(2):
+        common_file_write_exception_handling(write_core, 'line\n', appended, mode='a')
+    assert common_file_read_exception_handling(lambda f: f.read(), '', appended) == 'line\n' * 2
+
+
+@pytest.mark.parametrize(
+    ('head', 'expected'),
+    [
+        pytest.param(gzip.compress(b'data'), 'gzip', id='gzip'),
+        pytest.param(bz2.compress(b'data'), 'bz2', id='bz2'),
+        pytest.param(bz2.compress(b''), 'bz2', id='bz2_empty'),
+        pytest.param(lzma.compress(b'data'), 'xz', id='xz'),
+        pytest.param(b'\x1f\x8b is a prefix', None, id='gzip_like'),
+        pytest.param(b'BZh is a prefix', None, id='bz2_like'),
+        pytest.param(b'BZh91AY is a prefix', None, id='bz2_block_size_like'),
+    ],
+)
+def test_magic_compression(head: bytes, expected: str | None) -> None:
+    assert _magic_compression(head) == expected
+
+
+def test_compressed_file_skip_unchanged(tmp_path: Path, sample_str: str) -> None:
+    path = tmp_path / 'unchanged.txt.gz'
+
+    def write(data: str) -> WriteResult:
+        return common_file_write_exception_handling(write_core, data, path, skip_unchanged=True)
+
+    assert write(sample_str) == WriteResult.WRITTEN
+    assert write(sample_str) == WriteResult.UNCHANGED
+    assert write(sample_str + 'x') == WriteResult.WRITTEN
+
+
+def test_configure_compression_level(tmp_path: Path, sample_str: str) -> None:
+    data = sample_str * 100
+    sizes = []
+    try:
+        for level in (0, 9):
+            configure_compression_level(gzip=level)
+            path = tmp_path / f'{level}.txt.gz'
+            common_file_write_exception_handling(write_core, data, path)
+            sizes.append(path.stat().st_size)
+    finally:
+        configure_compression_level(gzip=6)
+    assert sizes[0] > sizes[1]
+
+    with pytest.raises(ValueError, match='bz2'):
+        configure_compression_level(bz2=0)
+
+
+def test_broken_compressed_file(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    path = tmp_path / 'broken.txt.xz'
+    assert common_file_write_exception_handling(write_core, 'data\n' * 100, path)
+    path.write_bytes(path.read_bytes()[:-20])
+
+    assert common_file_read_exception_handling(lambda f: f.read(), '', path) == ''
+    assert '圧縮ファイルが壊れています' in caplog.text
+
+
+def read_core(f: IO[Any]) -> str:
+    return f.read()
+
+
+def test_update_compressed_and_non_utf_8(tmp_path: Path, sample_str: str) -> None:
+    compressed = tmp_path / 'update.txt.gz'
+    common_file_write_exception_handling(write_core, sample_str, compressed)
+    cp932 = tmp_path / 'update.txt'
+    cp932.write_text(sample_str, encoding='cp932')
+
+    for path in (compressed, cp932):
+        result = common_file_update_exception_handling(
+            read_core, write_core, lambda text: text + 'end\n', str, path
+        )
+        assert result == WriteResult.WRITTEN
+        assert common_file_read_exception_handling(read_core, '', path) == sample_str + 'end\n'
+    assert compressed.read_bytes().startswith(b'\x1f\x8b')
+
+
+@pytest.mark.parametrize('text', ['BZh notes\n', 'BZh91AY&SY notes\n'])
+def test_update_text_starting_with_compression_magic(tmp_path: Path, text: str) -> None:
+    path = tmp_path / 'notes'
+    path.write_text(text, encoding='utf_8')
+
+    result = common_file_update_exception_handling(
+        read_core, write_core, lambda text: text + 'end\n', str, path
+    )
+
+    assert result == WriteResult.WRITTEN
+    assert path.read_text(encoding='utf_8') == text + 'end\n'
+
+
+def test_update_compressed_without_suffix(tmp_path: Path, sample_str: str) -> None:
+    path = tmp_path / 'update'
+    path.write_bytes(gzip.compress(sample_str.encode('utf_8')))
+
+    result = common_file_update_exception_handling(
+        read_core, write_core, lambda text: text + 'end\n', str, path
+    )
+
+    assert result == WriteResult.WRITTEN
+    assert gzip.decompress(path.read_bytes()).decode('utf_8') == sample_str + 'end\n'
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='fcntlが無い環境ではロックしない')
+def test_update_lock_timeout(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    import fcntl  # noqa: PLC0415
+
+    path = tmp_path / 'locked.txt'
+    path.write_text('original', encoding='utf_8')
+
+    with path.open('rb') as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        result = common_file_update_exception_handling(
+            read_core, write_core, lambda _: 'updated', str, path, timeout=0.05
+        )
+        assert result == WriteResult.FAILED
+        assert 'ロックを取得できなかった' in caplog.text
+
+    assert path.read_text(encoding='utf_8') == 'original'
+    assert common_file_read_exception_handling(read_core, '', path, lock=True) == 'original'
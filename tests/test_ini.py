@@ -3,7 +3,8 @@ from pathlib import Path
 
 import pytest
 
-from abara_file_io import read_ini, write_ini
+from abara_file_io import LazySections, read_ini, read_ini_lazy, write_ini
+from abara_file_io.ini import IniEngine, _restore_ini_config
 
 log = getLogger(__name__)
 
@@ -61,9 +62,11 @@ def test_write_ini(
     ],
     indirect=['sample_dicts'],
 )
+@pytest.mark.parametrize('engine', ['fast', 'configparser'])
 def test_read_ini(
     sample_dicts: dict[str, dict | str],
     tmp_path: Path,
+    engine: IniEngine,
 ) -> None:
     file_path = tmp_path / 'tmp' / f'test_ini_file_{sample_dicts["name"]}.ini'
 
@@ -72,9 +75,95 @@ def test_read_ini(
         data = sample_dicts['data']
 
     write_ini(data, file_path)
-    read_data = read_ini(file_path)
+    read_data = read_ini(file_path, engine=engine)
 
     if sample_dicts['ini_expected']:
         assert data == read_data
     else:
         assert read_data == {}
+
+
+@pytest.mark.parametrize(
+    'text',
+    [
+        pytest.param(
+            '[a]\nFoo = 1\n; comment\n  # comment\nbar: 1_000.5e1\n\n[b]\nbaz = x\n', id='fast'
+        ),
+        pytest.param('[a]\nfoo = 1\nbar = %(foo)s0\nbaz = 100%%\n', id='interpolation'),
+        pytest.param('[DEFAULT]\nfoo = 1\n[a]\nbar = 2\n', id='default_section'),
+        pytest.param('[a]\nfoo = first\n  second\n\n  third\nbar = 2\n', id='multiline'),
+    ],
+)
+def test_read_ini_engines_match(tmp_path: Path, text: str) -> None:
+    file_path = tmp_path / 'engines.ini'
+    file_path.write_text(text, encoding='utf_8')
+
+    assert read_ini(file_path, engine='fast') == read_ini(file_path, engine='configparser')
+    assert read_ini_lazy(file_path) == read_ini(file_path)
+
+
+def test_read_ini_lazy(tmp_path: Path) -> None:
+    file_path = tmp_path / 'lazy.ini'
+    data = {
+        f'section{i}': {'index': i, 'name': f'name{i}', 'enabled': i % 2 == 0} for i in range(50)
+    }
+    write_ini(data, file_path)
+
+    lazy = read_ini_lazy(file_path)
+    assert isinstance(lazy, LazySections)
+    assert list(lazy) == list(data)
+    assert lazy['section10'] == data['section10']
+    assert 'section49' in lazy
+    assert lazy.parsed_sections == ['section10']
+
+    assert lazy == data
+    assert dict(lazy.items()) == data
+    with pytest.raises(KeyError):
+        lazy['missing']
+
+
+@pytest.mark.parametrize(
+    'text',
+    [
+        pytest.param('[a]\nfoo = 1\n[b]\nbar = first\n  second\n', id='multiline'),
+        pytest.param('[a]\nfoo = 1\n  [b]\nbar = 2\n', id='indented_header'),
+        pytest.param('[a]\nfoo = 1\n[a]\nbar = 2\n', id='duplicate_section'),
+        pytest.param('[a]\nfoo = 1\n', id='single_section'),
+        pytest.param('', id='empty'),
+        pytest.param('; comment\n# comment\n', id='comment_only'),
+        pytest.param('foo = 1\n', id='no_section'),
+    ],
+)
+def test_read_ini_lazy_matches_read_ini(tmp_path: Path, text: str) -> None:
+    file_path = tmp_path / 'lazy.ini'
+    file_path.write_text(text, encoding='utf_8')
+
+    try:
+        expected = read_ini(file_path, engine='configparser')
+    except Exception as e:  # noqa: BLE001
+        with pytest.raises(type(e)):
+            dict(read_ini_lazy(file_path))
+        return
+    assert dict(read_ini_lazy(file_path)) == expected
+
+
+@pytest.mark.parametrize(
+    ('value', 'expected'),
+    [
+        ('12', 12),
+        ('-1_000', -1000),
+        ('2.5', 2.5),
+        ('.5e-3', 0.0005),
+        ('-Infinity', float('-inf')),
+        ('True', True),
+        ('False', False),
+        ('1_', '1_'),
+        ('0x10', '0x10'),
+        ('true', 'true'),
+        ('three', 'three'),
+    ],
+)
+def test_restore_ini_config(value: str, expected: object) -> None:
+    restored = _restore_ini_config(value)
+    assert restored == expected
+    assert type(restored) is type(expected)
@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import abara_file_io
+
+
+def loaded_modules(statement: str) -> set[str]:
+    src = Path(__file__).parent.parent / 'src'
+    env = {**os.environ, 'PYTHONPATH': str(src)}
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, '-c', f'{statement}\nimport sys\nprint("\\n".join(sys.modules))'],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+    return set(result.stdout.splitlines())
+
+
+@pytest.mark.parametrize(
+    'statement',
+    [
+        pytest.param('import abara_file_io', id='package'),
+        pytest.param('from abara_file_io import read_json, write_json', id='json'),
+        pytest.param('from abara_file_io import read_text', id='text'),
+        pytest.param('from abara_file_io import aread_json', id='aio'),
+    ],
+)
+def test_lazy_import(statement: str) -> None:
+    modules = loaded_modules(statement)
+
+    assert 'ruamel.yaml' not in modules
+    assert 'charset_normalizer' not in modules
+
+
+def test_lazy_attribute() -> None:
+    assert 'read_yaml' in dir(abara_file_io)
+    with pytest.raises(AttributeError):
+        _ = abara_file_io.read_foo  # type: ignore[attr-defined]
@@ -1,9 +1,13 @@
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from logging import getLogger
 from pathlib import Path
 
 import pytest
 
-from abara_file_io import read_json, write_json
+from abara_file_io import WriteResult, read_json, update_json, write_json
+from abara_file_io.json import _orjson
 
 log = getLogger(__name__)
 
@@ -42,3 +46,86 @@ def test_json_read_write(
 
     assert file_path.exists()
     assert response == data
+
+
+@pytest.mark.parametrize('ensure_ascii', [True, False])
+def test_write_json_output_unchanged(tmp_path: Path, ensure_ascii: bool) -> None:
+    file_path = tmp_path / 'pretty.json'
+    data = {'foo': [1, 2.5, None, True], 'bar': {'baz': 'あ\nい'}, 'qux': {}, 'quux': []}
+
+    write_json(data, file_path, ensure_ascii=ensure_ascii)
+
+    expected = json.dumps(data, indent=2, ensure_ascii=ensure_ascii).encode('utf_8')
+    assert file_path.read_bytes() == expected
+
+
+def test_write_json_compact(tmp_path: Path) -> None:
+    file_path = tmp_path / 'compact.json'
+    data = {'foo': [1, 2], 'bar': 'あ'}
+
+    write_json(data, file_path, compact=True)
+
+    assert file_path.read_text(encoding='utf_8') == '{"foo":[1,2],"bar":"あ"}'
+
+
+@pytest.mark.parametrize('compact', [True, False])
+def test_write_json_orjson_backend(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, compact: bool
+) -> None:
+    file_path = tmp_path / 'orjson.json'
+    data = {'foo': [1, 2], 'bar': {'baz': 'あ'}}
+    expected = tmp_path / 'expected.json'
+    write_json(data, expected, compact=compact)
+
+    write_json(data, file_path, compact=compact, backend='orjson')
+    assert file_path.read_bytes() == expected.read_bytes()
+
+    # orjsonがインストールされていない環境
+    monkeypatch.setitem(sys.modules, 'orjson', None)
+    _orjson.cache_clear()
+    try:
+        write_json(data, file_path, compact=compact, backend='orjson')
+        assert file_path.read_bytes() == expected.read_bytes()
+        assert _orjson() is None
+    finally:
+        _orjson.cache_clear()
+
+
+def test_write_json_skip_unchanged(tmp_path: Path) -> None:
+    path = tmp_path / 'unchanged.json'
+
+    assert write_json({'foo': 1}, path, skip_unchanged=True) == WriteResult.WRITTEN
+    assert write_json({'foo': 1}, path, skip_unchanged=True) == WriteResult.UNCHANGED
+    assert write_json({'foo': 2}, path, skip_unchanged=True) == WriteResult.WRITTEN
+    assert read_json(path) == {'foo': 2}
+
+
+def _increment(data: dict) -> None:
+    data['count'] = data.get('count', 0) + 1
+
+
+def _increment_many(path: Path, times: int) -> None:
+    for _ in range(times):
+        update_json(path, _increment)
+
+
+def test_update_json(tmp_path: Path) -> None:
+    path = tmp_path / 'counter.json'
+
+    assert update_json(path, _increment) == WriteResult.WRITTEN
+    assert read_json(path) == {'count': 1}
+    assert update_json(path, lambda data: {**data, 'count': 10}, compact=True)
+    assert path.read_text(encoding='utf_8') == '{"count":10}'
+    assert update_json(path, lambda data: data, compact=True) == WriteResult.UNCHANGED
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='fcntlが無い環境ではロックしない')
+def test_update_json_concurrent(tmp_path: Path) -> None:
+    path = tmp_path / 'counter.json'
+    workers, times = 4, 25
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for future in [executor.submit(_increment_many, path, times) for _ in range(workers)]:
+            future.result()
+
+    assert read_json(path, lock=True) == {'count': workers * times}
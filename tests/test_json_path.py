@@ -0,0 +1,84 @@
+import gzip
+import json
+from logging import getLogger
+from pathlib import Path
+
+import pytest
+
+from abara_file_io import iter_json_items, read_json_path, write_json
+from abara_file_io import json_path as json_path_module
+
+log = getLogger(__name__)
+
+SAMPLE = {
+    'services': {
+        'web': {'image': 'nginx', 'ports': [80, 443]},
+        'api': {'image': 'app:1.0', 'replicas': 3, 'env': {'KEY.NAME': 'a"b\\c'}},
+    },
+    'items': [
+        {'name': '瑣事を愛さなければならぬ', 'tags': ['[', ']', '{}']},
+        {'name': 'escape \\" and \\u3042', 'value': -1.5e-3},
+        {'name': 'nested', 'value': [[1, 2], {'x': None}]},
+    ],
+    'empty': {'object': {}, 'array': []},
+    'flag': True,
+}
+
+
+@pytest.fixture
+def sample_json(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    # チャンクの境界で文字列や数値が分断される場合も確認するため、チャンクを小さくする
+    monkeypatch.setattr(json_path_module, 'JSON_CHUNK_SIZE', 3)
+    path = tmp_path / 'sample.json'
+    write_json(SAMPLE, path)
+    return path
+
+
+@pytest.mark.parametrize(
+    ('query', 'expected'),
+    [
+        ('services.api.replicas', 3),
+        ('services.web.ports[1]', 443),
+        ('services.api.env["KEY.NAME"]', 'a"b\\c'),
+        ('items[0].tags', ['[', ']', '{}']),
+        ('items[2].value[1].x', None),
+        ('$.items[1].value', -1.5e-3),
+        ('empty', {'object': {}, 'array': []}),
+        ('', SAMPLE),
+    ],
+)
+def test_read_json_path(sample_json: Path, query: str, expected: object) -> None:
+    assert read_json_path(sample_json, query) == expected
+
+
+def test_read_json_path_missing(sample_json: Path, tmp_path: Path) -> None:
+    assert read_json_path(sample_json, 'services.db.image') is None
+    assert read_json_path(sample_json, 'items[5]', default=0) == 0
+    assert read_json_path(sample_json, 'flag.value', default='none') == 'none'
+    assert read_json_path(tmp_path / 'missing.json', 'items', default=[]) == []
+    with pytest.raises(ValueError, match='パス'):
+        read_json_path(sample_json, 'items[a]')
+
+
+def test_iter_json_items(sample_json: Path) -> None:
+    assert list(iter_json_items(sample_json, 'items.*')) == SAMPLE['items']
+    assert list(iter_json_items(sample_json, 'items[*].name')) == [
+        i['name'] for i in SAMPLE['items']
+    ]
+    assert list(iter_json_items(sample_json, 'services.*.image')) == ['nginx', 'app:1.0']
+    assert list(iter_json_items(sample_json, 'empty.*.*')) == []
+
+
+def test_iter_json_items_compressed_and_encoded(tmp_path: Path) -> None:
+    path = tmp_path / 'sample.json.gz'
+    path.write_bytes(gzip.compress(json.dumps(SAMPLE, ensure_ascii=False).encode('cp932')))
+
+    assert read_json_path(path, 'items[0].name') == '瑣事を愛さなければならぬ'
+
+
+def test_read_json_path_invalid(tmp_path: Path) -> None:
+    path = tmp_path / 'broken.json'
+    path.write_text('{"a": [1, 2', encoding='utf_8')
+
+    with pytest.raises(json.JSONDecodeError):
+        read_json_path(path, 'a')
@@ -0,0 +1,52 @@
+from logging import getLogger
+from pathlib import Path
+
+import pytest
+
+from abara_file_io import WriteResult, append_jsonl, iter_jsonl, write_jsonl
+
+log = getLogger(__name__)
+
+
+def test_write_and_iter_jsonl(tmp_path: Path) -> None:
+    path = tmp_path / 'events.jsonl'
+    records = ({'id': i, 'name': f'瑣事{i}'} for i in range(1000))
+
+    assert write_jsonl(records, path) == WriteResult.WRITTEN
+    assert path.read_text(encoding='utf_8').splitlines()[0] == '{"id":0,"name":"瑣事0"}'
+    assert list(iter_jsonl(path)) == [{'id': i, 'name': f'瑣事{i}'} for i in range(1000)]
+
+
+def test_append_jsonl(tmp_path: Path) -> None:
+    path = tmp_path / 'events.jsonl'
+
+    assert append_jsonl([{'id': 0}], path)
+    assert append_jsonl([{'id': 1}, {'id': 2}], path)
+    assert list(iter_jsonl(path)) == [{'id': 0}, {'id': 1}, {'id': 2}]
+
+
+def test_iter_jsonl_skips_broken_line(tmp_path: Path) -> None:
+    path = tmp_path / 'events.jsonl'
+    path.write_text('{"id": 0}\n\n{"id": 1}\n{"id": 2', encoding='utf_8')
+
+    assert list(iter_jsonl(path)) == [{'id': 0}, {'id': 1}]
+
+
+def test_iter_jsonl_detects_encoding(tmp_path: Path) -> None:
+    path = tmp_path / 'events.jsonl'
+    path.write_text('{"name": "瑣事"}\n' * 10, encoding='cp932')
+
+    assert list(iter_jsonl(path)) == [{'name': '瑣事'}] * 10
+
+
+def test_iter_jsonl_missing_file(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    assert list(iter_jsonl(tmp_path / 'missing.jsonl')) == []
+    assert 'missing.jsonl' in caplog.text
+
+
+def test_compressed_jsonl(tmp_path: Path) -> None:
+    path = tmp_path / 'events.jsonl.bz2'
+
+    assert write_jsonl(({'id': i} for i in range(100)), path) == WriteResult.WRITTEN
+    assert append_jsonl([{'id': 100}], path) == WriteResult.WRITTEN
+    assert list(iter_jsonl(path)) == [{'id': i} for i in range(101)]
@@ -0,0 +1,145 @@
+import gzip
+import mmap
+import pickle
+from logging import getLogger
+from pathlib import Path
+
+import pytest
+
+from abara_file_io import read_many, read_pickle, write_pickle
+from abara_file_io.common_io_wrapper import WriteResult
+
+log = getLogger(__name__)
+
+SAMPLE = {
+    'name': '瑣事を愛さなければならぬ',
+    'values': [1, 2.5, None, True],
+    'pair': (b'\x00\x01', frozenset({'a'})),
+}
+
+
+@pytest.mark.parametrize('backend', ['pickle', 'marshal'])
+def test_write_read_pickle(tmp_path: Path, backend: str) -> None:
+    path = tmp_path / 'data.pickle'
+
+    result = write_pickle(SAMPLE, path, backend=backend)  # type: ignore[arg-type]
+
+    assert result
+    assert result is WriteResult.WRITTEN
+    assert read_pickle(path) == SAMPLE
+
+
+@pytest.mark.parametrize(
+    'size',
+    [
+        pytest.param(100, id='small'),
+        pytest.param(mmap.ALLOCATIONGRANULARITY * 3 + 1, id='mmap'),
+    ],
+)
+def test_write_pickle_out_of_band(tmp_path: Path, size: int) -> None:
+    path = tmp_path / 'data.pkl'
+    payload = bytearray(i % 251 for i in range(size))
+    data = {'payload': payload, 'buffer': pickle.PickleBuffer(b'abc'), 'name': 'x'}
+
+    assert write_pickle(data, path, out_of_band=True)
+
+    # バッファーはpickleの中にコピーされず、ファイルにそのまま書き込まれる
+    assert path.read_bytes().count(payload) == 1
+    loaded = read_pickle(path)
+    assert loaded['payload'] == payload
+    assert bytes(loaded['buffer']) == b'abc'
+    assert loaded['name'] == 'x'
+
+
+def test_write_pickle_out_of_band_marshal(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match='out_of_band'):
+        write_pickle(SAMPLE, tmp_path / 'data.pickle', backend='marshal', out_of_band=True)
+
+
+def test_write_pickle_skip_unchanged_and_compressed(tmp_path: Path) -> None:
+    path = tmp_path / 'data.pickle.gz'
+
+    assert write_pickle(SAMPLE, path, atomic=True) is WriteResult.WRITTEN
+    assert write_pickle(SAMPLE, path, skip_unchanged=True) is WriteResult.UNCHANGED
+    assert pickle.loads(gzip.decompress(path.read_bytes())) == SAMPLE  # noqa: S301
+    assert read_pickle(path) == SAMPLE
+    assert read_many([path])[0].data == SAMPLE
+
+
+def test_read_write_pickle_failed(tmp_path: Path) -> None:
+    assert read_pickle(tmp_path / 'missing.pickle') is None
+
+    result = write_pickle(SAMPLE, tmp_path)
+
+    assert not result
+    assert result is WriteResult.FAILED
+
+
+def test_read_pickle_copy(tmp_path: Path) -> None:
+    path = tmp_path / 'data.pkl'
+    size = mmap.ALLOCATIONGRANULARITY * 3 + 1
+    data = {'buffer': pickle.PickleBuffer(bytes(size))}
+
+    write_pickle(data, path, out_of_band=True)
+    copied = read_pickle(path)
+    # コピーしたバッファーは、ファイルを切り詰めて書き換えた後も参照できる
+    assert write_pickle({}, path)
+    assert not isinstance(copied['buffer'].obj, mmap.mmap)
+    assert bytes(copied['buffer']) == bytes(size)
+
+    write_pickle(data, path, out_of_band=True)
+    mapped = read_pickle(path, copy=False)
+    # マップしたバッファーは、置き換えで書き込めば元のファイルのまま参照できる
+    assert write_pickle({}, path, atomic=True)
+    assert isinstance(mapped['buffer'].obj, mmap.mmap)
+    assert bytes(mapped['buffer']) == bytes(size)
+
+
+@pytest.mark.parametrize(
+    ('data', 'backend'),
+    [
+        pytest.param(b'payload ABFIOOB1', 'marshal', id='marshal_magic'),
+        pytest.param(bytes(8) + b'ABFIOOB1', 'marshal', id='marshal_trailer'),
+        pytest.param([bytes(8) + b'ABFIOOB1'], 'pickle', id='pickle_trailer'),
+    ],
+)
+def test_read_pickle_ends_with_magic(tmp_path: Path, data: object, backend: str) -> None:
+    path = tmp_path / 'data.pickle'
+    write_pickle(data, path, backend=backend)  # type: ignore[arg-type]
+
+    assert read_pickle(path) == data
+
+
+@pytest.mark.parametrize('cut', [1, 10, 40])
+@pytest.mark.parametrize('backend', ['pickle', 'marshal'])
+def test_read_pickle_truncated(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture, backend: str, cut: int
+) -> None:
+    path = tmp_path / 'data.pickle'
+    write_pickle(SAMPLE, path, backend=backend)  # type: ignore[arg-type]
+    path.write_bytes(path.read_bytes()[:-cut])
+
+    assert read_pickle(path) is None
+    assert 'pickleのデータが途中で切れている' in caplog.text
+    assert '圧縮' not in caplog.text
+    assert read_many([path])[0].error is not None
+
+
+@pytest.mark.parametrize('backend', ['pickle', 'marshal'])
+def test_read_pickle_corrupted(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture, backend: str
+) -> None:
+    text_path = tmp_path / 'text.pickle'
+    text_path.write_text('not a pickle\n', encoding='utf_8')
+    assert read_pickle(text_path) is None
+
+    path = tmp_path / 'data.pickle'
+    write_pickle(SAMPLE, path, backend=backend)  # type: ignore[arg-type]
+    raw = path.read_bytes()
+    for i in range(len(raw)):
+        for value in (0x00, 0xFF, raw[i] ^ 0x55):
+            path.write_bytes(raw[:i] + bytes([value]) + raw[i + 1 :])
+            # 壊れた箇所によっては読み込めるが、例外は送出しない
+            read_pickle(path)
+
+    assert 'pickleのデータが途中で切れているか壊れています' in caplog.text
@@ -1,9 +1,21 @@
+import gzip
+from itertools import pairwise
 from logging import getLogger
 from pathlib import Path
 
 import pytest
 
-from abara_file_io import read_text, write_text
+from abara_file_io import (
+    common_io_wrapper,
+    iter_text_chunks,
+    iter_text_lines,
+    read_text,
+    read_text_range,
+    tail_text,
+    write_text,
+)
+from abara_file_io import text as text_module
+from abara_file_io.common_io_wrapper import file_identity
 
 log = getLogger(__name__)
 
@@ -45,3 +57,143 @@ def test_bat_file(tmp_path: Path, sample_str: str) -> None:
     write_text(sample_str, file_path)
     read_data = read_text(file_path)
     assert read_data == sample_str
+
+
+@pytest.mark.parametrize(
+    'create_sample_text_files_multiple_encodings',
+    [('utf_8'), ('shift_jis'), ('utf_16'), ('euc_jp')],
+    indirect=['create_sample_text_files_multiple_encodings'],
+)
+def test_iter_text_chunks(
+    create_sample_text_files_multiple_encodings: Path, sample_str: str
+) -> None:
+    # 小さなチャンクでマルチバイト文字が分断されても正しくデコードできる
+    chunks = list(iter_text_chunks(create_sample_text_files_multiple_encodings, size=7))
+
+    assert len(chunks) > 1
+    assert ''.join(chunks) == sample_str
+
+
+def test_iter_text_lines(tmp_path: Path, sample_str: str) -> None:
+    file_path = tmp_path / 'crlf.txt'
+    file_path.write_bytes(sample_str.replace('\n', '\r\n').encode('cp932'))
+
+    lines = list(iter_text_lines(file_path, size=5))
+
+    assert lines == sample_str.splitlines(keepends=True)
+
+
+def test_iter_text_lines_missing_file(tmp_path: Path) -> None:
+    assert list(iter_text_lines(tmp_path / 'missing.txt')) == []
+    with pytest.raises(ValueError, match='size'):
+        iter_text_chunks(tmp_path / 'missing.txt', size=0)
+
+
+@pytest.fixture
+def small_seek_block(monkeypatch: pytest.MonkeyPatch) -> None:
+    # ブロックの境界をまたぐ場合も確認するため、ブロックを小さくする
+    monkeypatch.setattr(text_module, 'SEEK_BLOCK_SIZE', 7)
+
+
+@pytest.mark.usefixtures('small_seek_block')
+@pytest.mark.parametrize('encoding', ['utf_8', 'utf_8_sig', 'cp932', 'utf_16'])
+def test_tail_text(tmp_path: Path, sample_str: str, encoding: str) -> None:
+    file_path = tmp_path / 'tail.txt'
+    file_path.write_text(sample_str, encoding=encoding)
+    lines = sample_str.splitlines(keepends=True)
+
+    assert tail_text(file_path, 2) == ''.join(lines[-2:])
+    assert tail_text(file_path, 100) == sample_str
+    assert tail_text(file_path, 0) == ''
+
+
+@pytest.mark.usefixtures('small_seek_block')
+def test_tail_text_splits_only_newlines(tmp_path: Path) -> None:
+    file_path = tmp_path / 'tail.txt'
+    file_path.write_text('first\nA\x0cB\x1cC\u2028D\x85E\n', encoding='utf_8')
+
+    assert tail_text(file_path, 1) == 'A\x0cB\x1cC\u2028D\x85E\n'
+    assert tail_text(file_path, 2) == ''.join(iter_text_lines(file_path))
+
+
+@pytest.mark.usefixtures('small_seek_block')
+@pytest.mark.parametrize('encoding', ['utf_8', 'cp932', 'euc_jp', 'utf_16'])
+def test_read_text_range(tmp_path: Path, sample_str: str, encoding: str) -> None:
+    file_path = tmp_path / 'range.txt'
+    file_path.write_text(sample_str, encoding=encoding)
+
+    # 各文字の開始位置、UTF-16はBOMの2バイトから始まる
+    char_encoding = 'utf_16_le' if encoding == 'utf_16' else encoding
+    offsets = [2 if encoding == 'utf_16' else 0]
+    for char in sample_str:
+        offsets.append(offsets[-1] + len(char.encode(char_encoding)))
+
+    assert read_text_range(file_path) == sample_str
+    assert read_text_range(file_path, offsets[10], offsets[20]) == sample_str[10:20]
+    # 文字の途中を指定した場合、先頭のバイトが範囲内の文字だけを含める
+    assert read_text_range(file_path, offsets[10] + 1, offsets[20] + 1) == sample_str[11:21]
+    assert read_text_range(file_path, offsets[10] + 1, offsets[11]) == ''
+    # 隣接する範囲に分けて読み込むと、各文字はどれか1つの範囲にだけ含まれる
+    bounds = [0, offsets[5] + 1, offsets[5] + 2, offsets[30] - 1, None]
+    chunks = [read_text_range(file_path, a, b) for a, b in pairwise(bounds)]
+    assert ''.join(chunks) == sample_str
+
+
+def test_read_text_range_end_boundary(tmp_path: Path) -> None:
+    file_path = tmp_path / 'range.txt'
+    file_path.write_text('あいう', encoding='utf_8')
+
+    assert read_text_range(file_path, 0, 4) == 'あい'
+    assert read_text_range(file_path, 0, 3) == 'あ'
+    assert read_text_range(file_path, 1, 4) == 'い'
+
+
+def test_tail_text_missing_file(tmp_path: Path) -> None:
+    assert tail_text(tmp_path / 'missing.txt') == ''
+    assert read_text_range(tmp_path / 'missing.txt', 10) == ''
+
+
+@pytest.mark.parametrize('encoding', ['utf_8', 'cp932'])
+def test_compressed_text_streaming(tmp_path: Path, sample_str: str, encoding: str) -> None:
+    file_path = tmp_path / 'compressed.txt.gz'
+    file_path.write_bytes(gzip.compress(sample_str.encode(encoding)))
+    lines = sample_str.splitlines(keepends=True)
+    offset = len(lines[0].encode(encoding))
+
+    assert list(iter_text_lines(file_path, size=5)) == lines
+    assert tail_text(file_path, 2) == ''.join(lines[-2:])
+    assert read_text_range(file_path, offset) == ''.join(lines[1:])
+    assert read_text_range(file_path, 0, offset) == lines[0]
+    # 展開後の末尾より後ろを指定した場合
+    assert read_text_range(file_path, 10**6) == ''
+    assert read_text_range(file_path, 10**6, 10**6 + 10) == ''
+
+
+@pytest.mark.parametrize(
+    'text',
+    [
+        pytest.param('BZh is a prefix\nline2\n', id='bz2'),
+        pytest.param('BZh91AY is a prefix\nline2\n', id='bz2_block_size'),
+    ],
+)
+def test_text_starting_with_compression_magic(tmp_path: Path, text: str) -> None:
+    file_path = tmp_path / 'magic.txt'
+    file_path.write_text(text, encoding='utf_8')
+    lines = text.splitlines(keepends=True)
+
+    assert read_text(file_path) == text
+    assert list(iter_text_lines(file_path)) == lines
+    assert tail_text(file_path, 1) == lines[-1]
+    assert read_text_range(file_path, 0) == text
+
+
+@pytest.mark.parametrize('encoding', ['utf_8', 'cp932'])
+def test_compressed_text_without_suffix(tmp_path: Path, sample_str: str, encoding: str) -> None:
+    file_path = tmp_path / 'compressed'
+    file_path.write_bytes(gzip.compress(sample_str.encode(encoding)))
+
+    assert list(iter_text_lines(file_path)) == sample_str.splitlines(keepends=True)
+    # 展開した内容の文字コードを、圧縮ファイル自体の文字コードとして記憶しない
+    memo = common_io_wrapper._encoding_memo  # noqa: SLF001
+    assert memo.get(file_identity(file_path.stat())) is None
+    assert read_text(file_path) == sample_str
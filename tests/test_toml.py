@@ -1,9 +1,11 @@
+import tomllib
 from logging import getLogger
 from pathlib import Path
 
 import pytest
 
-from abara_file_io import read_toml, write_toml
+from abara_file_io import LazySections, read_toml, read_toml_lazy, write_toml
+from abara_file_io.toml import _parse_toml_table
 
 log = getLogger(__name__)
 
@@ -41,3 +43,77 @@ def test_write_toml(
 
     assert Path(file_path).exists()
     assert read_toml(file_path) == data
+
+
+def test_read_toml_lazy(tmp_path: Path) -> None:
+    file_path = tmp_path / 'lazy.toml'
+    data = {
+        'title': 'sample',
+        'owner': {'name': 'abara', 'tags': ['a', 'b']},
+        'servers': {'alpha': {'ip': '10.0.0.1'}, 'beta': {'ip': '10.0.0.2'}},
+        'products': [{'name': 'x'}, {'name': 'y', 'sku': 1}],
+    }
+    write_toml(data, file_path)
+
+    lazy = read_toml_lazy(file_path)
+    assert isinstance(lazy, LazySections)
+    assert list(lazy) == list(read_toml(file_path))
+    assert lazy['servers'] == data['servers']
+    assert 'servers' in lazy.parsed_sections
+    assert 'owner' not in lazy.parsed_sections
+    assert lazy == data
+
+
+@pytest.mark.parametrize(
+    'text',
+    [
+        pytest.param('[a]\nx = 1\n[b]\ny = 2\n[a.c]\nz = 3\n', id='split_table'),
+        pytest.param('[a]\ns = """\n[b]\n"""\n', id='multiline_string'),
+        pytest.param('[a]\nx = [\n[1]\n]\n[b]\ny = 2\n', id='array_like_header'),
+        pytest.param('[x]\na = [\n  # comment\n[2]\n]\n[y]\nb = 1\n', id='array_after_comment'),
+        pytest.param('[a]\nx = [ # ]\n[1], "]", \'[\'\n]\n[b]\ny = 2\n', id='bracket_in_string'),
+        pytest.param('  [a]\nx = 1\n  [b]\ny = 2\n', id='indented_header'),
+        pytest.param('["a.b"]\nx = 1\n', id='quoted_key'),
+        pytest.param('a.b = 1\n[a.c]\nx = 1\n', id='dotted_root_key'),
+        pytest.param('x = [\n[1]\n]\n', id='no_table'),
+    ],
+)
+def test_read_toml_lazy_matches_read_toml(tmp_path: Path, text: str) -> None:
+    file_path = tmp_path / 'lazy.toml'
+    file_path.write_text(text, encoding='utf_8')
+
+    assert dict(read_toml_lazy(file_path)) == read_toml(file_path)
+    assert read_toml_lazy(file_path) == read_toml(file_path)
+    assert list(read_toml_lazy(file_path).items()) == list(read_toml(file_path).items())
+
+
+def test_read_toml_lazy_nested_array(tmp_path: Path) -> None:
+    # 複数行の配列の行頭が[の要素は、コメントの後でもテーブルと判定しない
+    file_path = tmp_path / 'lazy.toml'
+    file_path.write_text('[x]\na = [\n  # comment\n[2]\n]\n[y]\nb = 1\n', encoding='utf_8')
+
+    lazy = read_toml_lazy(file_path)
+    assert isinstance(lazy, LazySections)
+    assert list(lazy) == ['x', 'y']
+    assert lazy['x'] == {'a': [[2]]}
+    assert lazy.parsed_sections == ['x']
+
+
+def test_read_toml_lazy_fallback() -> None:
+    # 区切りの判定を誤って索引したセクションは、参照時に全体をパースし直す
+    text = '[x]\na = [\n[2]\n]\n[y]\nb = 1\n'
+    spans = {'x': [(0, 10)], '2': [(10, 16)], 'y': [(16, len(text))]}
+    expected = tomllib.loads(text)
+
+    def lazy() -> LazySections:
+        return LazySections(text, spans, _parse_toml_table, fallback=tomllib.loads)
+
+    assert list(lazy().items()) == list(expected.items())
+    assert lazy() == expected
+
+    fallback = lazy()
+    assert '2' in fallback
+    with pytest.raises(KeyError):
+        fallback['2']
+    assert '2' not in fallback
+    assert list(fallback) == ['x', 'y']
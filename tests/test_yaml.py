@@ -1,9 +1,18 @@
+from collections.abc import Iterator
 from logging import getLogger
 from pathlib import Path
+from threading import Thread
 
 import pytest
 
-from abara_file_io import read_yaml, write_yaml
+from abara_file_io import (
+    iter_yaml_documents,
+    read_yaml,
+    update_yaml,
+    write_yaml,
+    write_yaml_documents,
+)
+from abara_file_io.yaml import YamlMode, _yaml_engine
 
 log = getLogger(__name__)
 
@@ -41,3 +50,99 @@ def test_write_yaml(
 
     assert Path(file_path).exists()
     assert read_yaml(file_path) == data
+
+
+@pytest.mark.parametrize(
+    ('sample_dicts'),
+    [
+        pytest.param(1, id='flat_dict'),
+        pytest.param(2, id='section_dict1'),
+        pytest.param(3, id='section_dict2'),
+    ],
+    indirect=['sample_dicts'],
+)
+@pytest.mark.parametrize('mode', ['rt', 'safe'])
+def test_yaml_modes(
+    sample_dicts: dict[str, dict | str | bool], mode: YamlMode, tmp_path: Path
+) -> None:
+    file_path = tmp_path / f'test_yaml_file_{mode}.yml'
+
+    data = {}
+    if isinstance(sample_dicts['data'], dict):
+        data = sample_dicts['data']
+
+    assert write_yaml(data, file_path, mode=mode)
+    assert read_yaml(file_path, mode=mode) == data
+
+
+def test_yaml_safe_writes_round_trip_data(tmp_path: Path) -> None:
+    file_path = tmp_path / 'round_trip.yml'
+    file_path.write_text('foo: 1  # comment\nbar:\n  - baz\n  - true\n', encoding='utf_8')
+
+    data = read_yaml(file_path)
+    write_yaml(data, file_path, mode='safe')
+
+    assert read_yaml(file_path, mode='safe') == {'foo': 1, 'bar': ['baz', True]}
+
+
+def test_yaml_engine_per_thread() -> None:
+    engines: list[object] = []
+
+    thread = Thread(target=lambda: engines.append(_yaml_engine('safe')))
+    thread.start()
+    thread.join()
+
+    assert _yaml_engine('safe') is _yaml_engine('safe')
+    assert engines[0] is not _yaml_engine('safe')
+
+
+@pytest.mark.parametrize('mode', ['rt', 'safe'])
+def test_yaml_engine_doc_infos_bounded(tmp_path: Path, mode: YamlMode) -> None:
+    file_path = tmp_path / 'repeat.yml'
+
+    for i in range(100):
+        write_yaml({'count': i}, file_path, mode=mode)
+        assert read_yaml(file_path, mode=mode) == {'count': i}
+
+    assert len(getattr(_yaml_engine(mode), 'doc_infos', [])) <= 1
+
+
+def test_update_yaml_keeps_comments(tmp_path: Path) -> None:
+    file_path = tmp_path / 'config.yml'
+    file_path.write_text('foo: 1  # comment\nbar: baz\n', encoding='utf_8')
+
+    def update(data: dict) -> None:
+        data['foo'] = 2
+
+    assert update_yaml(file_path, update)
+    assert file_path.read_text(encoding='utf_8') == 'foo: 2  # comment\nbar: baz\n'
+
+
+@pytest.mark.parametrize('mode', ['rt', 'safe'])
+def test_yaml_documents(tmp_path: Path, mode: YamlMode) -> None:
+    file_path = tmp_path / 'manifests.yml.gz'
+    documents = [{'kind': 'Service', 'name': f'svc{i}', 'ports': [80, 443]} for i in range(5)]
+
+    def generate() -> Iterator[dict]:
+        for document in documents:
+            # 書き込みの途中で他のYAMLを読み込んでも影響しない
+            read_yaml(tmp_path / 'missing.yml')
+            yield document
+
+    assert write_yaml_documents(generate(), file_path, mode=mode, atomic=True)
+
+    read_documents = []
+    for document in iter_yaml_documents(file_path, mode=mode):
+        # 反復の途中で他のYAMLを読み書きしても影響しない
+        write_yaml(document, tmp_path / 'single.yml')
+        read_documents.append(document)
+    assert read_documents == documents
+
+
+def test_iter_yaml_documents_invalid(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    file_path = tmp_path / 'broken.yml'
+    file_path.write_text('a: 1\n---\nb: 2\n---\nc: [3\n---\nd: 4\n', encoding='utf_8')
+
+    assert list(iter_yaml_documents(file_path)) == [{'a': 1}, {'b': 2}]
+    assert 'YAMLの記述が不正' in caplog.text
+    assert list(iter_yaml_documents(tmp_path / 'missing.yml')) == []